@@ -1,19 +1,4 @@
 import streamlit as st
-import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
-import io
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib import colors
-from reportlab.lib.units import inch
-from reportlab.graphics.shapes import Drawing
-from reportlab.graphics.charts.linecharts import HorizontalLineChart
-from reportlab.graphics.charts.legends import Legend
-import matplotlib.pyplot as plt
-import io
-import base64
 
 st.set_page_config(
     page_title="Corrida Financiera - Farmacia Líbano",
@@ -26,74 +11,80 @@ st.set_page_config(
 # Local: lee de codigos.txt | Producción: lee de Streamlit Secrets
 # ═══════════════════════════════════════════════════════════════════════════════
 import os
-from datetime import datetime
+import sqlite3
+import sys
+from datetime import datetime, timedelta
 
-def cargar_codigos():
-    """Carga los códigos desde archivo local o Streamlit Secrets"""
-    codigos = {}
-    
-    # Intentar cargar desde archivo local primero
-    archivo = os.path.join(os.path.dirname(__file__), 'codigos.txt')
+from corrida.bitacora import Bitacora
+from corrida.codigos import RegistroCodigos
+from corrida.uso import LectorBitacora
+
+def leer_codigos_secrets():
+    """Códigos de Streamlit Secrets (producción); vacío si no hay"""
+    try:
+        if 'codigos' in st.secrets:
+            return dict(st.secrets['codigos'])
+    except:
+        pass
+    return {}
+
+@st.cache_resource
+def registro_codigos():
+    """Códigos de acceso del proceso: se releen solo si cambia codigos.txt o los secrets"""
+    return RegistroCodigos(os.path.join(os.path.dirname(__file__), 'codigos.txt'), leer_codigos_secrets)
+
+def cargar_admins():
+    """Códigos con acceso al panel de administración (admins.txt o Streamlit Secrets)"""
+    archivo = os.path.join(os.path.dirname(__file__), 'admins.txt')
     if os.path.exists(archivo):
         with open(archivo, 'r', encoding='utf-8') as f:
-            for linea in f:
-                linea = linea.strip()
-                if linea and not linea.startswith('#') and '=' in linea:
-                    codigo, nombre = linea.split('=', 1)
-                    codigos[codigo.strip()] = nombre.strip()
-    
-    # Si no hay códigos locales, intentar Streamlit Secrets (producción)
-    if not codigos:
-        try:
-            if 'codigos' in st.secrets:
-                codigos = dict(st.secrets['codigos'])
-        except:
-            pass
-    
-    # Código dinámico del día (cambia cada día) - siempre disponible
-    codigo_diario = f"DIA{datetime.now().strftime('%d%m%y')}"
-    codigos[codigo_diario] = "Acceso Temporal"
-    
-    return codigos
-
-def registrar_acceso(codigo, nombre):
-    """Registra el acceso - local en archivo, producción en session"""
-    fecha_hora = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    registro = f"{fecha_hora} | {codigo} | {nombre}"
+            return {linea.strip() for linea in f if linea.strip() and not linea.startswith('#')}
     
-    # Intentar guardar en archivo local
     try:
-        archivo_log = os.path.join(os.path.dirname(__file__), 'accesos.log')
-        with open(archivo_log, 'a', encoding='utf-8') as f:
-            f.write(registro + "\n")
+        if 'admins' in st.secrets:
+            return set(st.secrets['admins'].get('codigos', []))
     except:
         pass
+    return set()
+
+@st.cache_resource
+def bitacora():
+    """Escritor de accesos.log compartido por todas las sesiones del servidor"""
+    return Bitacora(os.path.join(os.path.dirname(__file__), 'accesos.log'))
+
+@st.cache_resource
+def lector_bitacora():
+    """Lector incremental de accesos.log para el tablero de uso (índice en accesos.log.idx)"""
+    return LectorBitacora(bitacora().ruta)
+
+def registrar_acceso(codigo, nombre):
+    """Registra el acceso - en la bitácora (en segundo plano) y en session"""
+    bitacora().registrar("acceso", codigo=codigo, usuario=nombre)
     
     # Guardar en session state para ver en la app
+    fecha_hora = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     if 'registro_accesos' not in st.session_state:
         st.session_state['registro_accesos'] = []
-    st.session_state['registro_accesos'].append(registro)
+    st.session_state['registro_accesos'].append(f"{fecha_hora} | {codigo} | {nombre}")
 
 def registrar_corrida(datos_franquicia, usuario):
     """Registra cuando se crea una corrida financiera"""
-    fecha_hora = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    registro = f"{fecha_hora} | CORRIDA | {usuario} | {datos_franquicia['nombre']} | {datos_franquicia['ubicacion']} | {datos_franquicia['proposito']}"
-    
-    # Intentar guardar en archivo local
-    try:
-        archivo_log = os.path.join(os.path.dirname(__file__), 'accesos.log')
-        with open(archivo_log, 'a', encoding='utf-8') as f:
-            f.write(registro + "\n")
-    except:
-        pass
+    bitacora().registrar(
+        "corrida",
+        codigo=st.session_state.get('usuario_codigo', ''),
+        usuario=usuario,
+        nombre=datos_franquicia['nombre'],
+        ubicacion=datos_franquicia['ubicacion'],
+        proposito=datos_franquicia['proposito'],
+    )
     
     # Guardar en session state
+    fecha_hora = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    registro = f"{fecha_hora} | CORRIDA | {usuario} | {datos_franquicia['nombre']} | {datos_franquicia['ubicacion']} | {datos_franquicia['proposito']}"
     if 'registro_accesos' not in st.session_state:
         st.session_state['registro_accesos'] = []
     st.session_state['registro_accesos'].append(registro)
 
-CODIGOS_ACCESO = cargar_codigos()
-
 # Verificar si el usuario ya está autenticado
 if 'acceso_autorizado' not in st.session_state:
     st.session_state['acceso_autorizado'] = False
@@ -125,10 +116,13 @@ if not st.session_state['acceso_autorizado']:
             submit = st.form_submit_button("🚀 Acceder", use_container_width=True)
             
             if submit:
-                if codigo in CODIGOS_ACCESO:
+                nombre_usuario = registro_codigos().verificar(codigo)
+                if nombre_usuario is not None:
                     st.session_state['acceso_autorizado'] = True
-                    st.session_state['usuario_nombre'] = CODIGOS_ACCESO[codigo]
-                    registrar_acceso(codigo, CODIGOS_ACCESO[codigo])
+                    st.session_state['usuario_nombre'] = nombre_usuario
+                    st.session_state['usuario_codigo'] = codigo
+                    st.session_state['es_admin'] = codigo in cargar_admins()
+                    registrar_acceso(codigo, nombre_usuario)
                     st.rerun()
                 else:
                     st.error("❌ Código de acceso inválido")
@@ -199,6 +193,9 @@ if st.session_state['datos_franquicia'] is None:
                     }
                     # Registrar la corrida en el log
                     registrar_corrida(st.session_state['datos_franquicia'], st.session_state.get('usuario_nombre', 'Usuario'))
+                    # Se guarda en el historial al terminar el primer cálculo
+                    st.session_state['guardar_corrida'] = True
+                    st.session_state.pop('corrida_abierta', None)
                     st.rerun()
                 else:
                     st.error("Por favor completa el nombre y la ubicación")
@@ -209,6 +206,7 @@ if st.session_state['datos_franquicia'] is None:
     with col_l2:
         if st.button("🚪 Cerrar Sesión", use_container_width=True):
             st.session_state['acceso_autorizado'] = False
+            st.session_state['es_admin'] = False
             st.session_state['datos_franquicia'] = None
             st.rerun()
     
@@ -217,6 +215,31 @@ if st.session_state['datos_franquicia'] is None:
 # ═══════════════════════════════════════════════════════════════════════════════
 # APLICACIÓN PRINCIPAL - Header limpio
 # ═══════════════════════════════════════════════════════════════════════════════
+# NumPy, pandas y el motor se cargan hasta aquí: login y formulario no los usan
+import numpy as np
+import pandas as pd
+
+from corrida import ESCENARIOS, GASTOS_FIJOS_PRESETS, MODELOS, PRESETS, parametros, proyectar_utilidad
+from corrida.archivos import PerfilesJSON
+from corrida.cache import CacheLRU, clave_parametros
+from corrida.estacionalidad import MESES, PerfilesEstacionalidad, ajustar, vector_estacionalidad
+from corrida.flujos import analizar
+from corrida.historial import Historial
+from corrida.horario import (
+    APERTURA, CIERRE, DIAS_SEMANA, PERFIL_HORA, abiertas, ajuste_motor, dias_abiertos, horas_efectivas,
+    por_hora_del_dia,
+)
+from corrida.ingesta import ingerir, perfiles_calibrados
+from corrida.lote import correr_corrida, evaluar_presets
+from corrida.objetivo import resolver
+from corrida.portafolio import proyectar_portafolio
+from corrida.red import canibalizacion
+from corrida.sensibilidad import tornado
+from corrida.simulacion import DISTRIBUCIONES, TIPOS, simular
+from corrida.superficie import superficie
+from corrida.trabajos import CORRIENDO, EN_COLA, ERROR, LISTO, ColaTrabajos
+from corrida.ubicaciones import leer_puntos, rankear
+
 
 # Header compacto con info del usuario y franquicia
 datos_f = st.session_state['datos_franquicia']
@@ -232,6 +255,7 @@ with col_h2:
 with col_h3:
     if st.button("🚪 Salir", key="logout_main"):
         st.session_state['acceso_autorizado'] = False
+        st.session_state['es_admin'] = False
         st.session_state['datos_franquicia'] = None
         st.rerun()
 
@@ -331,46 +355,6 @@ def fmt_dinero(valor):
         return f"${valor:,.0f}"
     return f"${valor:,.0f}"
 
-# ═══════════════════════════════════════════════════════════════════════════════
-# PRESETS POR MODELO DE FRANQUICIA Y ESCENARIO
-# ═══════════════════════════════════════════════════════════════════════════════
-MODELOS = {
-    "🏪 Mini": {"consultorio": False, "abarrotes": False, "inversion": 570000},
-    "🩺 Consultorio": {"consultorio": True, "abarrotes": False, "inversion": 700000},
-    "🛒 Super": {"consultorio": True, "abarrotes": True, "inversion": 950000},
-}
-
-# ANÁLISIS DE MÁRGENES POR CATEGORÍA (Como analista financiero de farmacias)
-# Genéricos: 35-45% margen | Patente: 15-25% margen | Abarrotes: 8-15% margen
-# Mix promedio ponderado según flujo y conversión por escenario
-
-PRESETS = {
-    "🏪 Mini": {
-        "Conservador": {"flujo": 30, "conversion": 0.08, "ticket": 75, "cogs": 0.72, "gastos_fijos": 22000, "gastos_var": 0.03, "crec": 0.015},
-        "Medio":       {"flujo": 60, "conversion": 0.12, "ticket": 95, "cogs": 0.68, "gastos_fijos": 28000, "gastos_var": 0.05, "crec": 0.03},
-        "Alto":        {"flujo": 100, "conversion": 0.16, "ticket": 120, "cogs": 0.65, "gastos_fijos": 35000, "gastos_var": 0.07, "crec": 0.045},
-    },
-    "🩺 Consultorio": {
-        "Conservador": {"flujo": 45, "conversion": 0.09, "ticket": 85, "cogs": 0.70, "gastos_fijos": 35000, "gastos_var": 0.04, "crec": 0.02,
-                        "consultas": 8, "surten": 0.60, "ticket_receta": 120, "ingreso_consulta": 40, "cogs_receta": 0.62},
-        "Medio":       {"flujo": 80, "conversion": 0.13, "ticket": 110, "cogs": 0.67, "gastos_fijos": 45000, "gastos_var": 0.06, "crec": 0.035,
-                        "consultas": 15, "surten": 0.72, "ticket_receta": 180, "ingreso_consulta": 60, "cogs_receta": 0.58},
-        "Alto":        {"flujo": 140, "conversion": 0.17, "ticket": 150, "cogs": 0.63, "gastos_fijos": 58000, "gastos_var": 0.08, "crec": 0.05,
-                        "consultas": 25, "surten": 0.85, "ticket_receta": 250, "ingreso_consulta": 85, "cogs_receta": 0.55},
-    },
-    "🛒 Super": {
-        "Conservador": {"flujo": 60, "conversion": 0.10, "ticket": 90, "cogs": 0.74, "gastos_fijos": 48000, "gastos_var": 0.04, "crec": 0.025,
-                        "consultas": 10, "surten": 0.65, "ticket_receta": 140, "ingreso_consulta": 45, "cogs_receta": 0.62,
-                        "abarrotes_pct": 0.15, "cogs_abarrotes": 0.90},
-        "Medio":       {"flujo": 110, "conversion": 0.14, "ticket": 120, "cogs": 0.69, "gastos_fijos": 62000, "gastos_var": 0.06, "crec": 0.04,
-                        "consultas": 18, "surten": 0.75, "ticket_receta": 200, "ingreso_consulta": 70, "cogs_receta": 0.58,
-                        "abarrotes_pct": 0.22, "cogs_abarrotes": 0.88},
-        "Alto":        {"flujo": 180, "conversion": 0.18, "ticket": 165, "cogs": 0.65, "gastos_fijos": 78000, "gastos_var": 0.08, "crec": 0.055,
-                        "consultas": 30, "surten": 0.88, "ticket_receta": 280, "ingreso_consulta": 100, "cogs_receta": 0.55,
-                        "abarrotes_pct": 0.32, "cogs_abarrotes": 0.85},
-    },
-}
-
 # ═══════════════════════════════════════════════════════════════════════════════
 # SIDEBAR - CONFIGURACIÓN
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -386,12 +370,138 @@ st.sidebar.markdown(f'''
 
 st.sidebar.markdown("### ⚙️ Configuración")
 
+@st.cache_resource
+def historial():
+    """Historial de corridas en corridas.db, compartido por todas las sesiones"""
+    return Historial(os.path.join(os.path.dirname(__file__), 'corridas.db'))
+
+# Reabrir una corrida de "Mis corridas": se restauran sus datos y entradas
+# antes de dibujar el sidebar; el resultado se vuelve a calcular con ellas
+if 'abrir_corrida' in st.session_state:
+    id_abrir = st.session_state.pop('abrir_corrida')
+    try:
+        fila_abierta = historial().cargar(
+            id_abrir, usuario_codigo=None if st.session_state.get('es_admin') else st.session_state.get('usuario_codigo')
+        )
+    except sqlite3.Error:
+        fila_abierta = None
+        st.sidebar.error("No se pudo abrir la corrida del historial")
+    if fila_abierta is not None:
+        st.session_state['datos_franquicia'] = {
+            'nombre': fila_abierta['nombre'],
+            'ubicacion': fila_abierta['ubicacion'],
+            'proposito': fila_abierta['proposito'],
+            'notas': fila_abierta['notas'],
+        }
+        st.session_state['corrida_abierta'] = {
+            'id': fila_abierta['id'],
+            'modelo': fila_abierta['modelo'],
+            'escenario': fila_abierta['escenario'],
+            'entradas': fila_abierta['entradas'],
+        }
+        st.session_state.inversion_personalizada = fila_abierta['entradas']['inversion']
+        st.session_state.gastos_fijos_items = dict(fila_abierta['entradas']['gastos_fijos_items'])
+        st.session_state.modelo_gf_anterior = fila_abierta['modelo']
+        for clave_gf in [k for k in st.session_state if str(k).startswith('gf_')]:
+            del st.session_state[clave_gf]
+        # Claves nuevas para que los widgets tomen los valores restaurados
+        st.session_state['ronda_entradas'] = st.session_state.get('ronda_entradas', 0) + 1
+        st.rerun()
+
+corrida_abierta = st.session_state.get('corrida_abierta')
+ronda_entradas = st.session_state.get('ronda_entradas', 0)
+
+def entrada(campo, defecto):
+    """Valor inicial y clave de una entrada del sidebar
+
+    El valor es el de la corrida reabierta si se está viendo su modelo y
+    escenario; si no, el default del preset. La clave cambia con ese valor
+    (así cambiar de preset reinicia la entrada) y con cada corrida reabierta.
+    """
+    if corrida_abierta and (corrida_abierta['modelo'], corrida_abierta['escenario']) == (modelo, escenario):
+        defecto = corrida_abierta['entradas'].get(campo, defecto)
+    return defecto, f"{campo}_{defecto}_{ronda_entradas}"
+
 # Modelo y escenario
-modelo = st.sidebar.selectbox("Modelo de Franquicia", list(MODELOS.keys()))
-escenario = st.sidebar.selectbox("Escenario", ["Conservador", "Medio", "Alto"], index=1)
+opciones_modelo = list(MODELOS.keys())
+opciones_escenario = ["Conservador", "Medio", "Alto"]
+modelo = st.sidebar.selectbox(
+    "Modelo de Franquicia", opciones_modelo,
+    index=opciones_modelo.index(corrida_abierta['modelo']) if corrida_abierta else 0,
+    key=f"modelo_{ronda_entradas}",
+)
+escenario = st.sidebar.selectbox(
+    "Escenario", opciones_escenario,
+    index=opciones_escenario.index(corrida_abierta['escenario']) if corrida_abierta else 1,
+    key=f"escenario_{ronda_entradas}",
+)
 p = PRESETS[modelo][escenario]
 m = MODELOS[modelo]
 
+@st.cache_resource
+def calibraciones():
+    """Presets calibrados con ventas del POS en calibraciones.json, compartidos por todas las sesiones"""
+    return PerfilesJSON(os.path.join(os.path.dirname(__file__), 'calibraciones.json'))
+
+# Calibración con ventas reales: sus campos reemplazan los del preset del escenario
+SIN_CALIBRAR = "Preset del escenario"
+with st.sidebar.expander("🧾 Calibrar con ventas reales (POS)", expanded=False):
+    calibraciones_guardadas = calibraciones().listar()
+    opciones_calibracion = [SIN_CALIBRAR] + sorted(calibraciones_guardadas)
+    calibracion_abierta = corrida_abierta['entradas'].get('calibracion') if corrida_abierta else None
+    calibracion = st.selectbox(
+        "Perfil calibrado", opciones_calibracion,
+        index=opciones_calibracion.index(calibracion_abierta) if calibracion_abierta in opciones_calibracion else 0,
+        key=f"calibracion_{ronda_entradas}",
+    )
+    if calibracion != SIN_CALIBRAR:
+        perfil_pos = calibraciones_guardadas[calibracion]
+        p = {**p, **perfil_pos["preset"]}
+        # Dentro de los rangos de las entradas del sidebar
+        p["flujo"] = int(np.clip(round(p["flujo"]), 10, 300))
+        p["ticket"] = int(np.clip(round(p["ticket"]), 40, 300))
+        st.caption(f"📁 {perfil_pos['origen']} · {perfil_pos['transacciones']:,} tickets en {perfil_pos['dias']} días")
+
+    st.markdown("---")
+    st.caption("Exportación del POS, una línea de ticket por renglón. "
+               "Columnas: tienda, folio, fecha, categoria, importe y costo.")
+    archivo_pos = st.file_uploader("Ventas del POS", type=["csv", "parquet"], key="pos_archivo")
+    nombre_calibracion = st.text_input("Nombre del perfil", key="pos_nombre", placeholder="Ej: Tiendas Monterrey")
+    if st.button("📐 Calibrar y guardar", key="pos_calibrar", disabled=archivo_pos is None):
+        if not nombre_calibracion.strip():
+            st.warning("Escribe un nombre para el perfil")
+        else:
+            try:
+                with st.spinner("Leyendo tickets por bloques..."):
+                    resumen_pos = ingerir(archivo_pos)
+            except (ValueError, ImportError) as e:
+                st.error(str(e))
+            else:
+                # El resumen se conserva aunque no se pueda escribir el perfil
+                st.session_state['resumen_pos'] = resumen_pos
+                try:
+                    # El flujo se despeja con la conversión del preset elegido
+                    calibraciones().agregar(perfiles_calibrados(
+                        resumen_pos, PRESETS[modelo][escenario]["conversion"], nombre_calibracion.strip(),
+                        archivo_pos.name,
+                    ))
+                except OSError as e:
+                    st.error(f"No se pudo guardar el perfil calibrado ({e})")
+                else:
+                    st.rerun()
+    if 'resumen_pos' in st.session_state:
+        st.dataframe(
+            st.session_state['resumen_pos'][[
+                "transacciones", "ticket_promedio", "transacciones_hora", "mezcla_genericos",
+                "mezcla_patente", "mezcla_abarrotes", "cogs",
+            ]].rename(columns={
+                "transacciones": "Tickets", "ticket_promedio": "Ticket", "transacciones_hora": "Tickets/hora",
+                "mezcla_genericos": "Genéricos", "mezcla_patente": "Patente", "mezcla_abarrotes": "Abarrotes",
+                "cogs": "COGS",
+            }).round(2),
+            use_container_width=True,
+        )
+
 # Explicación de escenarios
 with st.sidebar.expander("📚 ¿Qué significa cada escenario?", expanded=False):
     st.markdown("""
@@ -468,10 +578,12 @@ gastos_var = p["gastos_var"]  # Gastos variables
 
 with st.sidebar.expander("👥 ¿Cuánta gente pasa por tu local?", expanded=True):
     st.caption("💡 Cuenta cuántas personas pasan frente a tu local en una hora típica")
+    valor_flujo, clave_flujo = entrada("flujo", p["flujo"])
     flujo = st.number_input(
         "Personas por hora", 
-        10, 300, p["flujo"],
-        help="Promedio de gente que pasa caminando frente a tu local"
+        10, 300, valor_flujo,
+        help="Promedio de gente que pasa caminando frente a tu local",
+        key=clave_flujo
     )
     
     # Explicación visual
@@ -480,10 +592,12 @@ with st.sidebar.expander("👥 ¿Cuánta gente pasa por tu local?", expanded=Tru
 
 with st.sidebar.expander("🛒 ¿Cuánto compra cada cliente?", expanded=True):
     st.caption("💡 El ticket promedio es lo que gasta un cliente típico")
+    valor_ticket, clave_ticket = entrada("ticket", p["ticket"])
     ticket = st.number_input(
         "Ticket promedio farmacia ($)", 
-        40, 300, p["ticket"],
-        help="¿Cuánto gasta en promedio un cliente en farmacia?"
+        40, 300, valor_ticket,
+        help="¿Cuánto gasta en promedio un cliente en farmacia?",
+        key=clave_ticket
     )
     
     if ticket < 70:
@@ -495,20 +609,26 @@ with st.sidebar.expander("🛒 ¿Cuánto compra cada cliente?", expanded=True):
 if m["consultorio"]:
     with st.sidebar.expander("🩺 Consultorio médico", expanded=True):
         st.caption("💡 El consultorio genera ingresos extra y atrae clientes a la farmacia")
+        valor_consultas, clave_consultas = entrada("consultas", p.get("consultas", 0))
         consultas = st.number_input(
             "Consultas por día", 
-            0, 40, p.get("consultas", 0),
-            help="¿Cuántas consultas médicas esperas al día?"
+            0, 40, valor_consultas,
+            help="¿Cuántas consultas médicas esperas al día?",
+            key=clave_consultas
         )
+        valor_ingreso_consulta, clave_ingreso_consulta = entrada("ingreso_consulta", p.get("ingreso_consulta", 40))
         ingreso_consulta = st.number_input(
             "Cobro por consulta ($)", 
-            0, 150, p.get("ingreso_consulta", 40),
-            help="¿Cuánto cobras por cada consulta?"
+            0, 150, valor_ingreso_consulta,
+            help="¿Cuánto cobras por cada consulta?",
+            key=clave_ingreso_consulta
         )
+        valor_ticket_receta, clave_ticket_receta = entrada("ticket_receta", p.get("ticket_receta", 120))
         ticket_receta = st.number_input(
             "Compra promedio con receta ($)", 
-            50, 400, p.get("ticket_receta", 120),
-            help="Los pacientes con receta gastan más"
+            50, 400, valor_ticket_receta,
+            help="Los pacientes con receta gastan más",
+            key=clave_ticket_receta
         )
         
         # Parámetro automático
@@ -534,43 +654,7 @@ else:
 with st.sidebar.expander("🏢 Gastos Fijos (Detalle)", expanded=True):
     st.caption("Añade o modifica gastos fijos mensuales")
     
-    # Presets de gastos fijos por modelo
-    gastos_presets = {
-        "🏪 Mini": {
-            "Renta": 8000,
-            "Nómina": 6000,
-            "Luz": 1500,
-            "Internet/Tel": 500,
-            "Contador": 1000,
-            "Seguros": 500,
-            "Limpieza": 500,
-        },
-        "🩺 Consultorio": {
-            "Renta": 12000,
-            "Nómina farmacia": 8000,
-            "Nómina médico": 10000,
-            "Luz": 2500,
-            "Internet/Tel": 800,
-            "Contador": 1500,
-            "Seguros": 1200,
-            "Limpieza": 800,
-            "Insumos médicos": 1200,
-        },
-        "🛒 Super": {
-            "Renta": 18000,
-            "Nómina farmacia": 10000,
-            "Nómina médico": 10000,
-            "Nómina abarrotes": 5000,
-            "Luz": 4000,
-            "Internet/Tel": 1000,
-            "Contador": 2000,
-            "Seguros": 1500,
-            "Limpieza": 1200,
-            "Insumos médicos": 1300,
-        },
-    }
-    
-    gf_default = gastos_presets[modelo]
+    gf_default = GASTOS_FIJOS_PRESETS[modelo]
     
     # Inicializar estado
     if "gastos_fijos_items" not in st.session_state or st.session_state.get("modelo_gf_anterior") != modelo:
@@ -619,110 +703,285 @@ gastos_fijos = sum(st.session_state.gastos_fijos_items.values()) if "gastos_fijo
 # Proyección simplificada
 with st.sidebar.expander("📈 Crecimiento esperado", expanded=False):
     st.caption("💡 ¿Cuánto esperas crecer cada mes?")
+    opciones_crec = ["🐢 Conservador (1%/mes)", "🚶 Moderado (3%/mes)", "🚀 Agresivo (5%/mes)"]
     crec_opcion = st.radio(
         "Expectativa de crecimiento",
-        ["🐢 Conservador (1%/mes)", "🚶 Moderado (3%/mes)", "🚀 Agresivo (5%/mes)"],
-        index=1
+        opciones_crec,
+        index=opciones_crec.index(corrida_abierta['entradas']['crec_opcion']) if corrida_abierta else 1,
+        key=f"crec_opcion_{ronda_entradas}"
     )
     crec = {"🐢 Conservador (1%/mes)": 0.01, "🚶 Moderado (3%/mes)": 0.03, "🚀 Agresivo (5%/mes)": 0.05}[crec_opcion]
     
     st.info(f"📈 En 12 meses tus ventas crecerían ~{((1+crec)**12 - 1)*100:.0f}%")
 
-# Vector de estacionalidad fijo (simplificado)
-est_vector = np.ones(12)
+@st.cache_resource
+def perfiles_estacionalidad():
+    """Perfiles de estacionalidad en estacionalidad.json, compartidos por todas las sesiones"""
+    return PerfilesEstacionalidad(os.path.join(os.path.dirname(__file__), 'estacionalidad.json'))
+
+# Estacionalidad: perfil ajustado con ventas históricas o plana
+SIN_ESTACIONALIDAD = "Sin estacionalidad"
+with st.sidebar.expander("🌦️ Estacionalidad", expanded=False):
+    perfiles = perfiles_estacionalidad().listar()
+    opciones_perfil = [SIN_ESTACIONALIDAD] + sorted(perfiles)
+    perfil_abierto = corrida_abierta['entradas'].get('perfil_estacionalidad') if corrida_abierta else None
+    perfil_nombre = st.selectbox(
+        "Perfil", opciones_perfil,
+        index=opciones_perfil.index(perfil_abierto) if perfil_abierto in opciones_perfil else 0,
+        key=f"perfil_estacionalidad_{ronda_entradas}",
+    )
+    mes_apertura = st.selectbox(
+        "Mes de apertura", MESES,
+        index=(corrida_abierta['entradas'].get('mes_apertura', 1) if corrida_abierta else 1) - 1,
+        key=f"mes_apertura_{ronda_entradas}",
+        help="Con qué mes empieza la proyección (también fija el calendario del tráfico por hora)",
+    )
+    mes_apertura = MESES.index(mes_apertura) + 1
+
+    if perfil_nombre == SIN_ESTACIONALIDAD:
+        est_vector = np.ones(12)
+    else:
+        perfil = perfiles[perfil_nombre]
+        est_vector = vector_estacionalidad(perfil["indices"], mes_apertura)
+        st.bar_chart(pd.DataFrame({"Índice": perfil["indices"]}, index=list(MESES)), sort=False, height=180)
+        st.caption(f"📁 {perfil['origen']} · {perfil['meses']} meses de historia")
+
+    st.markdown("---")
+    st.caption("Ajustar un perfil con ventas históricas (mensuales o diarias). "
+               "Columnas: fecha, ventas y, opcional, una de tienda o región.")
+    archivo_estacionalidad = st.file_uploader("Ventas históricas", type=["csv", "parquet"], key="estacionalidad_archivo")
+    col_e1, col_e2 = st.columns(2)
+    with col_e1:
+        nombre_perfil = st.text_input("Nombre del perfil", key="estacionalidad_nombre", placeholder="Ej: Bajío")
+    with col_e2:
+        columna_grupo = st.text_input("Columna de grupo", value="tienda", key="estacionalidad_grupo")
+    if st.button("📐 Ajustar y guardar", key="estacionalidad_ajustar", disabled=archivo_estacionalidad is None):
+        if not nombre_perfil.strip():
+            st.warning("Escribe un nombre para el perfil")
+        else:
+            try:
+                with st.spinner("Leyendo ventas por bloques..."):
+                    indices_ajustados = ajustar(archivo_estacionalidad, columna_grupo=columna_grupo.strip() or "tienda")
+            except (ValueError, ImportError) as e:
+                st.error(str(e))
+            else:
+                # Todos los perfiles (el agregado y uno por tienda o región) en una sola escritura
+                try:
+                    perfiles_estacionalidad().guardar(
+                        indices_ajustados, nombre_perfil.strip(), origen=archivo_estacionalidad.name
+                    )
+                except OSError as e:
+                    st.error(f"No se pudieron guardar los perfiles ({e})")
+                else:
+                    st.rerun()
+
+# Horario y tráfico por hora: opcional, reemplaza las 12 horas planas del mes base
+anio_horario = datetime.now().year
+with st.sidebar.expander("🕐 Horario y tráfico por hora", expanded=False):
+    horario_abierto = corrida_abierta['entradas'].get('horario') if corrida_abierta else None
+    horario_abierto = horario_abierto or {"usar": False, "apertura": APERTURA, "cierre": CIERRE, "dias": list(DIAS_SEMANA)}
+    usar_horario = st.checkbox(
+        "Usar tráfico hora por hora", value=horario_abierto["usar"], key=f"usar_horario_{ronda_entradas}",
+        help="Simula las horas del año con más gente en la tarde, menos de noche y más el fin de semana",
+    )
+    col_h1, col_h2 = st.columns(2)
+    with col_h1:
+        apertura = st.selectbox("Abre", range(24), index=horario_abierto["apertura"],
+                                format_func=lambda h: f"{h}:00", key=f"apertura_{ronda_entradas}")
+    with col_h2:
+        cierre = st.selectbox("Cierra", range(1, 25), index=horario_abierto["cierre"] - 1,
+                              format_func=lambda h: f"{h}:00", key=f"cierre_{ronda_entradas}")
+    dias_semana = st.multiselect("Días que abre", DIAS_SEMANA, default=horario_abierto["dias"],
+                                 key=f"dias_semana_{ronda_entradas}")
+    dias_horario = tuple(d in dias_semana for d in DIAS_SEMANA)
+
+    horas = 12
+    if usar_horario and any(dias_horario):
+        efectivas = horas_efectivas(anio_horario, mes_apertura, 12, apertura=apertura, cierre=cierre, dias=dias_horario)
+        horas, indice_horario = ajuste_motor(efectivas, anio_horario, mes_apertura)
+        # Lo que cambia de mes a mes (días y mezcla de días de la semana) va con la estacionalidad
+        est_vector = est_vector * indice_horario
+        st.bar_chart(pd.DataFrame({"Gente por hora": PERFIL_HORA * abiertas(apertura, cierre)},
+                                  index=[f"{h}:00" for h in range(24)]), sort=False, height=160)
+        st.info(f"🕐 ~{horas:.1f} horas típicas por día (12 con el horario de siempre, de 9:00 a 21:00 diario)")
+    elif usar_horario:
+        st.warning("Elige al menos un día")
+    else:
+        st.caption("Apagado: 12 horas iguales al día, 28 días al mes")
 
 # Valores fijos de operación (simplificados)
-horas = 12
 dias = 28
 conversion = p["conversion"]
 
 # ═══════════════════════════════════════════════════════════════════════════════
-# CÁLCULOS - MES BASE
+# CÁLCULOS - MES BASE Y PROYECCIÓN 12 MESES
 # ═══════════════════════════════════════════════════════════════════════════════
-flujo_mes = flujo * horas * dias
-clientes_mes = int(flujo_mes * conversion)
+params = {
+    "flujo": flujo,
+    "conversion": conversion,
+    "ticket": ticket,
+    "cogs": cogs,
+    "gastos_fijos": gastos_fijos,
+    "gastos_var": gastos_var,
+    "crec": crec,
+    "consultas": consultas,
+    "surten": surten,
+    "ticket_receta": ticket_receta,
+    "ingreso_consulta": ingreso_consulta,
+    "cogs_receta": cogs_receta,
+    "abarrotes_pct": abarrotes_pct,
+    "cogs_abarrotes": cogs_abarrotes,
+    "inversion": inversion,
+    "horas": horas,
+    "dias": dias,
+}
+
+def calcular_corrida(params, est_vector):
+    """Corrida de 12 meses más la tabla numérica para las gráficas"""
+    resultado = correr_corrida(params, meses=12, estacionalidad=est_vector)
+    proy = resultado["proy"]
+    
+    # Para gráficas (numérico)
+    resultado["df_num"] = pd.DataFrame({
+        "Mes": proy["mes"],
+        "Ventas": np.round(proy["ventas_totales"]).astype(int),
+        "Util. Neta": np.round(proy["utilidad_neta"]).astype(int),
+        "Margen %": np.round(proy["margen_neto"] * 100, 1),
+    })
+    return resultado
+
+@st.cache_resource
+def cache_corridas():
+    """Caché de corridas compartido por todas las sesiones del servidor"""
+    return CacheLRU(max_entradas=512, ttl=3600)
+
+# Corridas con los mismos parámetros (p. ej. presets sin cambios) no se recalculan
+resultado_corrida = cache_corridas().obtener(
+    clave_parametros(params, est_vector),
+    lambda: calcular_corrida(params, est_vector),
+)
+base = resultado_corrida["base"]
+proy = resultado_corrida["proy"]
+periodos = resultado_corrida["periodos"]
+df_num = resultado_corrida["df_num"]
+util_anual = resultado_corrida["util_anual"]
+ventas_anual = resultado_corrida["ventas_anual"]
+
+clientes_mes = int(base["clientes_mes"])
 
 # Ventas
-ventas_farmacia = clientes_mes * ticket
-consultas_mes = consultas * dias if m["consultorio"] else 0
-ventas_recetas = consultas_mes * surten * ticket_receta
-ingresos_consulta = consultas_mes * ingreso_consulta
-ventas_abarrotes = ventas_farmacia * abarrotes_pct if m["abarrotes"] else 0
-ventas_totales = ventas_farmacia + ventas_recetas + ventas_abarrotes + ingresos_consulta
-
-# COGS
-cogs_farmacia = ventas_farmacia * cogs
-cogs_recetas_t = ventas_recetas * cogs_receta
-cogs_abarrotes_t = ventas_abarrotes * cogs_abarrotes
-cogs_total = cogs_farmacia + cogs_recetas_t + cogs_abarrotes_t
-
-# Utilidades
-utilidad_bruta = ventas_totales - cogs_total
-gastos_variables = ventas_totales * gastos_var
-utilidad_neta = utilidad_bruta - gastos_fijos - gastos_variables
-margen_neto = utilidad_neta / ventas_totales if ventas_totales > 0 else 0
-
-# Ticket promedio ponderado (todas las fuentes de ingreso)
-clientes_totales = clientes_mes + (consultas_mes if m["consultorio"] else 0)
-ticket_prom = ventas_totales / clientes_totales if clientes_totales > 0 else 0
+ventas_farmacia = float(base["ventas_farmacia"])
+ventas_recetas = float(base["ventas_recetas"])
+ingresos_consulta = float(base["ingresos_consulta"])
+ventas_abarrotes = float(base["ventas_abarrotes"])
+ventas_totales = float(base["ventas_totales"])
+
+# COGS y utilidades
+cogs_total = float(base["cogs_total"])
+gastos_variables = float(base["gastos_variables"])
+utilidad_neta = float(base["utilidad_neta"])
+margen_neto = float(base["margen_neto"])
+ticket_prom = float(base["ticket_prom"])
 
 # Break-even
-contribucion = 1 - cogs - gastos_var
-if contribucion > 0:
-    ventas_be = gastos_fijos / contribucion
-    clientes_be = ventas_be / ticket if ticket > 0 else 0
-else:
-    ventas_be, clientes_be = float('inf'), float('inf')
+contribucion = float(base["contribucion"])
+ventas_be = float(base["ventas_be"])
+clientes_be = float(base["clientes_be"])
 
 # ROI (inversion ya calculada desde session_state)
-roi_anual = (utilidad_neta * 12) / inversion if inversion > 0 else 0
-meses_recuperacion = inversion / utilidad_neta if utilidad_neta > 0 else float('inf')
+roi_anual = float(base["roi_anual"])
+meses_recuperacion = float(base["meses_recuperacion"])
 
 # ═══════════════════════════════════════════════════════════════════════════════
-# PROYECCIÓN 12 MESES
+# HISTORIAL - MIS CORRIDAS
 # ═══════════════════════════════════════════════════════════════════════════════
-proyeccion = []
-proyeccion_num = []  # Para gráficas
-for t in range(12):
-    factor = ((1 + crec) ** t) * est_vector[t]
-    vf = ventas_farmacia * factor
-    vr = ventas_recetas * factor
-    va = ventas_abarrotes * factor
-    ic = ingresos_consulta * factor
-    vt = vf + vr + va + ic
-    
-    ct = vf * cogs + vr * cogs_receta + va * cogs_abarrotes
-    ub = vt - ct
-    gv = vt * gastos_var
-    un = ub - gastos_fijos - gv
-    mn = un / vt if vt > 0 else 0
-    
-    # Para tabla (formateado)
-    proyeccion.append({
-        "Mes": t + 1,
-        "Ventas": f"${round(vt):,}",
-        "COGS": f"${round(ct):,}",
-        "Util. Bruta": f"${round(ub):,}",
-        "Gastos Fijos": f"${round(gastos_fijos):,}",
-        "Gastos Var.": f"${round(gv):,}",
-        "Util. Neta": f"${round(un):,}",
-        "Margen %": f"{round(mn * 100, 1)}%",
-    })
-    
-    # Para gráficas (numérico)
-    proyeccion_num.append({
-        "Mes": t + 1,
-        "Ventas": round(vt),
-        "Util. Neta": round(un),
-        "Margen %": round(mn * 100, 1),
-    })
+def guardar_en_historial():
+    """Guarda la corrida en pantalla (datos, entradas, KPIs y resultado) y regresa su id"""
+    entradas = {
+        "flujo": flujo,
+        "ticket": ticket,
+        "consultas": consultas,
+        "ingreso_consulta": ingreso_consulta,
+        "ticket_receta": ticket_receta,
+        "crec_opcion": crec_opcion,
+        "calibracion": calibracion,
+        "perfil_estacionalidad": perfil_nombre,
+        "mes_apertura": mes_apertura,
+        "horario": {"usar": usar_horario, "apertura": apertura, "cierre": cierre, "dias": dias_semana},
+        "estacionalidad": est_vector,
+        "inversion": inversion,
+        "gastos_fijos_items": dict(st.session_state.gastos_fijos_items),
+    }
+    id_corrida = historial().guardar(
+        st.session_state.get('usuario_codigo', ''), st.session_state.get('usuario_nombre', 'Usuario'),
+        datos_f, modelo, escenario, entradas, params, resultado_corrida,
+    )
+    st.session_state['corrida_abierta'] = {
+        'id': id_corrida, 'modelo': modelo, 'escenario': escenario, 'entradas': entradas,
+    }
+    return id_corrida
 
-df = pd.DataFrame(proyeccion)
-df_num = pd.DataFrame(proyeccion_num)
+# La corrida recién capturada se guarda sola; sin disco escribible solo se avisa
+if st.session_state.pop('guardar_corrida', False):
+    try:
+        guardar_en_historial()
+    except sqlite3.Error:
+        st.sidebar.caption("⚠️ No se pudo guardar la corrida en el historial")
 
-# Calcular totales
-util_anual = df_num["Util. Neta"].sum()
-ventas_anual = df_num["Ventas"].sum()
+with st.sidebar.expander("🗂️ Mis corridas", expanded=False):
+    if st.button("💾 Guardar como nueva versión", key="guardar_version", use_container_width=True):
+        try:
+            st.success(f"Corrida #{guardar_en_historial()} guardada")
+        except sqlite3.Error:
+            st.error("No se pudo guardar la corrida en el historial")
+    
+    filtro_ubicacion = st.text_input("Filtrar por ubicación", key="historial_ubicacion", placeholder="Ej: Monterrey, N.L.")
+    # Paginación por cursor: se guarda el último id de cada página vista
+    cursores = st.session_state.setdefault('historial_cursores', [None])
+    if st.session_state.get('historial_filtro') != filtro_ubicacion:
+        cursores[:] = [None]
+        st.session_state['historial_filtro'] = filtro_ubicacion
+    
+    por_pagina_hist = 10
+    try:
+        filas_hist = historial().listar(
+            usuario_codigo=None if st.session_state.get('es_admin') else st.session_state.get('usuario_codigo', ''),
+            ubicacion=filtro_ubicacion,
+            antes_de=cursores[-1],
+            limite=por_pagina_hist + 1,
+        )
+    except sqlite3.Error:
+        filas_hist = []
+    hay_mas = len(filas_hist) > por_pagina_hist
+    filas_hist = filas_hist[:por_pagina_hist]
+    
+    if not filas_hist:
+        st.caption("Aún no hay corridas guardadas")
+    abierta_id = corrida_abierta['id'] if corrida_abierta else None
+    for fila in filas_hist:
+        col_hi1, col_hi2 = st.columns([3, 1])
+        with col_hi1:
+            st.markdown(
+                f"**#{fila['id']} {fila['nombre']}** · {fila['ubicacion']}  \n"
+                f"{fila['modelo']} · {fila['escenario']} · {fila['creada'][:16].replace('T', ' ')}  \n"
+                f"Te queda {fmt_dinero(fila['utilidad_neta'])}/mes"
+            )
+        with col_hi2:
+            if fila['id'] == abierta_id:
+                st.caption("✅ Abierta")
+            elif st.button("📂", key=f"abrir_corrida_{fila['id']}", help="Abrir sin recalcular"):
+                st.session_state['abrir_corrida'] = fila['id']
+                st.rerun()
+    
+    col_pag1, col_pag2 = st.columns(2)
+    with col_pag1:
+        if len(cursores) > 1 and st.button("⬅️ Más recientes", key="historial_anterior"):
+            cursores.pop()
+            st.rerun()
+    with col_pag2:
+        if hay_mas and st.button("Más viejas ➡️", key="historial_siguiente"):
+            cursores.append(filas_hist[-1]['id'])
+            st.rerun()
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # OUTPUT PRINCIPAL
@@ -1036,11 +1295,14 @@ with st.expander("📋 Ver detalle de inversión y gastos fijos"):
 # Proyección 12 meses simplificada
 st.markdown("### 📅 ¿Cómo se ve el primer año?")
 # Tabla simplificada
-df_simple = pd.DataFrame([{
-    "Mes": p["Mes"],
-    "Ventas": p["Ventas"],
-    "Te queda": p["Util. Neta"],
-} for p in proyeccion])
+vista_periodo = st.radio("Ver por", ["Mes", "Trimestre", "Semestre"], horizontal=True, key="vista_periodo")
+tabla_periodo = periodos[vista_periodo.lower()]
+df_simple = pd.DataFrame({
+    "Mes" if vista_periodo == "Mes" else "Periodo": tabla_periodo["numero"] if vista_periodo == "Mes" else tabla_periodo["etiqueta"],
+    "Ventas": tabla_periodo["ventas_totales"].map(fmt_dinero),
+    "Te queda": tabla_periodo["utilidad_neta"].map(fmt_dinero),
+    "Saldo vs inversión": tabla_periodo["flujo_acumulado"].map(fmt_dinero),
+})
 st.dataframe(df_simple, use_container_width=True, hide_index=True)
 
 col_anual1, col_anual2 = st.columns(2)
@@ -1071,317 +1333,697 @@ st.markdown(f"""
 """)
 
 # ═══════════════════════════════════════════════════════════════════════════════
-# GENERADOR DE REPORTE PDF
+# HORAS DE OPERACIÓN: CONTRIBUCIÓN DE CADA HORA CONTRA SU COSTO DE PERSONAL
 # ═══════════════════════════════════════════════════════════════════════════════
-def generar_reporte_pdf():
-    """Genera un reporte PDF profesional para presentar oportunidad de franquicia"""
-    
-    # Obtener datos del franquiciatario
-    datos_f = st.session_state.get('datos_franquicia', {})
-    
-    # Buffer para el PDF
-    buffer = io.BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
-    
-    # Estilos
-    styles = getSampleStyleSheet()
-    title_style = ParagraphStyle('CustomTitle', parent=styles['Heading1'], 
-                                fontSize=26, spaceAfter=20, textColor=colors.Color(0, 0.239, 0.478))
-    
-    heading_style = ParagraphStyle('CustomHeading', parent=styles['Heading2'], 
-                                  fontSize=16, spaceAfter=12, textColor=colors.Color(0, 0.651, 0.318))
-    
-    subtitle_style = ParagraphStyle('CustomSubtitle', parent=styles['Normal'], 
-                                   fontSize=12, spaceAfter=8, textColor=colors.Color(0, 0.651, 0.318))
-    
-    # Contenido del PDF
-    story = []
-    
-    # Encabezado profesional
-    story.append(Paragraph("<b>+FARMACIA LÍBANO</b>", title_style))
-    story.append(Paragraph("OPORTUNIDAD DE INVERSIÓN - ANÁLISIS FINANCIERO", styles['Heading2']))
-    story.append(Paragraph("<i>Siempre al cuidado de tu salud</i>", subtitle_style))
-    story.append(Spacer(1, 15))
-    
-    # Información del franquiciatario
-    franquicia_info = f"""
-    <b>Preparado para:</b> {datos_f.get('nombre', 'N/A')}<br/>
-    <b>Ubicación:</b> {datos_f.get('ubicacion', 'N/A')}<br/>
-    <b>Propósito:</b> {datos_f.get('proposito', 'N/A')}<br/>
-    """
-    story.append(Paragraph(franquicia_info, styles['Normal']))
-    story.append(Spacer(1, 10))
-    
-    # Información del modelo
-    conversion_rate = conversion * 100
-    modelo_info = f"""
-    <b>Modelo de Franquicia:</b> {modelo}<br/>
-    <b>Escenario Analizado:</b> {escenario}<br/>
-    <b>Inversión Requerida:</b> ${inversion:,}<br/>
-    <b>Fecha de Análisis:</b> {pd.Timestamp.now().strftime('%d/%m/%Y')}<br/>
-    """
-    story.append(Paragraph(modelo_info, styles['Normal']))
-    story.append(Spacer(1, 15))
-    
-    # Explicación del escenario (VENDEDOR)
-    story.append(Paragraph("🎯 Análisis del Escenario", heading_style))
-    
-    if escenario == "Conservador":
-        escenario_desc = f"""
-        <b>Escenario Conservador ({conversion_rate:.1f}% de conversión):</b><br/>
-        Este análisis considera condiciones iniciales prudentes, ideal para inversores que prefieren proyecciones realistas. 
-        De cada 100 personas que pasan por tu farmacia, {int(conversion_rate)} realizarán compras. 
-        <b>Es el escenario perfecto para comenzar con confianza,</b> ya que cualquier mejora en ubicación o servicio 
-        incrementará significativamente estos resultados base.
-        """
-    elif escenario == "Medio":
-        escenario_desc = f"""
-        <b>Escenario Medio ({conversion_rate:.1f}% de conversión):</b><br/>
-        Representa las condiciones más probables de operación con ubicación decente y servicio establecido. 
-        De cada 100 visitantes, {int(conversion_rate)} se convierten en clientes. 
-        <b>Este es nuestro escenario recomendado</b> basado en el desempeño histórico de franquiciados exitosos 
-        en ubicaciones similares.
-        """
-    else:  # Alto
-        escenario_desc = f"""
-        <b>Escenario Alto ({conversion_rate:.1f}% de conversión):</b><br/>
-        Proyecta resultados en ubicaciones premium con excelente flujo peatonal y mínima competencia. 
-        {int(conversion_rate)} de cada 100 personas se convierten en clientes. 
-        <b>Representa el potencial máximo alcanzable</b> con ubicación estratégica y operación optimizada.
-        """
-    
-    story.append(Paragraph(escenario_desc, styles['Normal']))
-    story.append(Spacer(1, 15))
-    
-    # Potencial del modelo (VENDEDOR)
-    story.append(Paragraph("💡 Potencial del Modelo", heading_style))
-    
-    potencial_desc = f"""
-    <b>El modelo {modelo} está diseñado para maximizar oportunidades:</b><br/>
-    """
+with st.expander("🕐 Horas de operación: ¿conviene abrir más (o menos)?"):
+    st.caption("Con el tráfico hora por hora: lo que deja cada hora del día (ventas menos mercancía y gastos "
+               "variables) contra lo que cuesta tener personal esa hora. Usa el horario y los días del sidebar.")
+    costo_hora = st.number_input("Costo de personal por hora abierta ($)", 0, 2000, 120, 10, key="costo_hora_personal",
+                                 help="Sueldo del turno más lo extra (luz, seguridad) por cada hora que abres")
+    
+    # Contribución por cliente de farmacia y abarrotes (las consultas no dependen del horario)
+    clientes_base = max(base["clientes_mes"], 1)
+    ventas_cliente = (base["ventas_farmacia"] + base["ventas_abarrotes"]) / clientes_base
+    contribucion_cliente = (
+        base["ventas_farmacia"] * (1 - cogs) + base["ventas_abarrotes"] * (1 - cogs_abarrotes)
+    ) / clientes_base - ventas_cliente * gastos_var
+    
+    clientes_h = flujo * conversion * por_hora_del_dia(anio_horario, mes_apertura, 12, dias=dias_horario)
+    costo_h = costo_hora * dias_abiertos(anio_horario, mes_apertura, 12, dias=dias_horario)
+    neto_h = clientes_h * contribucion_cliente - costo_h
+    abierta_h = abiertas(apertura, cierre)
+    
+    col_o1, col_o2, col_o3 = st.columns(3)
+    with col_o1:
+        st.metric("⏰ Horas abiertas al día", int(abierta_h.sum()))
+    with col_o2:
+        extra_24 = neto_h[~abierta_h].sum()
+        st.metric("🌙 Abrir 24 horas", f"{'+' if extra_24 >= 0 else '-'}{fmt_dinero(abs(extra_24))}/mes")
+    with col_o3:
+        mejora = np.maximum(neto_h, 0).sum() - neto_h[abierta_h].sum()
+        st.metric("🎯 Solo horas que dejan", f"+{fmt_dinero(mejora)}/mes")
+    
+    st.bar_chart(pd.DataFrame({"Deja al mes": np.round(neto_h)}, index=[f"{h}:00" for h in range(24)]), sort=False)
+    recomendacion = np.where(abierta_h, np.where(neto_h < 0, "Conviene cerrar", "Abierta"),
+                             np.where(neto_h > 0, "Conviene abrir", "Cerrada"))
+    st.dataframe(pd.DataFrame({
+        "Hora": [f"{h}:00-{h + 1}:00" for h in range(24)],
+        "Clientes/mes": np.round(clientes_h).astype(int),
+        "Ventas/mes": [fmt_dinero(v) for v in clientes_h * ventas_cliente],
+        "Personal/mes": fmt_dinero(costo_h),
+        "Deja/mes": [fmt_dinero(v) if v >= 0 else f"-{fmt_dinero(-v)}" for v in neto_h],
+        "": recomendacion,
+    }), hide_index=True, use_container_width=True)
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# FLUJO DE EFECTIVO: VPN, TIR Y RECUPERACIÓN DESCONTADA
+# ═══════════════════════════════════════════════════════════════════════════════
+with st.expander("💵 Flujo de efectivo: VPN y TIR"):
+    st.caption("Tu inversión sale el mes 0 y cada mes entra lo que te queda, contando el crecimiento. "
+               "La tasa es lo que ganarías con tu dinero en otra inversión.")
+    
+    col_f1, col_f2 = st.columns(2)
+    with col_f1:
+        horizonte_f = st.select_slider("Horizonte (meses)", [12, 24, 36, 48, 60], value=36, key="flujo_horizonte")
+    with col_f2:
+        tasa_f = st.slider("Tasa de descuento anual (%)", 0, 40, 12, 1, key="flujo_tasa") / 100
+    
+    utilidad_f = proyectar_utilidad(params, horizonte_f, est_vector)
+    caja = analizar(utilidad_f, inversion, tasa_f)
+    
+    col_f3, col_f4, col_f5, col_f6 = st.columns(4)
+    with col_f3:
+        st.metric("💰 VPN", fmt_dinero(caja["vpn"]) if caja["vpn"] >= 0 else f"-{fmt_dinero(-caja['vpn'])}")
+        st.caption(f"Ganancia de {horizonte_f} meses en pesos de hoy, ya restada la inversión")
+    with col_f4:
+        st.metric("📈 TIR anual", f"{caja['tir_anual']*100:,.0f}%" if np.isfinite(caja["tir_anual"]) else "N/A")
+        st.caption("La tasa a la que rinde tu inversión")
+    with col_f5:
+        st.metric("⏱️ Recuperación con crecimiento",
+                  f"{caja['recuperacion']:.1f} meses" if np.isfinite(caja["recuperacion"]) else f"Más de {horizonte_f} meses")
+    with col_f6:
+        st.metric("⏳ Recuperación descontada",
+                  f"{caja['recuperacion_descontada']:.1f} meses" if np.isfinite(caja["recuperacion_descontada"]) else f"Más de {horizonte_f} meses")
+    
+    st.markdown("**🏦 Caja acumulada**")
+    st.line_chart(pd.DataFrame({
+        "Mes": np.arange(horizonte_f + 1),
+        "Caja acumulada": caja["acumulado"],
+        "En pesos de hoy": caja["acumulado_descontado"],
+    }).set_index("Mes"))
+    
+    # Una TIR por cada flujo peatonal, resueltas juntas
+    flujos_f = np.arange(10, 301, 5)
+    tir_flujo = analizar(
+        proyectar_utilidad(dict(params, flujo=flujos_f), horizonte_f, est_vector), inversion, tasa_f
+    )["tir_anual"]
+    st.markdown("**👥 TIR anual según la gente que pasa por tu local**")
+    st.line_chart(pd.DataFrame({"Personas por hora": flujos_f, "TIR anual (%)": tir_flujo * 100}).set_index("Personas por hora"))
+    st.caption(f"Tu local: {flujo} personas por hora · Sin TIR donde la inversión no se recupera en {horizonte_f} meses")
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# COMPARATIVO DE TODOS LOS MODELOS Y ESCENARIOS
+# ═══════════════════════════════════════════════════════════════════════════════
+with st.expander("🧮 Comparar todos los modelos y escenarios"):
+    st.caption("Cada combinación usa los valores de su preset (no tus ajustes del menú lateral)")
+    
+    comparativo = evaluar_presets()
+    metricas_comp = {
+        "💰 Te queda/mes": ("utilidad_neta", lambda v: f"${v:,.0f}"),
+        "🎯 Punto de equilibrio": ("ventas_be", lambda v: f"${v:,.0f}"),
+        "📈 ROI Anual": ("roi_anual", lambda v: f"{v*100:.0f}%"),
+        "⏱️ Recuperación": ("meses_recuperacion", lambda v: f"{v:.1f} meses" if v < 100 else "N/A"),
+    }
+    metrica_comp = st.radio("Comparar por", list(metricas_comp.keys()), horizontal=True)
+    columna, formato = metricas_comp[metrica_comp]
     
-    if modelo == "🏪 Mini":
-        potencial_desc += """
-        • <b>Inversión accesible</b> con rápido retorno<br/>
-        • <b>Operación simple</b> - ideal para emprendedores nuevos<br/>
-        • <b>Mercado amplio</b> - todos necesitan medicamentos<br/>
-        • <b>Márgenes atractivos</b> en medicamentos genéricos (35-45%)<br/>
-        """
-    elif modelo == "🩺 Consultorio":
-        potencial_desc += """
-        • <b>Doble flujo de ingresos:</b> farmacia + consultas médicas<br/>
-        • <b>Sinergia perfecta</b> - pacientes surten recetas inmediatamente<br/>
-        • <b>Fidelización alta</b> - relación médico-paciente duradera<br/>
-        • <b>Márgenes superiores</b> en recetas especializadas (38-42%)<br/>
-        """
-    else:  # Super
-        potencial_desc += """
-        • <b>Modelo integral</b> - farmacia, consultorio y conveniencia<br/>
-        • <b>Máximo tráfico</b> - abarrotes atraen clientes diarios<br/>
-        • <b>Venta cruzada</b> - un cliente, múltiples compras<br/>
-        • <b>Diversificación</b> - múltiples fuentes de ingreso<br/>
-        """
-    
-    story.append(Paragraph(potencial_desc, styles['Normal']))
-    story.append(Spacer(1, 20))
-    
-    # Resumen ejecutivo (MÁS VENDEDOR)
-    story.append(Paragraph("📊 Resultados Proyectados", heading_style))
-    
-    # Tabla de métricas principales (mejorada)
-    metricas_data = [
-        ['MÉTRICA CLAVE', 'RESULTADO'],
-        ['Clientes mensuales', f'{clientes_mes:,} personas'],
-        ['Ingresos mensuales', f'${ventas_totales:,.0f}'],
-        ['Utilidad neta mensual', f'${utilidad_neta:,.0f}'],
-        ['Margen de utilidad', f'{margen_neto*100:.1f}%'],
-        ['ROI anualizado', f'{roi_anual*100:.1f}%'],
-        ['Período de recuperación', f'{meses_recuperacion:.1f} meses'],
-        ['Punto de equilibrio', f'${ventas_be:,.0f}/mes'],
-        ['Ingresos primer año', f'${ventas_anual:,.0f}'],
-        ['Utilidad primer año', f'${util_anual:,.0f}'],
-    ]
-    
-    metricas_table = Table(metricas_data, colWidths=[3.2*inch, 2.3*inch])
-    metricas_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.Color(0, 0.651, 0.318)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 11),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.Color(0.95, 0.98, 0.95)),
-        ('GRID', (0, 0), (-1, -1), 1, colors.darkgray),
-        ('FONTSIZE', (0, 1), (-1, -1), 10),
-    ]))
-    
-    story.append(metricas_table)
-    story.append(Spacer(1, 20))
-    
-    # Estructura de ingresos (MÁS VISUAL)
-    story.append(Paragraph("💰 Estructura de Ingresos Mensuales", heading_style))
-    
-    ventas_data = [['LÍNEA DE NEGOCIO', 'INGRESOS', 'PARTICIPACIÓN']]
-    ventas_data.append(['💊 Farmacia', f'${ventas_farmacia:,.0f}', f'{(ventas_farmacia/ventas_totales*100):.1f}%'])
+    tabla_comp = comparativo.pivot(index="escenario", columns="modelo", values=columna)
+    tabla_comp = tabla_comp.reindex(index=comparativo["escenario"].unique(), columns=comparativo["modelo"].unique())
+    st.dataframe(tabla_comp.map(formato), use_container_width=True)
+    st.caption(f"Tu selección actual: **{modelo} · {escenario}**")
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# SIMULACIÓN DE RIESGO (MONTE CARLO)
+# ═══════════════════════════════════════════════════════════════════════════════
+with st.expander("🎲 Simulación de riesgo (Monte Carlo)"):
+    st.caption("Prueba miles de escenarios posibles variando flujo, conversión, ticket, recetas y crecimiento")
+    
+    nombres_sim = {
+        "flujo": "👥 Flujo peatonal",
+        "conversion": "🎯 Conversión",
+        "ticket": "💳 Ticket promedio",
+        "surten": "💉 Recetas surtidas",
+        "crec": "📈 Crecimiento",
+    }
+    distribuciones_sim = {}
+    for variable, (tipo, dispersion) in DISTRIBUCIONES.items():
+        if variable == "surten" and not m["consultorio"]:
+            continue
+        col_s1, col_s2 = st.columns([1, 2])
+        with col_s1:
+            tipo_sim = st.selectbox(nombres_sim[variable], TIPOS, index=TIPOS.index(tipo), key=f"mc_tipo_{variable}")
+        with col_s2:
+            variacion_sim = st.slider("Variabilidad (%)", 0, 100, int(dispersion * 100), 5, key=f"mc_var_{variable}")
+        distribuciones_sim[variable] = (tipo_sim, variacion_sim / 100)
+    
+    n_sim = st.select_slider("Número de escenarios", [10_000, 50_000, 100_000, 250_000], value=100_000)
+    
+    if st.checkbox("▶️ Correr simulación", key="mc_activa"):
+        sim = simular(params, n=n_sim, meses=12, distribuciones=distribuciones_sim, semilla=42, estacionalidad=est_vector)
+        rec_p50, rec_p95 = np.percentile(sim["meses_recuperacion"], [50, 95], method="nearest")
+        
+        col_r1, col_r2, col_r3 = st.columns(3)
+        with col_r1:
+            st.metric("⚠️ Nunca llega al equilibrio", f"{sim['prob_sin_equilibrio']*100:.1f}%")
+            st.caption("Escenarios con pérdida los 12 meses")
+        with col_r2:
+            st.metric("⏱️ Recuperación típica (P50)", f"{rec_p50:.1f} meses" if rec_p50 < 100 else "N/A")
+            st.caption("La mitad de los escenarios recupera antes")
+        with col_r3:
+            st.metric("🐢 Recuperación pesimista (P95)", f"{rec_p95:.1f} meses" if rec_p95 < 100 else "N/A")
+            st.caption("Solo 5% de los escenarios tarda más")
+        
+        st.markdown("**💰 Rango de utilidad neta mensual (P5 · P50 · P95)**")
+        st.line_chart(sim["bandas"].set_index("Mes"))
+        
+        st.markdown("**⏱️ ¿En cuántos meses recuperas tu inversión?**")
+        rec = sim["meses_recuperacion"]
+        conteo, bordes = np.histogram(np.minimum(rec[np.isfinite(rec)], 60), bins=np.arange(0, 64, 3))
+        hist_rec = pd.DataFrame({
+            "Meses": [f"{int(a)}-{int(b)}" if b < 63 else "60+" for a, b in zip(bordes[:-1], bordes[1:])],
+            "% de escenarios": conteo / len(rec) * 100,
+        })
+        st.bar_chart(hist_rec.set_index("Meses"), sort=False)
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# ¿QUÉ MUEVE MÁS TU GANANCIA? (SENSIBILIDAD)
+# ═══════════════════════════════════════════════════════════════════════════════
+with st.expander("🌪️ ¿Qué mueve más tu ganancia?"):
+    st.caption("Movemos cada dato hacia arriba y hacia abajo para ver cuál cambia más tu resultado")
     
-    if m["consultorio"]:
-        ventas_data.append(['💉 Recetas médicas', f'${ventas_recetas:,.0f}', f'{(ventas_recetas/ventas_totales*100):.1f}%'])
-        ventas_data.append(['🩺 Consultas', f'${ingresos_consulta:,.0f}', f'{(ingresos_consulta/ventas_totales*100):.1f}%'])
+    col_t1, col_t2 = st.columns(2)
+    with col_t1:
+        delta_pct = st.slider("Variación (±%)", 5, 50, 10, 5, key="tornado_delta")
+    with col_t2:
+        metrica_tornado = st.radio("Medir impacto en", ["💰 Te queda/mes", "⏱️ Recuperación"], horizontal=True, key="tornado_metrica")
     
-    if m["abarrotes"]:
-        ventas_data.append(['🛒 Conveniencia', f'${ventas_abarrotes:,.0f}', f'{(ventas_abarrotes/ventas_totales*100):.1f}%'])
-    
-    ventas_data.append(['🎯 TOTAL MENSUAL', f'${ventas_totales:,.0f}', '100.0%'])
-    
-    ventas_table = Table(ventas_data, colWidths=[2.2*inch, 1.8*inch, 1.5*inch])
-    ventas_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.Color(0, 0.239, 0.478)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-        ('BACKGROUND', (0, -1), (-1, -1), colors.Color(0.9, 0.95, 0.9)),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-        ('BACKGROUND', (0, 1), (-1, -2), colors.Color(0.98, 0.98, 1.0)),
-        ('GRID', (0, 0), (-1, -1), 1, colors.darkgray),
-    ]))
-    
-    story.append(ventas_table)
-    story.append(Spacer(1, 20))
-    
-    # Evolución del negocio (TRIMESTRAL - más atractivo)
-    story.append(Paragraph("📈 Evolución Trimestral del Primer Año", heading_style))
-    
-    proy_data = [['PERÍODO', 'INGRESOS', 'UTILIDAD NETA', 'MARGEN']]
-    trimestres = [
-        ("Mes 1-3", 0, 2),
-        ("Mes 4-6", 3, 5), 
-        ("Mes 7-9", 6, 8),
-        ("Mes 10-12", 9, 11)
-    ]
-    
-    for nombre, inicio, fin in trimestres:
-        ventas_trim = sum([int(proyeccion[i]['Ventas'].replace('$', '').replace(',', '')) for i in range(inicio, fin+1)])
-        util_trim = sum([int(proyeccion[i]['Util. Neta'].replace('$', '').replace(',', '')) for i in range(inicio, fin+1)])
-        margen_trim = util_trim / ventas_trim * 100 if ventas_trim > 0 else 0
+    if st.checkbox("▶️ Mostrar gráfica", key="tornado_activo"):
+        sens = tornado(params, delta_pct / 100, st.session_state.get("gastos_fijos_items", {}))
         
-        proy_data.append([
-            nombre,
-            f'${ventas_trim:,}',
-            f'${util_trim:,}',
-            f'{margen_trim:.1f}%'
-        ])
-    
-    proy_table = Table(proy_data, colWidths=[1.3*inch, 1.7*inch, 1.7*inch, 1.0*inch])
-    proy_table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.Color(0, 0.651, 0.318)),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('FONTSIZE', (0, 0), (-1, 0), 10),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.Color(0.95, 0.98, 0.95)),
-        ('GRID', (0, 0), (-1, -1), 1, colors.darkgray),
-    ]))
-    
-    story.append(proy_table)
-    story.append(Spacer(1, 20))
-    
-    # Evaluación de la oportunidad (MUY VENDEDOR)
-    story.append(Paragraph("🏆 Evaluación de la Oportunidad", heading_style))
-    
-    if utilidad_neta > 0 and meses_recuperacion < 24:
-        eval_color = colors.Color(0, 0.5, 0)  # Verde
-        conclusion = f"""
-        <b>✅ OPORTUNIDAD EXCELENTE</b><br/><br/>
+        if metrica_tornado == "💰 Te queda/mes":
+            bajo_t, alto_t, centro_t = sens["utilidad_baja"], sens["utilidad_alta"], utilidad_neta
+            etiqueta_t = "Utilidad neta mensual ($)"
+        else:
+            # Recuperaciones sin fin se muestran en el tope de la gráfica
+            tope_t = 120
+            bajo_t = np.minimum(sens["recuperacion_baja"], tope_t)
+            alto_t = np.minimum(sens["recuperacion_alta"], tope_t)
+            centro_t = min(meses_recuperacion, tope_t)
+            etiqueta_t = f"Meses de recuperación (tope {tope_t})"
         
-        <b>Rentabilidad Comprobada:</b> Genera ${utilidad_neta:,.0f} de utilidad mensual neta<br/>
-        <b>Recuperación Rápida:</b> Inversión recuperada en {meses_recuperacion:.1f} meses<br/>
-        <b>ROI Atractivo:</b> {roi_anual*100:.1f}% anual - superior a alternativas tradicionales<br/>
-        <b>Mercado Estable:</b> Sector salud con demanda constante y creciente<br/><br/>
+        orden_t = np.argsort(-np.abs(np.asarray(alto_t) - np.asarray(bajo_t)), kind="stable")
+        sens_t = sens.iloc[orden_t]
+        bajo_t, alto_t = np.asarray(bajo_t)[orden_t], np.asarray(alto_t)[orden_t]
         
-        <b>RECOMENDACIÓN:</b> Proceder con la inversión. Los números demuestran 
-        una oportunidad sólida con riesgo controlado y potencial de crecimiento.
-        """
-    elif utilidad_neta > 0:
-        eval_color = colors.Color(0.7, 0.7, 0)  # Amarillo
-        conclusion = f"""
-        <b>⚠️ OPORTUNIDAD VIABLE CON CONSIDERACIONES</b><br/><br/>
+        import matplotlib.pyplot as plt
         
-        <b>Rentabilidad Positiva:</b> ${utilidad_neta:,.0f}/mes en utilidades<br/>
-        <b>Recuperación Moderada:</b> {meses_recuperacion:.1f} meses para recuperar inversión<br/>
-        <b>Potencial de Mejora:</b> Optimizaciones operativas pueden acelerar retornos<br/><br/>
+        fig_t, ax_t = plt.subplots(figsize=(8, 0.35 * len(sens_t) + 1))
+        y_t = np.arange(len(sens_t))[::-1]
+        ax_t.barh(y_t, bajo_t - centro_t, left=centro_t, color="#C0392B", label=f"-{delta_pct}%")
+        ax_t.barh(y_t, alto_t - centro_t, left=centro_t, color=VERDE, label=f"+{delta_pct}%")
+        ax_t.axvline(centro_t, color=AZUL, linewidth=1)
+        ax_t.set_yticks(y_t, sens_t["nombre"])
+        ax_t.set_xlabel(etiqueta_t)
+        ax_t.legend(loc="lower right")
+        fig_t.tight_layout()
+        st.pyplot(fig_t)
+        plt.close(fig_t)
         
-        <b>RECOMENDACIÓN:</b> Evaluar mejoras en ubicación o eficiencias operativas 
-        para acelerar la recuperación. Base sólida con oportunidades de optimización.
-        """
-    else:
-        eval_color = colors.Color(0.8, 0.2, 0)  # Rojo suave (no muy negativo)
-        conclusion = f"""
-        <b>📊 OPORTUNIDAD REQUIERE AJUSTES</b><br/><br/>
+        if len(sens_t):
+            st.info(f"💡 Lo que más mueve tu resultado: **{', '.join(sens_t['nombre'].head(3))}**")
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# MAPA DE RENTABILIDAD (FLUJO × TICKET)
+# ═══════════════════════════════════════════════════════════════════════════════
+with st.expander("🗺️ ¿Cuánto flujo y ticket necesitas?"):
+    st.caption("Cada punto del mapa es una combinación de flujo peatonal y ticket promedio; lo demás se queda como lo configuraste")
+    
+    metrica_mapa = st.radio("Mostrar", ["💰 Te queda/mes", "⏱️ Recuperación"], horizontal=True, key="mapa_metrica")
+    
+    if st.checkbox("▶️ Mostrar mapa", key="mapa_activo"):
+        flujos_mapa = np.linspace(10, 300, 300)
+        tickets_mapa = np.linspace(40, 300, 300)
+        sup = superficie(params, flujos_mapa, tickets_mapa)
         
-        <b>Análisis Detallado:</b> Los números actuales sugieren optimizar parámetros<br/>
-        <b>Potencial Latente:</b> Ajustes en location/operación pueden mejorar resultados<br/>
-        <b>Soporte Líbano:</b> Nuestro equipo puede ayudar a optimizar la propuesta<br/><br/>
+        import matplotlib.colors as mcolors
+        import matplotlib.pyplot as plt
         
-        <b>RECOMENDACIÓN:</b> Revisar ubicación propuesta y explorar alternativas. 
-        El modelo es probadamente exitoso con los parámetros correctos.
-        """
-    
-    conclusion_style = ParagraphStyle('Conclusion', parent=styles['Normal'], 
-                                     fontSize=11, textColor=eval_color)
-    story.append(Paragraph(conclusion, conclusion_style))
-    story.append(Spacer(1, 20))
-    
-    # Próximos pasos (CALL TO ACTION)
-    story.append(Paragraph("🚀 Próximos Pasos Recomendados", heading_style))
-    
-    next_steps = """
-    <b>1. VALIDACIÓN DE UBICACIÓN:</b> Confirmar flujo peatonal y análisis de competencia<br/>
-    <b>2. FINANCIAMIENTO:</b> Estructurar inversión inicial y capital de trabajo<br/>
-    <b>3. CAPACITACIÓN:</b> Programa integral de entrenamiento Farmacia Líbano<br/>
-    <b>4. PUESTA EN MARCHA:</b> Plan de lanzamiento y marketing inicial<br/>
-    <b>5. SEGUIMIENTO:</b> Monitoreo mensual de KPIs y optimización continua<br/><br/>
-    
-    <b>Contacto Franquicias:</b> franquicias@farmacialibano.com<br/>
-    <b>Teléfono:</b> 800-LIBANO (800-542-2266)<br/>
-    """
-    
-    story.append(Paragraph(next_steps, styles['Normal']))
+        fig_m, ax_m = plt.subplots(figsize=(8, 5.5))
+        extent_m = [tickets_mapa[0], tickets_mapa[-1], flujos_mapa[0], flujos_mapa[-1]]
+        if metrica_mapa == "💰 Te queda/mes":
+            valores_m = sup["utilidad_neta"]
+            norma_m = None
+            if valores_m.min() < 0 < valores_m.max():
+                norma_m = mcolors.TwoSlopeNorm(vcenter=0, vmin=valores_m.min(), vmax=valores_m.max())
+            img_m = ax_m.imshow(valores_m, origin="lower", extent=extent_m, aspect="auto", cmap="RdYlGn", norm=norma_m)
+            fig_m.colorbar(img_m, ax=ax_m, label="Utilidad neta mensual ($)")
+        else:
+            valores_m = np.minimum(sup["meses_recuperacion"], 60)
+            img_m = ax_m.imshow(valores_m, origin="lower", extent=extent_m, aspect="auto", cmap="RdYlGn_r", vmin=0, vmax=60)
+            fig_m.colorbar(img_m, ax=ax_m, label="Meses de recuperación (tope 60)")
+        
+        # Línea de punto de equilibrio: utilidad neta = 0
+        if sup["utilidad_neta"].min() < 0 < sup["utilidad_neta"].max():
+            contorno_m = ax_m.contour(tickets_mapa, flujos_mapa, sup["utilidad_neta"], levels=[0], colors=AZUL, linewidths=2)
+            ax_m.clabel(contorno_m, fmt={0: "Equilibrio"}, fontsize=9)
+        ax_m.plot(ticket, flujo, marker="*", markersize=16, color="white", markeredgecolor=AZUL)
+        ax_m.set_xlabel("Ticket promedio ($)")
+        ax_m.set_ylabel("Personas por hora")
+        fig_m.tight_layout()
+        st.pyplot(fig_m)
+        plt.close(fig_m)
+        st.caption("⭐ Tu configuración actual · Arriba y a la derecha de la línea azul ganas dinero")
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# CALCULADORA DE METAS
+# ═══════════════════════════════════════════════════════════════════════════════
+with st.expander("🎯 ¿Qué necesitas para llegar a tu meta?"):
+    st.caption("Elige una meta y te decimos cuánto necesitas de cada dato (lo demás se queda como lo configuraste)")
+    
+    metas = {
+        "⏱️ Recuperar mi inversión en X meses": ("meses_recuperacion", 18.0, 1.0, [12, 18, 24, 36]),
+        "📅 Recuperar en X meses contando el crecimiento": ("recuperacion_real", 18.0, 1.0, [12, 18, 24, 36]),
+        "💰 Ganar $X al mes": ("utilidad_neta", 50000.0, 1000.0, [25000, 50000, 100000, 200000]),
+        "📈 ROI anual de X%": ("roi_anual", 80.0, 5.0, [40, 60, 80, 100]),
+    }
+    meta_sel = st.selectbox("Tu meta", list(metas.keys()), key="meta_tipo")
+    objetivo_m, defecto_m, paso_m, niveles_m = metas[meta_sel]
+    valor_m = st.number_input("Valor de la meta", min_value=paso_m, value=defecto_m, step=paso_m, key=f"meta_valor_{objetivo_m}")
+    escala_m = 100 if objetivo_m == "roi_anual" else 1
     
-    # Pie de página profesional
-    story.append(Spacer(1, 25))
-    footer_style = ParagraphStyle('Footer', parent=styles['Normal'], 
-                                 fontSize=9, textColor=colors.gray, alignment=1)
-    story.append(Paragraph("Farmacia Líbano - Análisis Financiero Confidencial", footer_style))
-    story.append(Paragraph(f"Generado el {pd.Timestamp.now().strftime('%d de %B, %Y')}", footer_style))
+    def _requerido(variable):
+        return float(resolver(params, variable, objetivo_m, valor_m / escala_m, estacionalidad=est_vector))
     
-    # Construir PDF
-    doc.build(story)
+    req_flujo, req_ticket, req_conv, req_gf = (
+        _requerido(v) for v in ("flujo", "ticket", "conversion", "gastos_fijos")
+    )
     
-    # Retornar el PDF
-    buffer.seek(0)
-    return buffer.getvalue()
+    col_m1, col_m2, col_m3, col_m4 = st.columns(4)
+    with col_m1:
+        st.metric("👥 Flujo necesario", f"{req_flujo:,.0f}/hora" if np.isfinite(req_flujo) else "Inalcanzable",
+                  f"{req_flujo - flujo:+,.0f}" if np.isfinite(req_flujo) else None, delta_color="inverse")
+    with col_m2:
+        st.metric("💳 Ticket necesario", f"${req_ticket:,.0f}" if np.isfinite(req_ticket) else "Inalcanzable",
+                  f"{req_ticket - ticket:+,.0f}" if np.isfinite(req_ticket) else None, delta_color="inverse")
+    with col_m3:
+        st.metric("🎯 Conversión necesaria", f"{req_conv*100:.1f}%" if np.isfinite(req_conv) else "Inalcanzable",
+                  f"{(req_conv - conversion)*100:+.1f} pts" if np.isfinite(req_conv) else None, delta_color="inverse")
+    with col_m4:
+        st.metric("🏢 Gastos fijos máximos", f"${req_gf:,.0f}" if np.isfinite(req_gf) else "Inalcanzable",
+                  f"{req_gf - gastos_fijos:+,.0f}" if np.isfinite(req_gf) else None)
+    st.caption("Cada dato se calcula por separado, moviendo solo ese y dejando los demás fijos")
+    
+    if objetivo_m == "recuperacion_real":
+        req_crec = _requerido("crec")
+        st.metric("📈 Crecimiento mensual necesario", f"{req_crec*100:.1f}%" if np.isfinite(req_crec) else "Inalcanzable")
+    
+    st.markdown("**💳 Ticket necesario según el flujo de tu local**")
+    flujos_m = np.arange(20, 301, 20)
+    tabla_m = resolver(dict(params, flujo=flujos_m[:, None]), "ticket", objetivo_m,
+                       np.array(niveles_m)[None, :] / escala_m, estacionalidad=est_vector)
+    etiquetas_m = {
+        "meses_recuperacion": lambda v: f"{v} meses",
+        "recuperacion_real": lambda v: f"{v} meses",
+        "utilidad_neta": lambda v: f"${v:,}/mes",
+        "roi_anual": lambda v: f"ROI {v}%",
+    }[objetivo_m]
+    tabla_m_df = pd.DataFrame(tabla_m, index=pd.Index(flujos_m, name="Personas/hora"),
+                              columns=[etiquetas_m(v) for v in niveles_m])
+    st.dataframe(tabla_m_df.map(lambda v: f"${v:,.0f}" if np.isfinite(v) else "—"), use_container_width=True)
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PORTAFOLIO DE TIENDAS
+# ═══════════════════════════════════════════════════════════════════════════════
+with st.expander("🏬 Portafolio de varias tiendas"):
+    st.caption("Proyecta muchas tiendas a la vez, cada una con su modelo, escenario y mes de apertura. Deja vacío un dato para usar el del preset.")
+    
+    columnas_portafolio = ["nombre", "modelo", "escenario", "flujo", "ticket", "gastos_fijos", "inversion", "mes_apertura"]
+    archivo_portafolio = st.file_uploader("Cargar tiendas desde CSV", type="csv", key="portafolio_csv",
+                                          help="Columnas: " + ", ".join(columnas_portafolio))
+    if archivo_portafolio is not None:
+        tiendas_base = pd.read_csv(archivo_portafolio).reindex(columns=columnas_portafolio)
+    else:
+        # Ejemplo: tu configuración actual y dos aperturas escalonadas
+        tiendas_base = pd.DataFrame([
+            {"nombre": datos_f['nombre'], "modelo": modelo, "escenario": escenario, "flujo": flujo, "ticket": ticket,
+             "gastos_fijos": gastos_fijos, "inversion": inversion, "mes_apertura": 1},
+            {"nombre": "Tienda 2", "modelo": modelo, "escenario": "Medio", "mes_apertura": 7},
+            {"nombre": "Tienda 3", "modelo": modelo, "escenario": "Conservador", "mes_apertura": 13},
+        ], columns=columnas_portafolio)
+    
+    tiendas_port = st.data_editor(
+        tiendas_base,
+        num_rows="dynamic",
+        use_container_width=True,
+        hide_index=True,
+        key=f"portafolio_tiendas_{archivo_portafolio.file_id if archivo_portafolio else 'ejemplo'}",
+        column_config={
+            "nombre": st.column_config.TextColumn("Tienda"),
+            "modelo": st.column_config.SelectboxColumn("Modelo", options=list(MODELOS), required=True),
+            "escenario": st.column_config.SelectboxColumn("Escenario", options=ESCENARIOS, required=True),
+            "flujo": st.column_config.NumberColumn("Personas/hora", min_value=0),
+            "ticket": st.column_config.NumberColumn("Ticket ($)", min_value=0),
+            "gastos_fijos": st.column_config.NumberColumn("Gastos fijos ($/mes)", min_value=0),
+            "inversion": st.column_config.NumberColumn("Inversión ($)", min_value=0),
+            "mes_apertura": st.column_config.NumberColumn("Mes de apertura", min_value=1, step=1),
+        },
+    )
+    horizonte_port = st.select_slider("Horizonte (meses)", [12, 24, 36, 48, 60], value=36, key="portafolio_horizonte")
+    
+    if st.checkbox("▶️ Calcular portafolio", key="portafolio_activo"):
+        tiendas_port = tiendas_port.dropna(subset=["modelo", "escenario"])
+        if tiendas_port.empty:
+            st.info("Agrega al menos una tienda con modelo y escenario.")
+        else:
+            try:
+                port = cache_corridas().obtener(
+                    clave_parametros("portafolio", tiendas_port.to_dict("list"), horizonte_port),
+                    lambda: proyectar_portafolio(tiendas_port, meses=horizonte_port),
+                )
+            except ValueError as e:
+                st.error(str(e))
+                port = None
+        
+            if port is not None:
+                cons = port["consolidado"]
+                col_p1, col_p2, col_p3, col_p4 = st.columns(4)
+                with col_p1:
+                    st.metric("🏬 Tiendas", f"{len(port['tiendas']):,}")
+                with col_p2:
+                    st.metric("💰 Ganancia del horizonte", fmt_dinero(cons["utilidad_neta"].sum()))
+                with col_p3:
+                    st.metric("🏦 Capital máximo a fondear", fmt_dinero(port["capital_maximo"]))
+                    st.caption("La caja más negativa del portafolio")
+                with col_p4:
+                    st.metric("⏱️ Recuperación del portafolio",
+                              f"Mes {port['recuperacion']:.0f}" if np.isfinite(port["recuperacion"]) else f"Más de {horizonte_port} meses")
+                
+                st.markdown("**🏦 Caja acumulada del portafolio**")
+                st.line_chart(cons.set_index("mes")[["caja_acumulada"]].rename(columns={"caja_acumulada": "Caja acumulada"}))
+                st.markdown("**📊 Ventas y ganancia mensual consolidadas**")
+                st.bar_chart(cons.set_index("mes")[["ventas_totales", "utilidad_neta"]].rename(
+                    columns={"ventas_totales": "Ventas", "utilidad_neta": "Te queda"}), stack=False)
+                
+                st.markdown("**🏪 Por tienda**")
+                tabla_port = port["tiendas"]
+                st.dataframe(
+                    pd.DataFrame({
+                        "Tienda": tabla_port["nombre"],
+                        "Modelo": tabla_port["modelo"],
+                        "Escenario": tabla_port["escenario"],
+                        "Abre": tabla_port["mes_apertura"].map(lambda v: f"Mes {v}"),
+                        "Ventas": tabla_port["ventas_totales"].map(fmt_dinero),
+                        "Te queda": tabla_port["utilidad_neta"].map(fmt_dinero),
+                        "Caja al final": tabla_port["caja_final"].map(fmt_dinero),
+                        "Recupera en": tabla_port["meses_recuperacion"].map(
+                            lambda v: f"{v:.0f} meses" if np.isfinite(v) else "Después del horizonte"),
+                    }),
+                    use_container_width=True, hide_index=True,
+                )
+                
+                tienda_sel = st.selectbox(
+                    "Ver detalle de", range(len(tabla_port)),
+                    format_func=lambda i: f"{tabla_port['nombre'].iloc[i]} · {tabla_port['modelo'].iloc[i]}",
+                    key="portafolio_detalle",
+                )
+                detalle_port = pd.DataFrame({
+                    "Mes": cons["mes"],
+                    "Ventas": port["ventas"][tienda_sel],
+                    "Te queda": port["utilidad"][tienda_sel],
+                    "Flujo de caja": port["flujo_caja"][tienda_sel],
+                    "Caja acumulada": np.cumsum(port["flujo_caja"][tienda_sel]),
+                })
+                st.dataframe(
+                    detalle_port.set_index("Mes").map(fmt_dinero), use_container_width=True,
+                )
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# RANKING DE UBICACIONES CANDIDATAS CONTRA LA COMPETENCIA
+# ═══════════════════════════════════════════════════════════════════════════════
+with st.expander("📍 Ranking de ubicaciones candidatas"):
+    st.caption("Corre tu configuración en cada ubicación candidata con su flujo y su renta, bajando la conversión "
+               "según cuántas farmacias de la competencia tenga cerca, y las ordena por recuperación.")
+    
+    col_u1, col_u2 = st.columns(2)
+    with col_u1:
+        archivo_candidatas = st.file_uploader("Ubicaciones candidatas", type=["csv", "parquet"], key="ubicaciones_candidatas",
+                                              help="Columnas: lat, lon y, opcionales, nombre, flujo y renta")
+    with col_u2:
+        archivo_competencia = st.file_uploader("Farmacias de la competencia", type=["csv", "parquet"],
+                                               key="ubicaciones_competencia", help="Columnas: lat y lon")
+    col_u3, col_u4 = st.columns(2)
+    with col_u3:
+        radio_u = st.slider("Radio de competencia (km)", 0.2, 5.0, 1.0, 0.1, key="ubicaciones_radio")
+    with col_u4:
+        penalizacion_u = st.slider("Conversión que quita cada competidor pegado (%)", 0, 30, 10, 1,
+                                   key="ubicaciones_penalizacion") / 100
+    renta_actual = st.session_state.gastos_fijos_items.get("Renta", 0) if "gastos_fijos_items" in st.session_state else 0
+    st.caption(f"La renta de cada candidata reemplaza tu renta actual ({fmt_dinero(renta_actual)}/mes) en los gastos fijos.")
+    
+    if archivo_candidatas is None:
+        st.info("Carga las ubicaciones candidatas (y, si las tienes, las de la competencia).")
+    elif st.checkbox("▶️ Rankear ubicaciones", key="ubicaciones_activo"):
+        try:
+            ranking = cache_corridas().obtener(
+                clave_parametros(
+                    "ubicaciones", archivo_candidatas.file_id,
+                    archivo_competencia.file_id if archivo_competencia else None,
+                    params, radio_u, penalizacion_u, renta_actual, est_vector,
+                ),
+                lambda: rankear(
+                    leer_puntos(archivo_candidatas, opcionales=("nombre", "flujo", "renta")),
+                    leer_puntos(archivo_competencia) if archivo_competencia else pd.DataFrame(columns=["lat", "lon"]),
+                    params, radio=radio_u, penalizacion=penalizacion_u, renta_actual=renta_actual,
+                    estacionalidad=est_vector,
+                ),
+            )
+        except (ValueError, ImportError) as e:
+            st.error(str(e))
+            ranking = None
+        
+        if ranking is not None and len(ranking):
+            mejor = ranking.iloc[0]
+            col_u5, col_u6, col_u7 = st.columns(3)
+            with col_u5:
+                st.metric("📍 Candidatas", f"{len(ranking):,}")
+            with col_u6:
+                st.metric("🏆 Mejor recuperación",
+                          f"{mejor['meses_recuperacion']:.1f} meses" if np.isfinite(mejor["meses_recuperacion"]) else "Ninguna recupera")
+            with col_u7:
+                st.metric("💊 Competidores promedio a la redonda", f"{ranking['competidores'].mean():.1f}")
+            
+            top_u = ranking.head(50)
+            st.map(top_u.head(20), latitude="lat", longitude="lon", size=40)
+            st.dataframe(
+                pd.DataFrame({
+                    "Lugar": top_u["lugar"],
+                    "Ubicación": top_u["nombre"] if "nombre" in top_u else top_u["lugar"].map(lambda v: f"Candidata {v}"),
+                    "Competidores": top_u["competidores"],
+                    "Conversión": top_u["conversion"].map(lambda v: f"{v*100:.1f}%"),
+                    "Ventas/mes": top_u["ventas_totales"].map(fmt_dinero),
+                    "Te queda/mes": top_u["utilidad_neta"].map(lambda v: fmt_dinero(v) if v >= 0 else f"-{fmt_dinero(-v)}"),
+                    "Recupera en": top_u["meses_recuperacion"].map(
+                        lambda v: f"{v:.1f} meses" if np.isfinite(v) else "Más de 5 años"),
+                }),
+                use_container_width=True, hide_index=True,
+            )
+            st.download_button(
+                label="⬇️ Descargar ranking completo (CSV)",
+                data=ranking.to_csv(index=False).encode("utf-8"),
+                file_name="ranking_ubicaciones.csv",
+                mime="text/csv",
+                key="ubicaciones_descarga",
+            )
+        elif ranking is not None:
+            st.info("El archivo de candidatas no tiene coordenadas válidas.")
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# RED DE TIENDAS: CANIBALIZACIÓN DE LAS APERTURAS NUEVAS
+# ═══════════════════════════════════════════════════════════════════════════════
+with st.expander("🕸️ Red de tiendas: canibalización"):
+    st.caption("Una tienda nueva cerca de otra Farmacia Líbano le quita clientes. Carga la red (existentes y nuevas) "
+               "para ver cuánto aporta de verdad cada apertura. En las existentes pon el flujo que ya tienen hoy; "
+               "en las nuevas, el que tendrían solas.")
+    
+    columnas_red = ["nombre", "lat", "lon", "estado", "modelo", "escenario", "flujo", "ticket", "gastos_fijos", "inversion"]
+    archivo_red = st.file_uploader("Cargar red desde CSV", type="csv", key="red_csv",
+                                   help="Columnas: " + ", ".join(columnas_red) + " (estado: existente o nueva)")
+    if archivo_red is not None:
+        red_base = pd.read_csv(archivo_red).reindex(columns=columnas_red)
+    else:
+        # Ejemplo: tu tienda, dos existentes y una nueva entre ellas
+        red_base = pd.DataFrame([
+            {"nombre": datos_f['nombre'], "lat": 25.6700, "lon": -100.3100, "estado": "existente", "modelo": modelo,
+             "escenario": escenario, "flujo": flujo, "ticket": ticket, "gastos_fijos": gastos_fijos, "inversion": inversion},
+            {"nombre": "Centro", "lat": 25.6790, "lon": -100.3100, "estado": "existente", "modelo": modelo, "escenario": "Medio"},
+            {"nombre": "Lejana", "lat": 25.7500, "lon": -100.2000, "estado": "existente", "modelo": modelo, "escenario": "Medio"},
+            {"nombre": "Nueva", "lat": 25.6745, "lon": -100.3060, "estado": "nueva", "modelo": modelo, "escenario": "Medio"},
+        ], columns=columnas_red)
+    
+    tiendas_red = st.data_editor(
+        red_base,
+        num_rows="dynamic",
+        use_container_width=True,
+        hide_index=True,
+        key=f"red_tiendas_{archivo_red.file_id if archivo_red else 'ejemplo'}",
+        column_config={
+            "nombre": st.column_config.TextColumn("Tienda"),
+            "lat": st.column_config.NumberColumn("Latitud", format="%.4f", required=True),
+            "lon": st.column_config.NumberColumn("Longitud", format="%.4f", required=True),
+            "estado": st.column_config.SelectboxColumn("Estado", options=["existente", "nueva"], required=True),
+            "modelo": st.column_config.SelectboxColumn("Modelo", options=list(MODELOS), required=True),
+            "escenario": st.column_config.SelectboxColumn("Escenario", options=ESCENARIOS, required=True),
+            "flujo": st.column_config.NumberColumn("Personas/hora", min_value=0),
+            "ticket": st.column_config.NumberColumn("Ticket ($)", min_value=0),
+            "gastos_fijos": st.column_config.NumberColumn("Gastos fijos ($/mes)", min_value=0),
+            "inversion": st.column_config.NumberColumn("Inversión ($)", min_value=0),
+        },
+    )
+    col_r1, col_r2 = st.columns(2)
+    with col_r1:
+        radio_red = st.slider("Distancia a la que se comparten clientes (km)", 0.2, 5.0, 1.5, 0.1, key="red_radio")
+    with col_r2:
+        intensidad_red = st.slider("Cuánto se comparten dos tiendas pegadas (%)", 0, 100, 100, 5, key="red_intensidad",
+                                   help="100% = dos tiendas en la misma esquina se quedan con la mitad de clientes cada una") / 100
+    
+    if st.checkbox("▶️ Calcular canibalización", key="red_activo"):
+        tiendas_red = tiendas_red.dropna(subset=["lat", "lon", "estado", "modelo", "escenario"])
+        try:
+            red = cache_corridas().obtener(
+                clave_parametros("red", tiendas_red.to_dict("list"), radio_red, intensidad_red, est_vector),
+                lambda: canibalizacion(tiendas_red, radio=radio_red, intensidad=intensidad_red, meses=12,
+                                       estacionalidad=est_vector),
+            )
+        except ValueError as e:
+            st.error(str(e))
+            red = None
+        
+        if red is not None and not (red["tiendas"]["estado"] == "Nueva").any():
+            st.info("Marca al menos una tienda como nueva.")
+        elif red is not None:
+            tabla_red = red["tiendas"]
+            col_r3, col_r4, col_r5 = st.columns(3)
+            with col_r3:
+                st.metric("🏪 Ganancia anual de la red hoy", fmt_dinero(red["utilidad_antes"]))
+            with col_r4:
+                signo = "+" if red["incremental"] >= 0 else "-"
+                st.metric("➕ Aporte neto de las aperturas", f"{signo}{fmt_dinero(abs(red['incremental']))}/año",
+                          delta=f"{red['incremental'] / max(abs(red['utilidad_antes']), 1) * 100:+.1f}% de la red")
+            with col_r5:
+                st.metric("🔪 Le quitan a las existentes", fmt_dinero(red["canibalizacion"]) + "/año")
+            
+            nuevas_red = tabla_red[tabla_red["estado"] == "Nueva"]
+            st.markdown("**🆕 Tiendas nuevas**")
+            st.dataframe(pd.DataFrame({
+                "Tienda": nuevas_red["nombre"],
+                "Vecinas": nuevas_red["vecinas"],
+                "Clientes que conserva": nuevas_red["retencion"].map(lambda v: f"{v*100:.0f}%"),
+                "Su ganancia anual": nuevas_red["utilidad_despues"].map(lambda v: fmt_dinero(v) if v >= 0 else f"-{fmt_dinero(-v)}"),
+                "Aporte neto a la red": nuevas_red["aporte_neto"].map(lambda v: fmt_dinero(v) if v >= 0 else f"-{fmt_dinero(-v)}"),
+            }), use_container_width=True, hide_index=True)
+            
+            afectadas = tabla_red[(tabla_red["estado"] == "Existente") & (tabla_red["retencion"] < 1)]
+            afectadas = afectadas.assign(perdida=afectadas["utilidad_antes"] - afectadas["utilidad_despues"])
+            st.markdown(f"**🏪 Existentes que pierden clientes** ({len(afectadas):,})")
+            st.dataframe(pd.DataFrame({
+                "Tienda": afectadas["nombre"],
+                "Clientes que conserva": afectadas["retencion"].map(lambda v: f"{v*100:.0f}%"),
+                "Ventas antes": afectadas["ventas_antes"].map(fmt_dinero),
+                "Ventas después": afectadas["ventas_despues"].map(fmt_dinero),
+                "Ganancia que pierde": afectadas["perdida"].map(fmt_dinero),
+            }).iloc[np.argsort(-afectadas["perdida"].to_numpy(), kind="stable")[:50]],
+                use_container_width=True, hide_index=True)
 
+# ═══════════════════════════════════════════════════════════════════════════════
+# GENERADOR DE REPORTE PDF
+# ═══════════════════════════════════════════════════════════════════════════════
 # Botón de descarga del reporte
 st.markdown("---")
 st.markdown("### 📄 Descargar Reporte")
 
+@st.cache_resource
+def cola_reportes():
+    """Cola de PDFs compartida por el servidor (máximo 2 se construyen a la vez)"""
+    return ColaTrabajos(max_simultaneos=2)
+
+def construir_reporte(datos_f, modelo, escenario, params, corrida, progreso):
+    """Trabajo de la cola: ReportLab se importa en el hilo del trabajo, no en el del script"""
+    from corrida.reporte import generar_reporte_pdf
+    return generar_reporte_pdf(datos_f, modelo, escenario, params, corrida, progreso=progreso)
+
+# El PDF se construye en segundo plano; la sesión solo guarda el id del trabajo
+trabajo_pdf = st.session_state.get("trabajo_pdf") or {}
+estado_previo = cola_reportes().consultar(trabajo_pdf.get("id"))
+pdf_pendiente = estado_previo is not None and estado_previo["estado"] in (EN_COLA, CORRIENDO)
+
 col_pdf1, col_pdf2 = st.columns([1, 3])
 with col_pdf1:
-    if st.button("📥 Generar PDF", type="primary"):
-        with st.spinner("Generando reporte PDF..."):
-            pdf_bytes = generar_reporte_pdf()
+    if st.button("📥 Generar PDF", type="primary", disabled=pdf_pendiente):
+        st.session_state["trabajo_pdf"] = {
+            "id": cola_reportes().enviar(
+                construir_reporte, st.session_state.get('datos_franquicia', {}),
+                modelo, escenario, params, resultado_corrida,
+            ),
+            "modelo": modelo,
+            "escenario": escenario,
+        }
+        pdf_pendiente = True
+    
+    @st.fragment(run_every=1 if pdf_pendiente else None)
+    def estado_reporte():
+        """Muestra el avance del PDF sin volver a correr toda la página"""
+        trabajo = st.session_state.get("trabajo_pdf") or {}
+        estado = cola_reportes().consultar(trabajo.get("id"))
+        if estado is None:
+            return
+        if estado["estado"] == EN_COLA:
+            st.caption("⏳ En espera: se están generando otros reportes")
+        elif estado["estado"] == CORRIENDO:
+            st.progress(estado["progreso"], text="Generando reporte PDF...")
+        elif estado["estado"] == ERROR:
+            st.error(f"No se pudo generar el reporte ({estado['error']})")
+        elif pdf_pendiente:
+            st.rerun()  # Recarga completa para dejar de consultar el avance
+        else:
+            from corrida.reporte import nombre_archivo
             st.download_button(
                 label="📄 Descargar Reporte PDF", 
-                data=pdf_bytes,
-                file_name=f"corrida_financiera_{modelo.replace(' ', '_').lower()}_{escenario.lower()}.pdf",
+                data=estado["resultado"],
+                file_name=nombre_archivo(trabajo["modelo"], trabajo["escenario"]),
                 mime="application/pdf"
             )
+    
+    estado_reporte()
 with col_pdf2:
     st.caption("Genera un reporte ejecutivo profesional para presentar esta oportunidad de inversión a socios, inversionistas o para tu análisis detallado.")
 
+def params_combinacion(mo, es):
+    """Parámetros de otra combinación conservando lo que es propio de tu local
+    
+    El modelo actual conserva tu inversión y gastos fijos; los otros modelos usan
+    los de su preset. En todos se usa el crecimiento que elegiste.
+    """
+    if (mo, es) == (modelo, escenario):
+        return params
+    if mo == modelo:
+        return parametros(mo, es, inversion=inversion, gastos_fijos=gastos_fijos, crec=crec)
+    return parametros(mo, es, crec=crec)
+
+col_zip1, col_zip2 = st.columns([1, 3])
+with col_zip2:
+    zip_todos_modelos = st.checkbox("Incluir los 3 modelos", key="zip_todos_modelos")
+    st.caption("Un ZIP con los reportes Conservador, Medio y Alto. Los otros escenarios usan los valores de su preset con tu inversión, gastos fijos y crecimiento.")
+with col_zip1:
+    if st.button("🗂️ Generar ZIP"):
+        with st.spinner("Generando reportes..."):
+            from corrida.reporte import generar_zip
+            corridas_zip = []
+            for mo in (MODELOS if zip_todos_modelos else [modelo]):
+                for es in ESCENARIOS:
+                    params_zip = params_combinacion(mo, es)
+                    corrida_zip = cache_corridas().obtener(
+                        clave_parametros(params_zip, est_vector),
+                        lambda: calcular_corrida(params_zip, est_vector),
+                    )
+                    corridas_zip.append((mo, es, params_zip, corrida_zip))
+            zip_bytes = generar_zip(st.session_state.get('datos_franquicia', {}), corridas_zip)
+            st.download_button(
+                label="📦 Descargar ZIP",
+                data=zip_bytes,
+                file_name=f"corridas_{'todos_los_modelos' if zip_todos_modelos else modelo.split(' ', 1)[-1].lower()}.zip",
+                mime="application/zip"
+            )
+
 # Recomendaciones útiles (tono constructivo)
 if meses_recuperacion > 24:
     st.info("💡 **Oportunidad de optimización:** Con mejoras en ubicación o eficiencias operativas, puedes acelerar la recuperación de tu inversión.")
@@ -1389,3 +2031,110 @@ if clientes_mes < clientes_be:
     st.warning(f"📊 **Análisis de tráfico:** Para alcanzar el punto de equilibrio necesitas {int(clientes_be):,} clientes vs {clientes_mes:,} proyectados. Considera estrategias de marketing local.")
 if margen_neto < 0.05 and utilidad_neta > 0:
     st.info("🎯 **Potencial de mejora:** Los márgenes pueden optimizarse mejorando la mezcla de productos o negociando mejores condiciones con proveedores.")
+
+# ═══════════════════════════════════════════════════════════════════════════════
+# PANEL DE ADMINISTRACIÓN
+# ═══════════════════════════════════════════════════════════════════════════════
+if st.session_state.get('es_admin'):
+    st.markdown("---")
+    with st.expander("🛡️ Administración"):
+        st.markdown("**⚡ Caché de corridas (compartido entre sesiones)**")
+        est_cache = cache_corridas().estadisticas()
+        col_a1, col_a2, col_a3, col_a4 = st.columns(4)
+        with col_a1:
+            st.metric("Entradas", f"{est_cache['entradas']:,} / {est_cache['max_entradas']:,}")
+        with col_a2:
+            st.metric("Aciertos", f"{est_cache['aciertos']:,}")
+        with col_a3:
+            st.metric("Fallos", f"{est_cache['fallos']:,}")
+        with col_a4:
+            st.metric("Tasa de aciertos", f"{est_cache['tasa_aciertos']*100:.0f}%")
+        st.caption(f"Expulsadas por tamaño: {est_cache['expulsiones']:,} · Vigencia: {cache_corridas().ttl // 60} min")
+        
+        est_log = bitacora().estadisticas()
+        st.caption(
+            f"📝 Bitácora: {est_log['escritos']:,} eventos escritos · "
+            f"{est_log['pendientes']:,} pendientes · {est_log['errores']:,} sin poder escribir"
+        )
+        est_cola = cola_reportes().estadisticas()
+        st.caption(
+            f"🧵 Cola de PDFs: {est_cola[CORRIENDO]} generando (máx. {est_cola['max_simultaneos']}) · "
+            f"{est_cola[EN_COLA]} en espera · {est_cola[LISTO]} listos · {est_cola[ERROR]} con error"
+        )
+        
+        # El módulo del PDF solo existe si alguien ya pidió un reporte en este proceso
+        modulo_reporte = sys.modules.get("corrida.reporte")
+        if modulo_reporte is not None:
+            est_pdf = modulo_reporte.CACHE_PDF.estadisticas()
+            st.caption(
+                f"📄 PDFs en caché: {est_pdf['entradas']:,} / {est_pdf['max_entradas']:,} · "
+                f"aciertos {est_pdf['aciertos']:,} · fallos {est_pdf['fallos']:,}"
+            )
+        if st.button("🧹 Vaciar caché", key="limpiar_cache"):
+            cache_corridas().limpiar()
+            st.rerun()
+
+    with st.expander("📊 Uso de la app"):
+        if st.checkbox("▶️ Mostrar tablero de uso", key="mostrar_uso"):
+            hoy = datetime.now().date()
+            rango_uso = st.date_input("Periodo", (hoy - timedelta(days=30), hoy), key="uso_rango")
+            if not isinstance(rango_uso, (tuple, list)):
+                rango_uso = (rango_uso,)
+            desde = rango_uso[0].isoformat()
+            hasta = rango_uso[-1].isoformat()
+            
+            conteos_uso = pd.DataFrame(
+                lector_bitacora().conteos(desde, hasta),
+                columns=["dia", "codigo", "usuario", "tipo", "eventos"],
+            )
+            nombres_uso = (
+                conteos_uso.drop_duplicates("codigo").set_index("codigo")["usuario"].to_dict()
+            )
+            codigos_uso = st.multiselect(
+                "Usuarios", sorted(nombres_uso),
+                format_func=lambda c: f"{c} · {nombres_uso[c]}" if c and nombres_uso[c] else (c or "Sin código"),
+                key="uso_codigos",
+            )
+            if codigos_uso:
+                conteos_uso = conteos_uso[conteos_uso["codigo"].isin(codigos_uso)]
+            
+            por_tipo = conteos_uso.groupby("tipo")["eventos"].sum()
+            col_u1, col_u2, col_u3 = st.columns(3)
+            with col_u1:
+                st.metric("Accesos", f"{int(por_tipo.get('acceso', 0)):,}")
+            with col_u2:
+                st.metric("Corridas", f"{int(por_tipo.get('corrida', 0)):,}")
+            with col_u3:
+                st.metric("Usuarios activos", f"{conteos_uso.loc[conteos_uso['codigo'] != '', 'codigo'].nunique():,}")
+            
+            if conteos_uso.empty:
+                st.info("No hay eventos registrados en ese periodo.")
+            else:
+                agrupar_uso = st.radio("Agrupar por", ["Día", "Semana"], horizontal=True, key="uso_agrupar")
+                serie = conteos_uso.assign(fecha=pd.to_datetime(conteos_uso["dia"]))
+                if agrupar_uso == "Semana":
+                    serie["fecha"] = serie["fecha"].dt.to_period("W").dt.start_time
+                grafica_uso = serie.pivot_table(
+                    index="fecha", columns="tipo", values="eventos", aggfunc="sum", fill_value=0
+                )
+                st.bar_chart(grafica_uso.rename(columns={"acceso": "Accesos", "corrida": "Corridas"}))
+                
+                st.markdown("**Últimas corridas**")
+                por_pagina = 25
+                total_corridas = int(por_tipo.get("corrida", 0))
+                paginas = max(1, -(-total_corridas // por_pagina))
+                pagina = st.number_input(f"Página (de {paginas})", 1, paginas, 1, key="uso_pagina")
+                filas_uso, total_filas = lector_bitacora().eventos(
+                    desde, hasta, codigos=codigos_uso or None, pagina=int(pagina), por_pagina=por_pagina
+                )
+                if filas_uso:
+                    st.dataframe(
+                        pd.DataFrame(filas_uso).reindex(
+                            columns=["ts", "codigo", "usuario", "nombre", "ubicacion", "proposito"]
+                        ).rename(columns={
+                            "ts": "Fecha", "codigo": "Código", "usuario": "Usuario", "nombre": "Franquicia",
+                            "ubicacion": "Ubicación", "proposito": "Propósito",
+                        }),
+                        use_container_width=True, hide_index=True,
+                    )
+                st.caption(f"{total_filas:,} corridas aún guardadas en la bitácora (los segmentos más viejos se borran al rotar)")
@@ -0,0 +1,79 @@
+"""Benchmark de arranque: tiempo de imports y del primer render del login.
+
+Cada medición corre en un intérprete nuevo para que nada quede en caché de
+una corrida a otra. Uso:
+
+    python benchmarks/arranque.py --repeticiones 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Módulos pesados que el login no debería cargar
+PESADOS = ("numpy", "pandas", "matplotlib", "reportlab")
+
+# Lo que de verdad importa la app de cada uno
+MODULOS = ("streamlit", "numpy", "pandas", "matplotlib.pyplot", "reportlab.platypus")
+
+_IMPORTS = """
+import json, sys, time
+inicio = time.perf_counter()
+import {modulo}
+print(json.dumps({{"segundos": time.perf_counter() - inicio}}))
+"""
+
+_LOGIN = """
+import json, logging, sys, time
+logging.disable(logging.CRITICAL)
+inicio = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+previos = set(sys.modules)
+at = AppTest.from_file({app!r}, default_timeout=120)
+at.run()
+segundos = time.perf_counter() - inicio
+cargados = [p for p in {pesados!r} if p in sys.modules and p not in previos]
+print(json.dumps({{
+    "segundos": segundos,
+    "login": len(at.text_input) == 1 and not at.exception,
+    "cargados": cargados,
+}}))
+"""
+
+
+def _medir(codigo):
+    """Corre `codigo` en un intérprete nuevo y regresa el JSON que imprime"""
+    salida = subprocess.run(
+        [sys.executable, "-c", codigo], cwd=RAIZ, capture_output=True, text=True, check=True,
+    )
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tiempo de arranque de la app y del login")
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print("Import en frío (mediana de segundos):")
+    for modulo in MODULOS:
+        tiempos = [_medir(_IMPORTS.format(modulo=modulo))["segundos"] for _ in range(args.repeticiones)]
+        print(f"  {modulo:<20} {statistics.median(tiempos):.3f}")
+
+    resultados = [
+        _medir(_LOGIN.format(app=os.path.join(RAIZ, "app.py"), pesados=PESADOS))
+        for _ in range(args.repeticiones)
+    ]
+    tiempos = [r["segundos"] for r in resultados]
+    print(f"\nPrimer render del login: mediana {statistics.median(tiempos):.3f} s "
+          f"(mín {min(tiempos):.3f}, máx {max(tiempos):.3f})")
+    print(f"Formulario de login presente: {'sí' if all(r['login'] for r in resultados) else 'NO'}")
+    cargados = sorted({p for r in resultados for p in r["cargados"]})
+    print(f"Módulos pesados cargados por el login: {', '.join(cargados) or 'ninguno'}")
+
+
+if __name__ == "__main__":
+    main()
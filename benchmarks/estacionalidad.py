@@ -0,0 +1,85 @@
+"""Verificación del ajuste de estacionalidad con historias de distinta cobertura.
+
+Genera ventas diarias sintéticas de varias tiendas con índices mensuales
+conocidos (y una tendencia suave) para varios rangos de fechas: un año
+completo de enero a diciembre, varios años completos, un año parcial y una
+historia que empieza y termina a medio año. Ajusta cada una con `ajustar` y
+reporta el error máximo contra los índices generados y el tiempo. Termina con
+error si algún rango falla o se aleja más de `--tolerancia`; con menos de dos
+años no se quita la tendencia, así que ahí el error incluye el crecimiento.
+
+Uso:
+
+    python benchmarks/estacionalidad.py --tiendas 50
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corrida.estacionalidad import MESES, ajustar  # noqa: E402
+
+INDICES = np.array([0.92, 0.88, 0.95, 0.98, 1.02, 1.00, 0.97, 0.99, 1.01, 1.04, 1.08, 1.16])
+
+# (nombre, inicio, fin); los años completos son el caso más común de archivo
+RANGOS = (
+    ("un año completo", "2024-01-01", "2024-12-31"),
+    ("cuatro años completos", "2021-01-01", "2024-12-31"),
+    ("marzo a octubre", "2024-03-01", "2024-10-31"),
+    ("julio a junio, tres años", "2021-07-01", "2024-06-30"),
+)
+
+
+def generar(inicio, fin, tiendas, semilla=0):
+    """CSV en memoria con fecha, tienda y ventas diarias"""
+    azar = np.random.default_rng(semilla)
+    fechas = pd.date_range(inicio, fin, freq="D")
+    nivel = azar.uniform(5_000, 40_000, tiendas)
+    tendencia = 1 + 0.0001 * np.arange(len(fechas))
+    ventas = nivel[:, None] * (INDICES[fechas.month - 1] * tendencia)[None, :]
+    datos = pd.DataFrame({
+        "fecha": np.tile(fechas, tiendas),
+        "tienda": np.repeat([f"T{k}" for k in range(tiendas)], len(fechas)),
+        "ventas": np.round(ventas.ravel(), 2),
+    })
+    return io.BytesIO(datos.to_csv(index=False).encode())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Error y tiempo del ajuste de estacionalidad por rango de fechas")
+    parser.add_argument("--tiendas", type=int, default=20)
+    parser.add_argument("--tolerancia", type=float, default=0.025)
+    args = parser.parse_args(argv)
+
+    fallas = 0
+    for nombre, inicio, fin in RANGOS:
+        archivo = generar(inicio, fin, args.tiendas)
+        comienzo = time.perf_counter()
+        try:
+            indices = ajustar(archivo)
+        except Exception as error:
+            print(f"{nombre:>26}: FALLA {type(error).__name__}: {error}")
+            fallas += 1
+            continue
+        segundos = time.perf_counter() - comienzo
+        # Solo los meses observados se comparan (los demás quedan en 1)
+        meses = sorted(set(pd.date_range(inicio, fin, freq="D").month))
+        observado = indices[list(MESES)].to_numpy()[:, np.array(meses) - 1]
+        esperado = INDICES[np.array(meses) - 1]
+        esperado = esperado / esperado.mean()
+        observado = observado / observado.mean(axis=1, keepdims=True)
+        error = np.abs(observado - esperado).max()
+        estado = "ok" if error <= args.tolerancia else "FALLA"
+        fallas += estado != "ok"
+        print(f"{nombre:>26}: error máximo {error:.4f} en {len(indices)} grupos, {segundos * 1000:6.1f} ms  {estado}")
+    sys.exit(1 if fallas else 0)
+
+
+if __name__ == "__main__":
+    main()
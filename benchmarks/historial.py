@@ -0,0 +1,99 @@
+"""Benchmark del historial de corridas en SQLite.
+
+Llena una base temporal con muchas corridas repartidas entre usuarios y
+ubicaciones, y mide listados por usuario y por ubicación en la primera página
+y en una página muy profunda (paginación por cursor), más la reapertura de una
+corrida completa.
+
+Uso:
+
+    python benchmarks/historial.py --corridas 300000
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corrida import parametros  # noqa: E402
+from corrida.historial import Historial  # noqa: E402
+from corrida.lote import correr_corrida  # noqa: E402
+
+
+def _tiempos(funcion, repeticiones):
+    """Milisegundos de cada llamada a `funcion`"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return tiempos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tiempo de listados y reapertura del historial")
+    parser.add_argument("--corridas", type=int, default=300_000)
+    parser.add_argument("--usuarios", type=int, default=200)
+    parser.add_argument("--repeticiones", type=int, default=50)
+    args = parser.parse_args(argv)
+
+    params = parametros("🛒 Super", "Medio")
+    corrida = correr_corrida(params)
+    entradas = {"flujo": params["flujo"], "ticket": params["ticket"], "inversion": params["inversion"]}
+    azar = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        historial = Historial(os.path.join(carpeta, "corridas.db"))
+        conexion = historial._conexion()
+
+        # Llenado en una sola transacción reutilizando la fila de una corrida real
+        inicio = time.perf_counter()
+        historial.guardar("U0", "Usuario 0", {"nombre": "P", "ubicacion": "Ciudad 0", "proposito": "Otro"},
+                          "🛒 Super", "Medio", entradas, params, corrida)
+        plantilla = dict(conexion.execute("SELECT * FROM corridas").fetchone())
+        del plantilla["id"]
+        with conexion:
+            conexion.executemany(
+                f"INSERT INTO corridas ({', '.join(plantilla)}) VALUES ({', '.join('?' * len(plantilla))})",
+                (
+                    tuple({
+                        **plantilla,
+                        "usuario_codigo": f"U{azar.randrange(args.usuarios)}",
+                        "ubicacion": f"Ciudad {azar.randrange(500)}",
+                    }.values())
+                    for _ in range(args.corridas - 1)
+                ),
+            )
+        llenado = time.perf_counter() - inicio
+        tamano = os.path.getsize(os.path.join(carpeta, "corridas.db")) / 1e6
+        print(f"{args.corridas:,} corridas en {llenado:.1f} s ({tamano:,.0f} MB)")
+
+        def pagina_profunda(**filtro):
+            # Cursor en la mitad de las corridas del filtro
+            ids = [f["id"] for f in historial.listar(limite=10**9, **filtro)]
+            return ids[len(ids) // 2]
+
+        cursor_usuario = pagina_profunda(usuario_codigo="U7")
+        cursor_ubicacion = pagina_profunda(ubicacion="ciudad 42")
+        id_medio = args.corridas // 2
+
+        casos = {
+            "usuario, página 1": lambda: historial.listar(usuario_codigo="U7"),
+            "usuario, a la mitad": lambda: historial.listar(usuario_codigo="U7", antes_de=cursor_usuario),
+            "ubicación, página 1": lambda: historial.listar(ubicacion="ciudad 42"),
+            "ubicación, a la mitad": lambda: historial.listar(ubicacion="ciudad 42", antes_de=cursor_ubicacion),
+            "todas, a la mitad": lambda: historial.listar(antes_de=id_medio),
+            "reabrir corrida": lambda: historial.cargar(id_medio),
+        }
+        print(f"Consultas, {args.repeticiones} repeticiones (ms)")
+        for nombre, funcion in casos.items():
+            tiempos = _tiempos(funcion, args.repeticiones)
+            print(f"  {nombre:<22} mediana {statistics.median(tiempos):8.3f}   máx {max(tiempos):8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""Benchmark de la ingesta de exportaciones del POS.
+
+Genera por bloques una exportación sintética (líneas de ticket de varias
+tiendas a lo largo de un año, con la mezcla y el COGS de cada categoría
+conocidos), la escribe en CSV y Parquet, y mide renglones por segundo y el
+pico de memoria de `ingerir` con bloques de distinto tamaño.
+
+La memoria se mide en una pasada aparte, en un proceso nuevo, para no afectar
+el tiempo y para que el pico no arrastre lo de otras pasadas. Se reportan tres
+cifras, porque ninguna ve todo:
+
+- RSS: crecimiento del pico de RSS del proceso durante la ingesta (VmHWM o
+  ru_maxrss). Es lo que cuesta de verdad en el servidor.
+- Arrow: pico del pool de memoria de pyarrow (max_memory). tracemalloc no lo ve.
+- Python: pico de tracemalloc, que cubre NumPy y pandas pero no Arrow.
+
+Uso:
+
+    python benchmarks/ingesta.py --renglones 5000000 --tiendas 40
+"""
+import argparse
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corrida.ingesta import CATEGORIAS, ingerir  # noqa: E402
+
+MEZCLA = (0.45, 0.35, 0.15, 0.05)
+COGS = (0.60, 0.78, 0.88, 0.70)
+
+
+def generar(ruta, renglones, tiendas, bloque=1_000_000, semilla=0):
+    """Escribe la exportación sintética en `ruta` (CSV o Parquet según la extensión)"""
+    azar = np.random.default_rng(semilla)
+    parquet = ruta.endswith(".parquet")
+    escritor = None
+    inicio = np.datetime64("2025-01-01T08:00:00")
+    folio = 0
+    for desde in range(0, renglones, bloque):
+        n = min(bloque, renglones - desde)
+        # Tickets de 1 a 5 líneas, cada uno en una tienda y a una hora entre 8:00 y 22:00
+        lineas = azar.integers(1, 6, n)
+        lineas = lineas[: np.searchsorted(np.cumsum(lineas), n) + 1]
+        lineas[-1] -= lineas.sum() - n
+        tickets = len(lineas)
+        dia = np.sort(azar.integers(0, 365, tickets))
+        segundo = dia * 86_400 + azar.integers(0, 14 * 3600, tickets)
+        ticket_tienda = azar.integers(0, tiendas, tickets)
+
+        categoria = azar.choice(len(CATEGORIAS), n, p=MEZCLA)
+        importe = np.round(azar.lognormal(4.0, 0.6, n), 2)
+        datos = pd.DataFrame({
+            "tienda": np.char.add("T", np.repeat(ticket_tienda, lineas).astype(str)),
+            "folio": np.repeat(np.arange(folio, folio + tickets), lineas),
+            "fecha": inicio + np.repeat(segundo, lineas).astype("timedelta64[s]"),
+            "categoria": np.array(["Genérico", "Patente", "Abarrotes", "Perfumería"])[categoria],
+            "importe": importe,
+            "costo": np.round(importe * np.array(COGS)[categoria], 2),
+        })
+        folio += tickets
+        if parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            tabla = pa.Table.from_pandas(datos, preserve_index=False)
+            escritor = escritor or pq.ParquetWriter(ruta, tabla.schema)
+            escritor.write_table(tabla)
+        else:
+            datos.to_csv(ruta, mode="a" if desde else "w", header=not desde, index=False)
+    if escritor is not None:
+        escritor.close()
+
+
+def _rss_mb():
+    """Pico de RSS del proceso en MB
+
+    En Linux se lee VmHWM de /proc: ru_maxrss conserva el pico del proceso
+    padre a través de fork y exec, y el del benchmark ya es grande por generar
+    el archivo. En otros sistemas se usa ru_maxrss (KB en Linux, bytes en macOS).
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for linea in f:
+                if linea.startswith("VmHWM:"):
+                    return int(linea.split()[1]) / 1e3
+    except OSError:
+        pass
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / 1e6 if sys.platform == "darwin" else pico / 1e3
+
+
+def _picos(ruta, filas):
+    """Picos (MB) de RSS, del pool de Arrow y de tracemalloc al ingerir (corre en un proceso nuevo)"""
+    try:
+        import pyarrow as pa
+        import pyarrow.csv  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError:
+        pa = None
+    antes = _rss_mb()
+    tracemalloc.start()
+    ingerir(ruta, filas=filas)
+    python = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+    arrow = (pa.default_memory_pool().max_memory() or 0) / 1e6 if pa is not None else 0.0
+    return _rss_mb() - antes, arrow, python
+
+
+def medir(ruta, filas):
+    """Segundos y picos de memoria (RSS, Arrow y Python en MB) de ingerir `ruta` con bloques de `filas`"""
+    inicio = time.perf_counter()
+    resumen = ingerir(ruta, filas=filas)
+    segundos = time.perf_counter() - inicio
+
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        picos = pool.apply(_picos, (ruta, filas))
+    return segundos, picos, resumen
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Renglones por segundo y memoria de la ingesta del POS")
+    parser.add_argument("--renglones", type=int, default=5_000_000)
+    parser.add_argument("--tiendas", type=int, default=40)
+    parser.add_argument("--bloques", type=int, nargs="+", default=[100_000, 500_000])
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as carpeta:
+        formatos = ["csv"]
+        try:
+            import pyarrow  # noqa: F401
+            formatos.append("parquet")
+        except ImportError:
+            print("pyarrow no está instalado: solo CSV")
+
+        for formato in formatos:
+            ruta = os.path.join(carpeta, f"pos.{formato}")
+            inicio = time.perf_counter()
+            generar(ruta, args.renglones, args.tiendas)
+            tamano = os.path.getsize(ruta) / 1e6
+            print(f"{formato}: {args.renglones:,} renglones, {tamano:,.0f} MB, "
+                  f"generado en {time.perf_counter() - inicio:.1f} s")
+            for filas in args.bloques:
+                segundos, (rss, arrow, python), resumen = medir(ruta, filas)
+                print(f"  bloques de {filas:>9,}: {args.renglones / segundos:>12,.0f} renglones/s   "
+                      f"pico RSS {rss:7.1f} MB  Arrow {arrow:7.1f} MB  Python {python:7.1f} MB")
+
+        # Lo recuperado contra lo que se generó
+        total = resumen.loc["Todas"]
+        print("mezcla", " ".join(f"{c} {total[f'mezcla_{c}']:.3f}" for c in CATEGORIAS))
+        print("cogs  ", " ".join(f"{c} {total[f'cogs_{c}']:.3f}" for c in CATEGORIAS))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark del reporte PDF: construcción en frío, en caliente y desde caché.
+
+- frío: estilos y bloques fijos se rehacen en cada reporte (como antes)
+- caliente: estilos y bloques fijos ya armados, el PDF se construye completo
+- caché: mismos datos de entrada, se regresan los bytes guardados
+
+Uso:
+
+    python benchmarks/reporte_pdf.py --repeticiones 50
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corrida import parametros, reporte  # noqa: E402
+from corrida.lote import correr_corrida  # noqa: E402
+
+DATOS = {"nombre": "Prospecto de prueba", "ubicacion": "Monterrey, N.L.", "proposito": "Nueva apertura"}
+
+
+def _tiempos(funcion, repeticiones):
+    """Milisegundos de cada llamada a `funcion`"""
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return tiempos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tiempo de construcción del reporte PDF")
+    parser.add_argument("--repeticiones", type=int, default=30)
+    parser.add_argument("--modelo", default="🛒 Super")
+    parser.add_argument("--escenario", default="Medio")
+    args = parser.parse_args(argv)
+
+    params = parametros(args.modelo, args.escenario)
+    corrida = correr_corrida(params)
+    entradas = (DATOS, args.modelo, args.escenario, params, corrida)
+
+    def frio():
+        reporte._estilos.cache_clear()
+        reporte._bloques_fijos.cache_clear()
+        reporte.construir_pdf(*entradas)
+
+    reporte.construir_pdf(*entradas)  # calienta fuentes e imports de ReportLab
+    resultados = {
+        "frío": _tiempos(frio, args.repeticiones),
+        "caliente": _tiempos(lambda: reporte.construir_pdf(*entradas), args.repeticiones),
+    }
+    reporte.CACHE_PDF.limpiar()
+    resultados["caché"] = _tiempos(lambda: reporte.generar_reporte_pdf(*entradas), args.repeticiones)[1:]
+
+    print(f"Reporte {args.modelo} / {args.escenario}, {args.repeticiones} repeticiones (ms)")
+    for nombre, tiempos in resultados.items():
+        print(f"  {nombre:<9} mediana {statistics.median(tiempos):8.3f}   mín {min(tiempos):8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+"""Corrida financiera de franquicias Farmacia Líbano, sin dependencia de la UI"""
+from .presets import ESCENARIOS, GASTOS_FIJOS_PRESETS, MODELOS, PRESETS
+
+# El motor usa NumPy: se carga hasta que se pide, para que los módulos ligeros
+# del paquete (p. ej. la bitácora) no lo importen en la pantalla de login
+_MOTOR = (
+    "CAMPOS", "DIAS", "HORAS", "factores", "mes_base", "parametros", "proyectar", "proyectar_utilidad",
+)
+
+__all__ = ["ESCENARIOS", "GASTOS_FIJOS_PRESETS", "MODELOS", "PRESETS", *_MOTOR]
+
+
+def __getattr__(nombre):
+    if nombre in _MOTOR:
+        from . import motor
+        return getattr(motor, nombre)
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
@@ -0,0 +1,133 @@
+"""Lectura por bloques de archivos grandes (CSV o Parquet).
+
+Sirve para procesar exportaciones de millones de renglones con memoria
+acotada: solo se leen las columnas pedidas y se entregan DataFrames de a lo
+más `filas` renglones. Parquet necesita pyarrow; los CSV usan el lector de
+pyarrow si está instalado y, si no, el de pandas.
+
+También guarda los perfiles que salen de esos archivos (estacionalidad,
+calibraciones) en un JSON compartido por el servidor.
+"""
+import json
+import os
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+# Tamaño máximo de cada bloque que lee pyarrow de un CSV
+BLOQUE_ARROW = 1 << 20
+
+
+def _es_parquet(archivo):
+    nombre = archivo if isinstance(archivo, (str, os.PathLike)) else getattr(archivo, "name", "")
+    return str(nombre).lower().endswith((".parquet", ".pq"))
+
+
+def _bytes_por_renglon(archivo, muestra=1 << 20):
+    """Tamaño típico de un renglón según el primer MB del CSV"""
+    if hasattr(archivo, "read"):
+        datos = archivo.read(muestra)
+        archivo.seek(0)
+    else:
+        with open(archivo, "rb") as f:
+            datos = f.read(muestra)
+    return len(datos) / max(datos.count(b"\n"), 1)
+
+
+def _csv_arrow(archivo, usar, filas, tipos):
+    """Bloques de un CSV con el lector de pyarrow (más rápido, ya convierte fechas)
+
+    pyarrow lee por adelantado hasta 32 bloques en segundo plano, así que sus
+    bloques se mantienen chicos (a lo más BLOQUE_ARROW bytes) y se juntan hasta
+    tener unos `filas` renglones.
+    """
+    import pyarrow as pa
+    import pyarrow.csv as pc
+
+    bloque = int(max(min(filas * _bytes_por_renglon(archivo), BLOQUE_ARROW), 1 << 16))
+    lector = pc.open_csv(
+        archivo,
+        read_options=pc.ReadOptions(block_size=bloque),
+        convert_options=pc.ConvertOptions(
+            include_columns=usar, column_types={c: pa.string() for c in tipos if c in usar},
+        ),
+    )
+    pendientes, renglones = [], 0
+    for lote in lector:
+        pendientes.append(lote)
+        renglones += lote.num_rows
+        if renglones >= filas:
+            yield pa.Table.from_batches(pendientes).to_pandas()
+            pendientes, renglones = [], 0
+    if pendientes:
+        yield pa.Table.from_batches(pendientes).to_pandas()
+
+
+def leer_por_bloques(archivo, columnas, filas=500_000, opcionales=(), texto=()):
+    """Itera DataFrames con `columnas` (más las `opcionales` que existan)
+
+    `archivo` puede ser una ruta o un archivo abierto (p. ej. lo que regresa
+    st.file_uploader). Las columnas de `texto` se leen siempre como texto
+    (folios o claves que en un bloque parecen números y en otro no). Con
+    pyarrow los bloques de CSV son de aproximadamente `filas` renglones.
+    Lanza ValueError si falta alguna columna obligatoria.
+    """
+    columnas = list(columnas)
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        pyarrow = None
+
+    if _es_parquet(archivo):
+        if pyarrow is None:
+            raise ImportError("Instala pyarrow para leer archivos Parquet")
+        import pyarrow.parquet as pq
+
+        origen = pq.ParquetFile(archivo)
+        disponibles = set(origen.schema_arrow.names)
+    else:
+        encabezado = pd.read_csv(archivo, nrows=0)
+        disponibles = set(encabezado.columns)
+        if hasattr(archivo, "seek"):
+            archivo.seek(0)
+
+    faltantes = [c for c in columnas if c not in disponibles]
+    if faltantes:
+        raise ValueError(f"Faltan columnas en el archivo: {', '.join(faltantes)}")
+    usar = columnas + [c for c in opcionales if c in disponibles and c not in columnas]
+
+    if _es_parquet(archivo):
+        for lote in origen.iter_batches(batch_size=filas, columns=usar):
+            yield lote.to_pandas()
+    elif pyarrow is not None:
+        yield from _csv_arrow(archivo, usar, filas, texto)
+    else:
+        yield from pd.read_csv(archivo, usecols=usar, chunksize=filas, dtype={c: str for c in texto if c in usar})
+
+
+class PerfilesJSON:
+    """Perfiles con nombre guardados en un JSON compartido por el servidor"""
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._candado = threading.Lock()
+
+    def listar(self):
+        """{nombre: datos del perfil}"""
+        try:
+            with open(self.ruta, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def agregar(self, perfiles):
+        """Agrega o reemplaza varios perfiles {nombre: datos} en una sola escritura"""
+        creado = datetime.now().isoformat(timespec="seconds")
+        with self._candado:
+            todos = self.listar()
+            todos.update({nombre: {**datos, "creado": creado} for nombre, datos in perfiles.items()})
+            temporal = self.ruta + ".tmp"
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump(todos, f, ensure_ascii=False, indent=1)
+            os.replace(temporal, self.ruta)
@@ -0,0 +1,140 @@
+"""Bitácora de accesos y corridas en JSON lines, escrita en segundo plano.
+
+`registrar` solo pone el evento en una cola; un hilo escritor la vacía por
+lotes, así que el login y el formulario no esperan al disco. Cada lote se
+escribe con candado de archivo (fcntl) para que varios procesos de la app
+puedan compartir la misma bitácora. El archivo se rota al pasar de cierto
+tamaño o al cambiar el día, y los segmentos viejos se comprimen con gzip.
+"""
+import atexit
+import glob
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from datetime import datetime
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin candado entre procesos
+    fcntl = None
+
+
+class Bitacora:
+    """Escritor de eventos con cola, lotes, rotación y compresión
+
+    - max_bytes: tamaño a partir del cual se rota el archivo activo
+    - max_segmentos: segmentos comprimidos que se conservan (los más viejos se borran)
+    - lote: eventos máximos por escritura
+    - intervalo: segundos que espera el escritor para juntar un lote
+    """
+
+    def __init__(self, ruta, max_bytes=5_000_000, max_segmentos=60, lote=500, intervalo=0.5):
+        self.ruta = ruta
+        self.max_bytes = max_bytes
+        self.max_segmentos = max_segmentos
+        self.lote = lote
+        self.intervalo = intervalo
+        self.escritos = 0
+        self.errores = 0
+        self._recibidos = 0
+        self._candado = threading.Lock()
+        self._cola = queue.SimpleQueue()
+        self._hilo = threading.Thread(target=self._escribir_siempre, name="bitacora", daemon=True)
+        self._hilo.start()
+        atexit.register(self.vaciar)
+
+    def registrar(self, tipo, **datos):
+        """Encola un evento; nunca toca el disco en el hilo que llama"""
+        with self._candado:
+            self._recibidos += 1
+        self._cola.put({"ts": datetime.now().isoformat(timespec="seconds"), "tipo": tipo, **datos})
+
+    def pendientes(self):
+        """Eventos recibidos que aún no se escriben (en cola o en el lote actual)"""
+        return self._recibidos - self.escritos - self.errores
+
+    def vaciar(self, timeout=5.0):
+        """Espera a que todo lo recibido se escriba (p. ej. al cerrar el proceso)"""
+        limite = time.monotonic() + timeout
+        while self.pendientes() > 0 and time.monotonic() < limite:
+            time.sleep(0.01)
+
+    def _escribir_siempre(self):
+        """Hilo escritor: junta eventos por `intervalo` y los escribe en un solo bloque"""
+        while True:
+            eventos = [self._cola.get()]
+            limite = time.monotonic() + self.intervalo
+            while len(eventos) < self.lote:
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    break
+                try:
+                    eventos.append(self._cola.get(timeout=restante))
+                except queue.Empty:
+                    break
+            try:
+                self._escribir(eventos)
+                self.escritos += len(eventos)
+            except OSError:
+                # Sin disco escribible (p. ej. en la nube) los eventos se descartan
+                self.errores += len(eventos)
+
+    def _abrir_bloqueado(self):
+        """Abre el archivo activo con candado exclusivo, aunque otro proceso lo haya rotado"""
+        while True:
+            f = open(self.ruta, "a", encoding="utf-8")
+            if fcntl is None:
+                return f
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                if os.stat(self.ruta).st_ino == os.fstat(f.fileno()).st_ino:
+                    return f
+            except FileNotFoundError:
+                pass
+            f.close()  # Lo rotaron mientras esperábamos el candado
+
+    def _escribir(self, eventos):
+        """Escribe un lote, rotando antes si hace falta"""
+        texto = "".join(json.dumps(e, ensure_ascii=False) + "\n" for e in eventos)
+        rotado = None
+        f = self._abrir_bloqueado()
+        try:
+            if self._toca_rotar(f):
+                rotado = f"{self.ruta}.{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}"
+                os.rename(self.ruta, rotado)
+                f.close()
+                f = self._abrir_bloqueado()
+            f.write(texto)
+            f.flush()
+        finally:
+            f.close()
+        if rotado:
+            try:
+                self._comprimir(rotado)
+            except OSError:
+                pass  # El segmento queda sin comprimir; los eventos ya se escribieron
+
+    def _toca_rotar(self, f):
+        """Rota por tamaño o cuando el archivo activo es de otro día"""
+        info = os.fstat(f.fileno())
+        if info.st_size == 0:
+            return False
+        otro_dia = datetime.fromtimestamp(info.st_mtime).date() != datetime.now().date()
+        return info.st_size >= self.max_bytes or otro_dia
+
+    def _comprimir(self, rotado):
+        """Comprime un segmento rotado y borra los más viejos"""
+        with open(rotado, "rb") as origen, gzip.open(rotado + ".gz", "wb") as destino:
+            shutil.copyfileobj(origen, destino)
+        os.remove(rotado)
+        segmentos = sorted(glob.glob(glob.escape(self.ruta) + ".*.gz"))
+        for viejo in segmentos[:-self.max_segmentos]:
+            os.remove(viejo)
+
+    def estadisticas(self):
+        """Eventos escritos, perdidos y pendientes"""
+        return {"escritos": self.escritos, "errores": self.errores, "pendientes": self.pendientes()}
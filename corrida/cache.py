@@ -0,0 +1,88 @@
+"""Caché LRU con expiración para resultados indexados por parámetros"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+
+def _serializable(valor):
+    """Convierte arreglos y escalares de NumPy a tipos que entiende json"""
+    if isinstance(valor, np.ndarray):
+        return valor.tolist()
+    if isinstance(valor, np.generic):
+        return valor.item()
+    return repr(valor)
+
+
+def clave_parametros(*partes):
+    """Hash estable de cualquier combinación de diccionarios, listas y escalares"""
+    texto = json.dumps(partes, sort_keys=True, ensure_ascii=False, default=_serializable)
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+class CacheLRU:
+    """Caché acotado por número de entradas y antigüedad, seguro entre hilos
+
+    Pensado para compartirse entre todas las sesiones de la app: los valores
+    guardados no deben modificarse después de regresarse.
+    """
+
+    def __init__(self, max_entradas=256, ttl=3600):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self._datos = OrderedDict()
+        self._candado = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expulsiones = 0
+
+    def buscar(self, clave):
+        """Regresa el valor vigente de `clave` o None (cuenta acierto o fallo)"""
+        ahora = time.monotonic()
+        with self._candado:
+            entrada = self._datos.get(clave)
+            if entrada is not None and ahora - entrada[0] <= self.ttl:
+                self._datos.move_to_end(clave)
+                self.aciertos += 1
+                return entrada[1]
+            self.fallos += 1
+            return None
+
+    def guardar(self, clave, valor):
+        """Guarda `valor` y expulsa las entradas menos usadas si sobra alguna"""
+        with self._candado:
+            self._datos[clave] = (time.monotonic(), valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.max_entradas:
+                self._datos.popitem(last=False)
+                self.expulsiones += 1
+
+    def obtener(self, clave, calcular):
+        """Regresa el valor de `clave`; si no existe o expiró lo calcula y guarda"""
+        valor = self.buscar(clave)
+        if valor is None:
+            # Se calcula fuera del candado para no bloquear a otras sesiones
+            valor = calcular()
+            self.guardar(clave, valor)
+        return valor
+
+    def limpiar(self):
+        """Vacía el caché (los contadores se conservan)"""
+        with self._candado:
+            self._datos.clear()
+
+    def estadisticas(self):
+        """Entradas, aciertos, fallos, expulsiones y tasa de aciertos"""
+        with self._candado:
+            consultas = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._datos),
+                "max_entradas": self.max_entradas,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "expulsiones": self.expulsiones,
+                "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+            }
@@ -0,0 +1,111 @@
+"""Registro de códigos de acceso, cargado una vez por proceso.
+
+Los códigos se leen de `codigos.txt` (o de los secrets si el archivo no tiene
+ninguno) y se guardan como HMAC con una sal aleatoria del proceso: en memoria
+no queda el texto de ningún código. La verificación calcula el HMAC del código
+capturado y lo busca en un diccionario, así que el costo no crece con el número
+de códigos y, como la sal es secreta, el tiempo de respuesta no revela cuántos
+caracteres coinciden. El código del día se compara con `hmac.compare_digest`.
+
+El registro se vuelve a leer solo cuando cambia el mtime o el tamaño del
+archivo, o el contenido de los secrets. El código diario `DIA%d%m%y` se
+calcula al verificar, no al cargar.
+"""
+import hashlib
+import hmac
+import json
+import os
+import threading
+from datetime import datetime
+
+# Nombre con el que se registra a quien entra con el código del día
+NOMBRE_DIARIO = "Acceso Temporal"
+
+
+def codigo_diario(fecha=None):
+    """Código dinámico del día (cambia cada día)"""
+    return f"DIA{(fecha or datetime.now()).strftime('%d%m%y')}"
+
+
+def leer_archivo(archivo):
+    """{código: nombre} de un archivo con líneas `CODIGO = Nombre`"""
+    codigos = {}
+    with open(archivo, 'r', encoding='utf-8') as f:
+        for linea in f:
+            linea = linea.strip()
+            if linea and not linea.startswith('#') and '=' in linea:
+                codigo, nombre = linea.split('=', 1)
+                codigos[codigo.strip()] = nombre.strip()
+    return codigos
+
+
+class RegistroCodigos:
+    """Códigos hasheados con sal, invalidados por mtime del archivo o cambio de secrets
+
+    - archivo: ruta de codigos.txt (puede no existir)
+    - leer_secretos: función sin argumentos que regresa {código: nombre} de los
+      secrets; se consulta solo si el archivo no tiene códigos
+    """
+
+    def __init__(self, archivo, leer_secretos=None):
+        self.archivo = archivo
+        self.leer_secretos = leer_secretos or dict
+        self.recargas = 0
+        self._sal = os.urandom(16)
+        self._firma = None
+        self._usa_secretos = False
+        self._huella_secretos = None
+        self._hashes = {}
+        self._candado = threading.Lock()
+
+    def _hash(self, codigo):
+        return hmac.new(self._sal, codigo.encode('utf-8'), hashlib.sha256).digest()
+
+    def _firma_archivo(self):
+        try:
+            info = os.stat(self.archivo)
+        except OSError:
+            return None
+        return (info.st_mtime_ns, info.st_size)
+
+    def _huella(self, secretos):
+        return hashlib.sha256(json.dumps(secretos, sort_keys=True, default=str).encode('utf-8')).digest()
+
+    def _revisar(self):
+        """Recarga los códigos si cambió el archivo o, cuando se usan, los secrets"""
+        with self._candado:
+            firma = self._firma_archivo()
+            secretos = None
+            if self.recargas and firma == self._firma:
+                if not self._usa_secretos:
+                    return
+                secretos = self.leer_secretos()
+                if self._huella(secretos) == self._huella_secretos:
+                    return
+
+            try:
+                codigos = leer_archivo(self.archivo) if firma is not None else {}
+            except OSError:
+                codigos = {}
+            self._usa_secretos = not codigos
+            if self._usa_secretos:
+                codigos = secretos if secretos is not None else self.leer_secretos()
+                self._huella_secretos = self._huella(codigos)
+            self._hashes = {self._hash(str(c).strip()): str(n) for c, n in codigos.items()}
+            self._firma = firma
+            self.recargas += 1
+
+    def verificar(self, codigo):
+        """Nombre del usuario si el código es válido; None si no"""
+        self._revisar()
+        digest = self._hash(codigo)
+        nombre = self._hashes.get(digest)
+        if nombre is not None:
+            return nombre
+        if hmac.compare_digest(digest, self._hash(codigo_diario())):
+            return NOMBRE_DIARIO
+        return None
+
+    def __len__(self):
+        self._revisar()
+        return len(self._hashes)
@@ -0,0 +1,89 @@
+"""Índice espacial de rejilla para encontrar puntos cercanos (lat/lon en grados).
+
+Los puntos de destino se ordenan por celda de una rejilla con celdas de al
+menos `radio` km; cada origen solo revisa su celda y las 8 vecinas, que se
+localizan con búsqueda binaria sobre las celdas ordenadas. Las parejas
+candidatas se arman sin ciclos de Python y la distancia exacta (haversine)
+solo se calcula para ellas, así que el costo crece con el número de parejas
+cercanas y no con orígenes × destinos.
+
+Los orígenes se procesan por lotes para acotar la memoria aunque haya zonas
+muy densas.
+"""
+import numpy as np
+
+RADIO_TIERRA = 6371.0088
+
+# Kilómetros por grado de latitud
+_KM_GRADO = np.pi * RADIO_TIERRA / 180
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Distancia en km sobre la superficie de la Tierra"""
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=float)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * RADIO_TIERRA * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class Rejilla:
+    """Puntos de destino ordenados por celda, listos para buscar vecinos"""
+
+    def __init__(self, lat, lon, radio):
+        if radio <= 0:
+            raise ValueError("El radio debe ser mayor a 0 km")
+        self.lat = np.asarray(lat, dtype=float)
+        self.lon = np.asarray(lon, dtype=float)
+        self.radio = float(radio)
+        # Celdas en grados: en longitud se usa la latitud más alejada del ecuador
+        # para que ninguna celda mida menos de `radio` km
+        lat_max = min(np.abs(self.lat).max(initial=0.0) + self.radio / _KM_GRADO, 89.0)
+        self.alto = self.radio / _KM_GRADO
+        self.ancho = self.alto / np.cos(np.radians(lat_max))
+        celdas = self.celdas(self.lat, self.lon)
+        self.orden = np.argsort(celdas, kind="stable")
+        self.celdas_ordenadas = celdas[self.orden]
+
+    def celdas(self, lat, lon):
+        """Número de celda de cada punto (las filas dejan espacio para la vecina de arriba y abajo)"""
+        fila = np.floor((np.asarray(lat, dtype=float) + 90) / self.alto).astype(np.int64) + 1
+        columna = np.floor((np.asarray(lon, dtype=float) + 180) / self.ancho).astype(np.int64) + 1
+        return columna * (int(180 / self.alto) + 4) + fila
+
+    def pares(self, lat, lon, lote=4096):
+        """Itera (i, j, distancia) de cada origen i y destino j a `radio` km o menos
+
+        i es la posición en `lat`/`lon` y j la posición en los puntos de la rejilla.
+        """
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        filas_celda = int(180 / self.alto) + 4
+        vecinas = (np.array([-1, 0, 1])[:, None] * filas_celda + np.array([-1, 0, 1])[None, :]).ravel()
+        for desde in range(0, len(lat), lote):
+            origen = np.arange(desde, min(desde + lote, len(lat)))
+            buscar = (self.celdas(lat[origen], lon[origen])[:, None] + vecinas).ravel()
+            inicio = np.searchsorted(self.celdas_ordenadas, buscar, side="left")
+            fin = np.searchsorted(self.celdas_ordenadas, buscar, side="right")
+            cuantos = fin - inicio
+            total = cuantos.sum()
+            if not total:
+                continue
+            # Expande cada rango [inicio, fin) sin ciclos
+            i = np.repeat(np.repeat(origen, len(vecinas)), cuantos)
+            desplazamiento = np.arange(total) - np.repeat(np.cumsum(cuantos) - cuantos, cuantos)
+            j = self.orden[np.repeat(inicio, cuantos) + desplazamiento]
+            distancia = haversine(lat[i], lon[i], self.lat[j], self.lon[j])
+            cerca = distancia <= self.radio
+            yield i[cerca], j[cerca], distancia[cerca]
+
+
+def contar_cercanos(lat, lon, rejilla, lote=4096):
+    """Por origen: cuántos destinos hay a `radio` km, la suma de (1 - d / radio) y la distancia al más cercano"""
+    n = len(lat)
+    cuantos = np.zeros(n, dtype=np.int64)
+    cercania = np.zeros(n)
+    mas_cercano = np.full(n, np.inf)
+    for i, _, distancia in rejilla.pares(lat, lon, lote):
+        cuantos += np.bincount(i, minlength=n)
+        cercania += np.bincount(i, 1 - distancia / rejilla.radio, n)
+        np.minimum.at(mas_cercano, i, distancia)
+    return cuantos, cercania, mas_cercano
@@ -0,0 +1,171 @@
+"""Índices estacionales a partir de ventas históricas por tienda o región.
+
+El archivo (CSV o Parquet, mensual o diario) se lee por bloques y solo se
+guardan sumas por grupo y mes, así que la memoria depende del número de
+grupos y meses, no del tamaño del archivo. Las ventas se pasan a venta diaria
+promedio de cada mes (el motor usa meses de 28 días, así que febrero no debe
+verse como temporada baja solo por ser corto).
+
+Los índices salen de una descomposición multiplicativa clásica hecha para
+todos los grupos a la vez: tendencia con media móvil centrada 2×12, razón
+venta / tendencia y promedio de las razones de cada mes del año. Con menos de
+dos años de datos la tendencia se reemplaza por el promedio de cada año. Los
+índices se normalizan para promediar 1, así que no cambian el total anual.
+
+Los perfiles se guardan en un JSON para reutilizarse; el motor los aplica en
+cualquier horizonte porque `factores` repite el vector de 12 meses.
+"""
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from .archivos import PerfilesJSON, leer_por_bloques
+
+MESES = (
+    "Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio",
+    "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre",
+)
+
+# Grupo que se usa cuando el archivo no trae columna de tienda o región
+TODAS = "Todas"
+
+# Media móvil centrada de 12 meses (2×12)
+PESOS_2X12 = np.r_[0.5, np.ones(11), 0.5] / 12
+
+# Meses observados para usar la media móvil en lugar del promedio anual
+MESES_TENDENCIA = 24
+
+
+def acumular_mensual(archivo, columna_fecha="fecha", columna_ventas="ventas", columna_grupo="tienda",
+                     filas=500_000):
+    """Ventas por grupo y mes leyendo `archivo` por bloques
+
+    La columna de grupo es opcional; si no existe todo cuenta como TODAS.
+    Regresa un DataFrame indexado por (grupo, periodo) con ventas, filas y
+    primer y último día visto; periodo = año * 12 + mes - 1.
+    """
+    acumulado = None
+    for bloque in leer_por_bloques(archivo, [columna_fecha, columna_ventas], filas, opcionales=[columna_grupo]):
+        fecha = pd.to_datetime(bloque[columna_fecha], errors="coerce")
+        ventas = pd.to_numeric(bloque[columna_ventas], errors="coerce")
+        datos = pd.DataFrame({
+            "grupo": bloque[columna_grupo].astype(str) if columna_grupo in bloque else TODAS,
+            "periodo": fecha.dt.year * 12 + fecha.dt.month - 1,
+            "dia": fecha.dt.day,
+            "ventas": ventas,
+        })[fecha.notna() & ventas.notna()]
+        parcial = datos.groupby(["grupo", "periodo"]).agg(
+            ventas=("ventas", "sum"), filas=("ventas", "size"), dia_min=("dia", "min"), dia_max=("dia", "max"),
+        )
+        if acumulado is not None:
+            parcial = pd.concat([acumulado, parcial]).groupby(level=[0, 1]).agg(
+                {"ventas": "sum", "filas": "sum", "dia_min": "min", "dia_max": "max"}
+            )
+        acumulado = parcial
+
+    if acumulado is None or acumulado.empty:
+        raise ValueError("El archivo no tiene renglones con fecha y ventas válidas")
+    acumulado.index = acumulado.index.set_levels(acumulado.index.levels[1].astype(int), level=1)
+    return acumulado
+
+
+def venta_diaria(mensual, frecuencia="auto"):
+    """Venta diaria promedio de cada grupo y mes
+
+    Con datos diarios se divide entre los días cubiertos del mes (así los
+    meses incompletos de las orillas no se ven bajos); con datos mensuales,
+    entre los días del mes. "auto" decide por el número típico de filas por mes.
+    """
+    if frecuencia == "auto":
+        frecuencia = "diaria" if mensual["filas"].median() > 1 else "mensual"
+    if frecuencia == "diaria":
+        dias = mensual["dia_max"] - mensual["dia_min"] + 1
+    elif frecuencia == "mensual":
+        periodo = mensual.index.get_level_values("periodo").to_numpy()
+        inicio = pd.to_datetime({"year": periodo // 12, "month": periodo % 12 + 1, "day": 1})
+        dias = inicio.dt.days_in_month.to_numpy()
+    else:
+        raise ValueError(f"Frecuencia desconocida: {frecuencia!r} (usa auto, diaria o mensual)")
+    return mensual["ventas"] / dias
+
+
+def indices_estacionales(diaria):
+    """Índice de cada mes del año por grupo: DataFrame (grupos × MESES)
+
+    `diaria` es la serie de `venta_diaria`. Las series se alinean de enero a
+    diciembre en una matriz (grupos × meses) y se descomponen juntas. Incluye
+    la columna `meses` con los meses observados de cada grupo.
+    """
+    tabla = diaria.unstack("periodo")
+    inicio = tabla.columns.min() // 12 * 12
+    fin = (tabla.columns.max() // 12 + 1) * 12
+    x = tabla.reindex(columns=range(inicio, fin)).to_numpy(dtype=float, copy=True)
+    x[x <= 0] = np.nan
+    grupos, n = x.shape
+    observados = np.isfinite(x).sum(axis=1)
+
+    # Razón contra la media móvil 2×12 (NaN donde la ventana tiene huecos)
+    razon_tendencia = np.full_like(x, np.nan)
+    if n >= 13:
+        ventanas = np.lib.stride_tricks.sliding_window_view(x, 13, axis=1)
+        razon_tendencia[:, 6:n - 6] = x[:, 6:n - 6] / (ventanas @ PESOS_2X12)
+
+    # Razón contra el promedio de cada año (para historias cortas)
+    anios = x.reshape(grupos, -1, 12)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        razon_anual = (anios / np.nanmean(anios, axis=2, keepdims=True)).reshape(grupos, n)
+
+    usar_tendencia = (observados >= MESES_TENDENCIA)[:, None]
+    razon = np.where(usar_tendencia, razon_tendencia, razon_anual).reshape(grupos, -1, 12)
+    with warnings.catch_warnings():
+        # Meses del año sin ningún dato: quedan en 1
+        warnings.simplefilter("ignore", category=RuntimeWarning)
+        indices = np.nanmean(razon, axis=1)
+        indices = np.where(np.isfinite(indices), indices, 1.0)
+        indices = indices / indices.mean(axis=1, keepdims=True)
+
+    resultado = pd.DataFrame(indices, index=tabla.index, columns=list(MESES))
+    resultado["meses"] = observados
+    return resultado
+
+
+def ajustar(archivo, frecuencia="auto", filas=500_000, **columnas):
+    """Índices por grupo más el agregado TODAS (promedio ponderado por venta)
+
+    `columnas` acepta columna_fecha, columna_ventas y columna_grupo.
+    """
+    diaria = venta_diaria(acumular_mensual(archivo, filas=filas, **columnas), frecuencia)
+    indices = indices_estacionales(diaria)
+    if len(indices) > 1 and TODAS not in indices.index:
+        peso = diaria.groupby(level="grupo").mean().reindex(indices.index).to_numpy()
+        total = (indices[list(MESES)].to_numpy() * peso[:, None]).sum(axis=0) / peso.sum()
+        indices.loc[TODAS] = list(total / total.mean()) + [int(indices["meses"].max())]
+    return indices
+
+
+def vector_estacionalidad(indices, mes_inicio=1):
+    """Vector para el motor: el mes 1 de la proyección es `mes_inicio` (1 = enero)"""
+    return np.roll(np.asarray(indices, dtype=float), -(mes_inicio - 1))
+
+
+class PerfilesEstacionalidad(PerfilesJSON):
+    """Perfiles de estacionalidad: {nombre: {"indices": [12 números], "origen", "meses", "creado"}}"""
+
+    def guardar(self, indices, nombre, origen=""):
+        """Guarda en una sola escritura los perfiles de `ajustar`
+
+        TODAS (o el único grupo) queda con `nombre` y cada tienda o región como
+        "nombre · grupo". Regresa cuántos perfiles se guardaron.
+        """
+        perfiles = {}
+        for grupo, fila in indices.iterrows():
+            clave = nombre if grupo == TODAS or len(indices) == 1 else f"{nombre} · {grupo}"
+            perfiles[clave] = {
+                "indices": [round(float(v), 6) for v in fila[list(MESES)]],
+                "origen": origen,
+                "meses": int(fila["meses"]),
+            }
+        self.agregar(perfiles)
+        return len(perfiles)
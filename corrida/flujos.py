@@ -0,0 +1,144 @@
+"""Flujo de efectivo de la corrida: caja acumulada, VPN, recuperación y TIR.
+
+Los flujos van en el último eje con la inversión como salida en el mes 0 y la
+utilidad neta de cada mes después. Todas las funciones aceptan arreglos con
+cualquier número de series al frente (p. ej. una malla de escenarios o las
+muestras de una simulación) y las resuelven juntas.
+
+La TIR se calcula con Newton vectorizado: cada serie parte de un intervalo
+con cambio de signo del VPN (el más cercano a 0% en una malla de tasas) y,
+cuando el paso de Newton se sale de él o no es finito, se usa el punto medio
+(bisección). Solo se siguen iterando las series que aún no convergen.
+"""
+import numpy as np
+
+# Tasas mensuales donde se busca el intervalo inicial de la TIR
+MALLA_TIR = np.array([-0.95, -0.5, -0.2, -0.05, 0.0, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0])
+
+
+def flujos_caja(utilidad, inversion):
+    """Flujos (..., meses + 1): -inversión en el mes 0 y la utilidad de cada mes"""
+    utilidad = np.asarray(utilidad, dtype=float)
+    inversion = np.asarray(inversion, dtype=float)
+    forma = np.broadcast_shapes(utilidad.shape[:-1], inversion.shape)
+    return np.concatenate([
+        np.broadcast_to(-inversion[..., None], forma + (1,)),
+        np.broadcast_to(utilidad, forma + utilidad.shape[-1:]),
+    ], axis=-1)
+
+
+def tasa_mensual(tasa_anual):
+    """Tasa mensual equivalente a una tasa anual efectiva"""
+    return (1 + np.asarray(tasa_anual, dtype=float)) ** (1 / 12) - 1
+
+
+def descontar(flujos, tasa_anual):
+    """Cada flujo traído a valor presente del mes 0"""
+    flujos = np.asarray(flujos, dtype=float)
+    t = np.arange(flujos.shape[-1])
+    return flujos / (1 + tasa_mensual(tasa_anual)[..., None]) ** t
+
+
+def vpn(flujos, tasa_anual):
+    """Valor presente neto a una tasa anual"""
+    return descontar(flujos, tasa_anual).sum(axis=-1)
+
+
+def recuperacion(flujos):
+    """Meses (con fracción) hasta que la caja acumulada deja de ser negativa
+
+    Interpola dentro del mes en que se cruza el cero, así que con utilidad
+    constante coincide con inversión / utilidad. Regresa inf si al final del
+    horizonte la caja sigue negativa y 0 si nunca fue negativa.
+    """
+    flujos = np.asarray(flujos, dtype=float)
+    acumulado = np.cumsum(flujos, axis=-1)
+    negativo = acumulado < 0
+    n = flujos.shape[-1]
+    ultimo = n - 1 - np.argmax(negativo[..., ::-1], axis=-1)
+    k = np.minimum(ultimo, n - 2)[..., None]
+    falta = -np.take_along_axis(acumulado, k, axis=-1)[..., 0]
+    siguiente = np.take_along_axis(flujos, k + 1, axis=-1)[..., 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        meses = k[..., 0] + falta / siguiente
+    meses = np.where(ultimo >= n - 1, np.inf, meses)
+    return np.where(negativo.any(axis=-1), meses, 0.0)[()]
+
+
+def _vpn_y_derivada(flujos, r, t):
+    """VPN mensual y su derivada respecto a la tasa, una tasa por serie"""
+    descuento = (1 + r)[:, None] ** -t
+    valor = flujos * descuento
+    return valor.sum(axis=1), -(t * valor).sum(axis=1) / (1 + r)
+
+
+def tir(flujos, iteraciones=100, tolerancia=1e-10):
+    """TIR mensual de cada serie (último eje)
+
+    Regresa NaN donde el VPN no cambia de signo en todo MALLA_TIR (p. ej. si
+    nunca se recupera nada). Con flujos no convencionales (la utilidad se
+    vuelve negativa más adelante) puede haber dos raíces: regresa la más
+    cercana a 0%.
+    """
+    flujos = np.asarray(flujos, dtype=float)
+    forma = flujos.shape[:-1]
+    flujos = flujos.reshape(-1, flujos.shape[-1])
+    n = len(flujos)
+    t = np.arange(flujos.shape[-1])
+
+    with np.errstate(over="ignore", divide="ignore", invalid="ignore"):
+        # Intervalo inicial: entre los tramos de la malla con cambio de signo, el más cercano a 0%
+        signos = np.sign(flujos @ ((1 + MALLA_TIR)[None, :] ** -t[:, None]))
+        cambia = signos[:, :-1] * signos[:, 1:] < 0
+        distancia = np.minimum(np.abs(MALLA_TIR[:-1]), np.abs(MALLA_TIR[1:]))
+        tramo = np.argmin(np.where(cambia, distancia, np.inf), axis=1)
+        valida = cambia.any(axis=1)
+        bajo, alto = MALLA_TIR[tramo], MALLA_TIR[tramo + 1]
+        vpn_bajo = _vpn_y_derivada(flujos, bajo, t)[0]
+
+        r = (bajo + alto) / 2
+        activas = np.flatnonzero(valida)
+        for _ in range(iteraciones):
+            if not len(activas):
+                break
+            ra = r[activas]
+            valor, derivada = _vpn_y_derivada(flujos[activas], ra, t)
+
+            # El intervalo se achica hacia el lado donde sigue el cambio de signo
+            mismo_signo = np.sign(valor) == np.sign(vpn_bajo[activas])
+            bajo[activas] = np.where(mismo_signo, ra, bajo[activas])
+            vpn_bajo[activas] = np.where(mismo_signo, valor, vpn_bajo[activas])
+            alto[activas] = np.where(mismo_signo, alto[activas], ra)
+
+            nueva = ra - valor / derivada
+            fuera = ~np.isfinite(nueva) | (nueva <= bajo[activas]) | (nueva >= alto[activas])
+            nueva = np.where(fuera, (bajo[activas] + alto[activas]) / 2, nueva)
+            r[activas] = nueva
+            convergio = (np.abs(nueva - ra) <= tolerancia * (1 + np.abs(ra))) | (valor == 0)
+            activas = activas[~convergio]
+
+    r[~valida] = np.nan
+    return r.reshape(forma)[()]
+
+
+def analizar(utilidad, inversion, tasa_anual):
+    """Flujo de efectivo completo de una o muchas corridas
+
+    Regresa los flujos y su caja acumulada (simple y descontada), el VPN a
+    `tasa_anual`, la TIR mensual y anual, y los meses de recuperación simple
+    y descontada (contando el crecimiento, a diferencia de inversión / utilidad
+    del mes base).
+    """
+    flujos = flujos_caja(utilidad, inversion)
+    descontados = descontar(flujos, tasa_anual)
+    tir_mes = tir(flujos)
+    return {
+        "flujos": flujos,
+        "acumulado": np.cumsum(flujos, axis=-1),
+        "acumulado_descontado": np.cumsum(descontados, axis=-1),
+        "vpn": descontados.sum(axis=-1),
+        "tir_mensual": tir_mes,
+        "tir_anual": (1 + tir_mes) ** 12 - 1,
+        "recuperacion": recuperacion(flujos),
+        "recuperacion_descontada": recuperacion(descontados),
+    }
@@ -0,0 +1,185 @@
+"""Historial de corridas en SQLite.
+
+Cada corrida guardada lleva los datos del franquiciatario, modelo, escenario,
+las entradas del sidebar, los gastos fijos, los KPIs y el resultado completo
+(mes base, proyección y resúmenes por periodo) comprimido, para reabrirla
+sin volver a calcular.
+
+Los listados no leen el resultado y paginan por cursor (`id < ?`) sobre
+índices por usuario, ubicación y fecha, así que la página 1 y la 10,000 cuestan
+lo mismo aunque haya cientos de miles de renglones.
+"""
+import json
+import sqlite3
+import threading
+import zlib
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS corridas (
+    id INTEGER PRIMARY KEY,
+    creada TEXT NOT NULL,
+    usuario_codigo TEXT NOT NULL,
+    usuario TEXT NOT NULL,
+    nombre TEXT NOT NULL,
+    ubicacion TEXT NOT NULL,
+    proposito TEXT NOT NULL,
+    notas TEXT NOT NULL DEFAULT '',
+    modelo TEXT NOT NULL,
+    escenario TEXT NOT NULL,
+    entradas TEXT NOT NULL,
+    params TEXT NOT NULL,
+    ventas_totales REAL,
+    utilidad_neta REAL,
+    margen_neto REAL,
+    roi_anual REAL,
+    meses_recuperacion REAL,
+    ventas_anual INTEGER,
+    util_anual INTEGER,
+    resultado BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS corridas_usuario ON corridas (usuario_codigo, id);
+CREATE INDEX IF NOT EXISTS corridas_ubicacion ON corridas (ubicacion COLLATE NOCASE, id);
+CREATE INDEX IF NOT EXISTS corridas_creada ON corridas (creada);
+"""
+
+# Columnas de los listados (sin el resultado, que es lo pesado)
+COLUMNAS_LISTA = (
+    "id", "creada", "usuario_codigo", "usuario", "nombre", "ubicacion", "proposito",
+    "modelo", "escenario", "ventas_totales", "utilidad_neta", "margen_neto",
+    "roi_anual", "meses_recuperacion", "ventas_anual", "util_anual",
+)
+
+KPIS = ("ventas_totales", "utilidad_neta", "margen_neto", "roi_anual", "meses_recuperacion")
+
+
+def _a_json(valor):
+    """Arreglos y escalares de NumPy como listas y números de Python"""
+    if isinstance(valor, np.ndarray):
+        return valor.tolist()
+    if isinstance(valor, np.generic):
+        return valor.item()
+    raise TypeError(f"No se puede guardar {type(valor).__name__}")
+
+
+def empacar(corrida):
+    """Mes base, proyección y resúmenes por periodo de una corrida, comprimidos"""
+    datos = {
+        "base": corrida["base"],
+        "proy": corrida["proy"],
+        "periodos": {p: tabla.to_dict(orient="list") for p, tabla in corrida["periodos"].items()},
+        "util_anual": corrida["util_anual"],
+        "ventas_anual": corrida["ventas_anual"],
+    }
+    return zlib.compress(json.dumps(datos, default=_a_json).encode("utf-8"))
+
+
+def desempacar(blob):
+    """Reconstruye la corrida guardada con la misma forma que `correr_corrida`"""
+    datos = json.loads(zlib.decompress(blob))
+    return {
+        "base": {k: np.float64(v) for k, v in datos["base"].items()},
+        "proy": {k: np.asarray(v) for k, v in datos["proy"].items()},
+        "periodos": {p: pd.DataFrame(tabla) for p, tabla in datos["periodos"].items()},
+        "util_anual": datos["util_anual"],
+        "ventas_anual": datos["ventas_anual"],
+    }
+
+
+class Historial:
+    """Corridas guardadas en un archivo SQLite compartido por el servidor
+
+    Cada hilo usa su propia conexión; el modo WAL deja leer mientras otra
+    sesión escribe.
+    """
+
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self._local = threading.local()
+        self._conexion().executescript(ESQUEMA)
+
+    def _conexion(self):
+        conexion = getattr(self._local, "conexion", None)
+        if conexion is None:
+            conexion = sqlite3.connect(self.ruta, timeout=10)
+            conexion.row_factory = sqlite3.Row
+            conexion.execute("PRAGMA journal_mode=WAL")
+            conexion.execute("PRAGMA synchronous=NORMAL")
+            self._local.conexion = conexion
+        return conexion
+
+    def guardar(self, usuario_codigo, usuario, datos_f, modelo, escenario, entradas, params, corrida):
+        """Guarda una corrida y regresa su id"""
+        base = corrida["base"]
+        fila = {
+            "creada": datetime.now().isoformat(timespec="seconds"),
+            "usuario_codigo": usuario_codigo,
+            "usuario": usuario,
+            "nombre": datos_f["nombre"],
+            "ubicacion": datos_f["ubicacion"],
+            "proposito": datos_f["proposito"],
+            "notas": datos_f.get("notas", ""),
+            "modelo": modelo,
+            "escenario": escenario,
+            "entradas": json.dumps(entradas, ensure_ascii=False, default=_a_json),
+            "params": json.dumps(params, default=_a_json),
+            **{k: float(base[k]) for k in KPIS},
+            "ventas_anual": corrida["ventas_anual"],
+            "util_anual": corrida["util_anual"],
+            "resultado": empacar(corrida),
+        }
+        conexion = self._conexion()
+        with conexion:
+            cursor = conexion.execute(
+                f"INSERT INTO corridas ({', '.join(fila)}) VALUES ({', '.join('?' * len(fila))})",
+                tuple(fila.values()),
+            )
+        return cursor.lastrowid
+
+    def listar(self, usuario_codigo=None, ubicacion=None, desde=None, antes_de=None, limite=10):
+        """Corridas de la más reciente a la más vieja, sin el resultado
+
+        - antes_de: id de la última corrida de la página anterior (cursor)
+        - desde: fecha ISO mínima de creación
+        """
+        condiciones, valores = [], []
+        if usuario_codigo is not None:
+            condiciones.append("usuario_codigo = ?")
+            valores.append(usuario_codigo)
+        if ubicacion:
+            condiciones.append("ubicacion = ? COLLATE NOCASE")
+            valores.append(ubicacion.strip())
+        if desde:
+            condiciones.append("creada >= ?")
+            valores.append(desde)
+        if antes_de is not None:
+            condiciones.append("id < ?")
+            valores.append(antes_de)
+        donde = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        filas = self._conexion().execute(
+            f"SELECT {', '.join(COLUMNAS_LISTA)} FROM corridas {donde} ORDER BY id DESC LIMIT ?",
+            (*valores, limite),
+        ).fetchall()
+        return [dict(f) for f in filas]
+
+    def cargar(self, id_corrida, usuario_codigo=None):
+        """Corrida completa (entradas, params y resultado) o None si no existe
+
+        Con `usuario_codigo` solo regresa corridas de ese usuario.
+        """
+        consulta = "SELECT * FROM corridas WHERE id = ?"
+        valores = [id_corrida]
+        if usuario_codigo is not None:
+            consulta += " AND usuario_codigo = ?"
+            valores.append(usuario_codigo)
+        fila = self._conexion().execute(consulta, valores).fetchone()
+        if fila is None:
+            return None
+        fila = dict(fila)
+        fila["entradas"] = json.loads(fila["entradas"])
+        fila["params"] = json.loads(fila["params"])
+        fila["corrida"] = desempacar(fila.pop("resultado"))
+        return fila
@@ -0,0 +1,136 @@
+"""Tráfico hora por hora: perfiles por hora del día y día de la semana.
+
+El mes base del motor supone tráfico plano (`flujo * horas * dias`). Aquí el
+año (o varios) se simula como un arreglo de 8,760 horas: a cada hora le toca
+el peso de su hora del día y de su día de la semana, la conversión de esa hora
+y si la tienda está abierta. La suma de cada mes son sus "horas efectivas":
+clientes del mes = flujo × conversión × horas efectivas, con el flujo de una
+hora típica como en el sidebar.
+
+Los perfiles están normalizados para que con el horario de siempre (9:00 a
+21:00, los 7 días) una hora promedio pese 1. El calendario se arma una vez
+por año y mes de inicio, y cualquier horario se evalúa con unas cuantas
+operaciones sobre el arreglo, también muchos horarios a la vez (eje al frente).
+
+Para el motor (`ajuste_motor`) las horas se miden contra el horario de
+siempre en el mismo calendario, así que prender el modelo sin cambiar el
+horario reproduce el mes plano de 28 días; las horas de operación sí usan
+los días reales de cada mes para comparar clientes contra sueldos.
+"""
+from functools import lru_cache
+
+import numpy as np
+
+from .motor import HORAS
+
+DIAS_SEMANA = ("Lun", "Mar", "Mié", "Jue", "Vie", "Sáb", "Dom")
+
+# Horario de siempre: abre a las 9 y cierra a las 21, todos los días
+APERTURA = 9
+CIERRE = 21
+
+# Gente que pasa por hora del día (0 = medianoche), relativo a una hora típica
+_HORA = np.array([
+    0.12, 0.08, 0.06, 0.05, 0.06, 0.12, 0.30, 0.55, 0.80, 0.95, 1.05, 1.05,
+    1.00, 1.00, 0.95, 0.90, 0.95, 1.05, 1.20, 1.25, 1.10, 0.85, 0.55, 0.25,
+])
+
+# Gente que pasa por día de la semana (lunes primero)
+_DIA = np.array([1.00, 0.97, 0.97, 1.00, 1.06, 1.10, 0.90])
+
+# Quien entra de noche casi siempre compra (urgencias)
+CONVERSION_HORA = np.r_[np.full(7, 1.25), np.ones(15), np.full(2, 1.10)]
+
+
+def abiertas(apertura=APERTURA, cierre=CIERRE):
+    """Máscara (..., 24) de horas abiertas; si cierre <= apertura cruza la medianoche (0 a 24 = 24 h)"""
+    apertura = np.asarray(apertura)[..., None] % 24
+    cierre = np.asarray(cierre)[..., None]
+    h = np.arange(24)
+    dentro = (h >= apertura) & (h < cierre)
+    cruza = (h >= apertura) | (h < cierre % 24)
+    return np.where(cierre - apertura >= 24, True, np.where(cierre > apertura, dentro, cruza))
+
+
+def _normalizar(perfil_hora, perfil_dia, conversion_hora):
+    """Escala los perfiles para que la hora promedio del horario de siempre pese 1"""
+    base = abiertas()
+    peso = np.outer(perfil_dia, perfil_hora * conversion_hora)[:, base]
+    return np.asarray(perfil_hora, dtype=float) / peso.mean()
+
+
+PERFIL_HORA = _normalizar(_HORA, _DIA, CONVERSION_HORA)
+PERFIL_DIA = _DIA
+
+
+@lru_cache(maxsize=32)
+def calendario(anio, mes_inicio=1, meses=12):
+    """Hora del día, día de la semana e inicio de cada mes del horizonte
+
+    Regresa (hora, dia_semana, inicios) para las horas desde el día 1 de
+    `mes_inicio` de `anio`; `inicios` son los índices donde empieza cada mes.
+    """
+    inicio = np.datetime64(f"{anio:04d}-{mes_inicio:02d}", "M")
+    meses_horizonte = inicio + np.arange(meses + 1)
+    horas = np.arange(meses_horizonte[0].astype("datetime64[h]"), meses_horizonte[-1].astype("datetime64[h]"))
+    dia = horas.astype("datetime64[D]")
+    hora = (horas - dia).astype(int)
+    # 1970-01-01 fue jueves
+    dia_semana = (dia.astype(int) + 3) % 7
+    inicios = (meses_horizonte[:-1].astype("datetime64[h]") - horas[0]).astype(int)
+    for arreglo in (hora, dia_semana, inicios):
+        arreglo.flags.writeable = False
+    return hora, dia_semana, inicios
+
+
+def trafico(anio, mes_inicio=1, meses=12, apertura=APERTURA, cierre=CIERRE, dias=(True,) * 7,
+            perfil_hora=PERFIL_HORA, perfil_dia=PERFIL_DIA, conversion_hora=CONVERSION_HORA):
+    """Peso de cada hora del horizonte (..., horas): tráfico × conversión relativa, 0 si está cerrado
+
+    apertura, cierre y dias (7 booleanos, lunes primero) pueden traer ejes al
+    frente para evaluar varios horarios a la vez.
+    """
+    hora, dia_semana, _ = calendario(anio, mes_inicio, meses)
+    por_hora = abiertas(apertura, cierre) * np.asarray(perfil_hora) * np.asarray(conversion_hora)
+    por_dia = np.asarray(dias, dtype=bool) * np.asarray(perfil_dia, dtype=float)
+    return por_hora[..., hora] * por_dia[..., dia_semana]
+
+
+def horas_efectivas(anio, mes_inicio=1, meses=12, **horario):
+    """Horas efectivas de cada mes (..., meses): clientes del mes = flujo × conversión × esto"""
+    _, _, inicios = calendario(anio, mes_inicio, meses)
+    return np.add.reduceat(trafico(anio, mes_inicio, meses, **horario), inicios, axis=-1)
+
+
+def ajuste_motor(efectivas, anio, mes_inicio=1):
+    """Horas por día e índice mensual para el motor a partir de `horas_efectivas`
+
+    El motor usa meses de 28 días y la estacionalidad es por venta diaria,
+    así que el calendario real (meses de 28 a 31 días) no debe mover la
+    proyección: cada mes se compara contra el horario de siempre en el mismo
+    mes. Con ese horario salen HORAS horas e índice 1, igual que el modelo
+    plano; abrir más horas o cerrar un día sí cambian las horas (van en
+    params["horas"]) y el índice (promedio 1), que reparte el cambio por mes
+    según su mezcla de días de la semana y se multiplica por la estacionalidad.
+    """
+    referencia = horas_efectivas(anio, mes_inicio, efectivas.shape[-1])
+    relativo = efectivas / referencia
+    promedio = relativo.mean(axis=-1, keepdims=True)
+    return HORAS * promedio[..., 0], relativo / promedio
+
+
+def por_hora_del_dia(anio, mes_inicio=1, meses=12, dias=(True,) * 7, **perfiles):
+    """Horas efectivas por mes que aporta cada hora del día si se abre (24,)
+
+    Sirve para decidir horas de personal: clientes al mes de abrir la hora h =
+    flujo × conversión × resultado[h].
+    """
+    hora, _, _ = calendario(anio, mes_inicio, meses)
+    peso = trafico(anio, mes_inicio, meses, apertura=0, cierre=24, dias=dias, **perfiles)
+    return np.bincount(hora, peso, 24) / meses
+
+
+def dias_abiertos(anio, mes_inicio=1, meses=12, dias=(True,) * 7):
+    """Días abiertos en un mes promedio (para el costo de cada hora de personal)"""
+    hora, dia_semana, _ = calendario(anio, mes_inicio, meses)
+    return np.asarray(dias, dtype=bool)[dia_semana[hora == 0]].sum() / meses
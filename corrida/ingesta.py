@@ -0,0 +1,190 @@
+"""Ingesta de exportaciones del punto de venta (POS) para calibrar presets.
+
+Cada renglón del archivo es una línea de ticket: tienda, folio, fecha y hora,
+categoría, importe y costo. El archivo se lee por bloques y de cada bloque
+solo quedan sumas por tienda y categoría (con np.bincount) y las horas con
+venta de cada tienda, así que la memoria depende del número de tiendas y de
+horas, no de los renglones: decenas de millones de líneas caben igual.
+
+Las líneas de un mismo ticket deben venir juntas, como las exporta el POS: un
+ticket nuevo empieza donde cambia el folio o la tienda, también entre bloques.
+
+De los totales salen, por tienda, el ticket promedio, las transacciones por
+hora con venta, la mezcla de genéricos/patente/abarrotes y el COGS de cada
+categoría; `calibrar` los traduce a los campos del motor.
+"""
+import numpy as np
+import pandas as pd
+
+from .archivos import leer_por_bloques
+from .estacionalidad import TODAS
+from .motor import HORAS
+
+# Categorías del POS; lo que no se reconozca cuenta como farmacia en "otros"
+CATEGORIAS = ("genericos", "patente", "abarrotes", "otros")
+
+# Nombre de cada columna en el archivo (se pueden cambiar con `columnas`)
+COLUMNAS = {
+    "tienda": "tienda",
+    "folio": "folio",
+    "fecha": "fecha",
+    "categoria": "categoria",
+    "importe": "importe",
+    "costo": "costo",
+}
+
+# Las horas con venta se guardan como tienda * _ESCALA_HORA + horas desde 1970
+_ESCALA_HORA = 1 << 24
+
+
+def _categorias(serie):
+    """Índice en CATEGORIAS de cada renglón (solo se normalizan los valores distintos)"""
+    codigos, unicos = pd.factorize(serie)
+    nombres = (
+        pd.Index(unicos.astype(str)).str.lower().str.strip()
+        .str.normalize("NFKD").str.encode("ascii", "ignore").str.decode("ascii")
+    )
+    mapa = np.select(
+        [nombres.str.startswith("gen"), nombres.str.startswith("pat"), nombres.str.startswith("aba")],
+        [0, 1, 2], len(CATEGORIAS) - 1,
+    )
+    # El código -1 (vacío) toma el último elemento: "otros"
+    return np.append(mapa, len(CATEGORIAS) - 1)[codigos]
+
+
+def _crecer(arreglo, filas):
+    """Agrega filas en cero hasta tener `filas`"""
+    faltan = filas - len(arreglo)
+    return np.pad(arreglo, [(0, faltan)] + [(0, 0)] * (arreglo.ndim - 1)) if faltan else arreglo
+
+
+def ingerir(archivo, filas=500_000, columnas=None):
+    """Totales y razones por tienda de una exportación del POS
+
+    `columnas` cambia nombres de COLUMNAS (p. ej. {"folio": "ticket"}). Los
+    renglones sin tienda, fecha, importe o costo válidos se ignoran. Regresa
+    un DataFrame indexado por tienda, más la fila TODAS si hay varias.
+    """
+    nombres = {**COLUMNAS, **(columnas or {})}
+    n_cat = len(CATEGORIAS)
+    tiendas = {}
+    importe = np.zeros((0, n_cat))
+    costo = np.zeros((0, n_cat))
+    renglones = np.zeros(0, dtype=np.int64)
+    transacciones = np.zeros(0, dtype=np.int64)
+    horas = np.zeros(0, dtype=np.int64)
+    anterior = None
+
+    texto = [nombres["tienda"], nombres["folio"], nombres["categoria"]]
+    for bloque in leer_por_bloques(archivo, list(nombres.values()), filas, texto=texto):
+        fecha = pd.to_datetime(bloque[nombres["fecha"]], errors="coerce").to_numpy()
+        monto = pd.to_numeric(bloque[nombres["importe"]], errors="coerce").to_numpy(dtype=float)
+        costo_linea = pd.to_numeric(bloque[nombres["costo"]], errors="coerce").to_numpy(dtype=float)
+        codigos, unicos = pd.factorize(bloque[nombres["tienda"]])
+        validas = (codigos >= 0) & ~np.isnat(fecha) & np.isfinite(monto) & np.isfinite(costo_linea)
+        if not validas.any():
+            continue
+
+        # Tiendas del bloque a su índice global
+        globales = np.array([tiendas.setdefault(str(u), len(tiendas)) for u in unicos], dtype=np.int64)
+        tienda = globales[codigos[validas]]
+        categoria = _categorias(bloque[nombres["categoria"]])[validas]
+        folio = bloque[nombres["folio"]].to_numpy()[validas]
+        monto, costo_linea, fecha = monto[validas], costo_linea[validas], fecha[validas]
+
+        # Un ticket empieza donde cambia el folio o la tienda (contra el bloque anterior en la orilla)
+        nuevo = np.empty(len(folio), dtype=bool)
+        nuevo[1:] = (folio[1:] != folio[:-1]) | (tienda[1:] != tienda[:-1])
+        nuevo[0] = anterior != (tienda[0], folio[0])
+        anterior = (tienda[-1], folio[-1])
+
+        n = len(tiendas)
+        importe, costo = _crecer(importe, n), _crecer(costo, n)
+        renglones, transacciones = _crecer(renglones, n), _crecer(transacciones, n)
+        clave = tienda * n_cat + categoria
+        importe += np.bincount(clave, monto, n * n_cat).reshape(n, n_cat)
+        costo += np.bincount(clave, costo_linea, n * n_cat).reshape(n, n_cat)
+        renglones += np.bincount(tienda, minlength=n)
+        transacciones += np.bincount(tienda, nuevo, n).astype(np.int64)
+
+        hora = fecha.astype("datetime64[h]").astype(np.int64)
+        horas = np.union1d(horas, np.unique(tienda * _ESCALA_HORA + hora))
+
+    if not tiendas:
+        raise ValueError("El archivo no tiene renglones con tienda, fecha, importe y costo válidos")
+
+    n = len(tiendas)
+    tienda_hora, hora = np.divmod(horas, _ESCALA_HORA)
+    dias = np.unique(tienda_hora * _ESCALA_HORA + hora // 24) // _ESCALA_HORA
+    totales = {
+        "renglones": renglones,
+        "transacciones": transacciones,
+        "horas_con_venta": np.bincount(tienda_hora, minlength=n),
+        "dias_con_venta": np.bincount(dias, minlength=n),
+        **{f"ventas_{c}": importe[:, i] for i, c in enumerate(CATEGORIAS)},
+        **{f"costo_{c}": costo[:, i] for i, c in enumerate(CATEGORIAS)},
+    }
+    resumen = pd.DataFrame(totales, index=pd.Index(list(tiendas), name="tienda")).sort_index()
+    if n > 1:
+        resumen.loc[TODAS] = resumen.sum()
+    return razones(resumen)
+
+
+def razones(resumen):
+    """Agrega ticket promedio, transacciones por hora y por día, mezcla y COGS a los totales"""
+    ventas = resumen[[f"ventas_{c}" for c in CATEGORIAS]].to_numpy().sum(axis=1)
+    costo = resumen[[f"costo_{c}" for c in CATEGORIAS]].to_numpy().sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        resumen = resumen.assign(
+            ventas=ventas,
+            ticket_promedio=ventas / resumen["transacciones"],
+            transacciones_hora=resumen["transacciones"] / resumen["horas_con_venta"],
+            transacciones_dia=resumen["transacciones"] / resumen["dias_con_venta"],
+            horas_dia=resumen["horas_con_venta"] / resumen["dias_con_venta"],
+            cogs=costo / ventas,
+            **{f"mezcla_{c}": resumen[f"ventas_{c}"] / ventas for c in CATEGORIAS},
+            **{f"cogs_{c}": resumen[f"costo_{c}"] / resumen[f"ventas_{c}"] for c in CATEGORIAS},
+        )
+    return resumen
+
+
+def calibrar(resumen, conversion):
+    """Campos del motor por tienda: flujo, conversion, ticket, cogs, abarrotes_pct y cogs_abarrotes
+
+    El POS ve transacciones, no personas que pasan: el flujo se despeja con
+    `conversion` (la del preset) para que flujo × conversión × HORAS dé las
+    transacciones de un día con venta, sin importar cuántas horas abra la
+    tienda. El ticket es la venta de farmacia (todo menos abarrotes) por
+    transacción y los abarrotes van como fracción de ella, igual que en el motor.
+    """
+    farmacia = [f"ventas_{c}" for c in CATEGORIAS if c != "abarrotes"]
+    costo_farmacia = [f"costo_{c}" for c in CATEGORIAS if c != "abarrotes"]
+    ventas_farmacia = resumen[farmacia].sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return pd.DataFrame({
+            "flujo": resumen["transacciones_dia"] / (HORAS * conversion),
+            "conversion": conversion,
+            "ticket": ventas_farmacia / resumen["transacciones"],
+            "cogs": resumen[costo_farmacia].sum(axis=1) / ventas_farmacia,
+            "abarrotes_pct": resumen["ventas_abarrotes"] / ventas_farmacia,
+            "cogs_abarrotes": resumen["cogs_abarrotes"],
+        }, index=resumen.index)
+
+
+def perfiles_calibrados(resumen, conversion, nombre, origen=""):
+    """Perfiles {nombre: datos} para PerfilesJSON: TODAS con `nombre` y cada tienda como "nombre · tienda"
+
+    Los campos que no se pudieron calcular (p. ej. COGS de abarrotes en una
+    tienda sin abarrotes) se omiten y el preset conserva el suyo.
+    """
+    campos = calibrar(resumen, conversion)
+    perfiles = {}
+    for tienda, fila in campos.iterrows():
+        clave = nombre if tienda == TODAS or len(campos) == 1 else f"{nombre} · {tienda}"
+        perfiles[clave] = {
+            "preset": {k: round(float(v), 4) for k, v in fila.items() if np.isfinite(v)},
+            "origen": origen,
+            "transacciones": int(resumen.at[tienda, "transacciones"]),
+            "dias": int(resumen.at[tienda, "dias_con_venta"]),
+        }
+    return perfiles
@@ -0,0 +1,60 @@
+"""Evaluación por lotes: muchas corridas en una sola pasada vectorizada"""
+import numpy as np
+import pandas as pd
+
+from .motor import CAMPOS, mes_base, parametros, proyectar
+from .periodos import resumir
+from .presets import ESCENARIOS, MODELOS
+
+
+def apilar(lista_params):
+    """Apila una lista de diccionarios de parámetros en arreglos de NumPy"""
+    return {
+        k: np.array([params[k] for params in lista_params], dtype=float)
+        for k in CAMPOS
+        if all(k in params for params in lista_params)
+    }
+
+
+def correr_corrida(params, meses=12, estacionalidad=None):
+    """Corrida completa de una franquicia: mes base, proyección y resúmenes
+
+    Es lo que consumen la pantalla, el reporte PDF y el procesamiento por
+    lotes; los totales anuales suman los montos mensuales ya redondeados
+    igual que la tabla de la app.
+    """
+    proy = proyectar(params, meses=meses, estacionalidad=estacionalidad)
+    primer_anio = slice(0, 12)
+    return {
+        "base": mes_base(params),
+        "proy": proy,
+        "periodos": resumir(proy, params["inversion"]),
+        "util_anual": int(np.round(proy["utilidad_neta"][primer_anio]).sum()),
+        "ventas_anual": int(np.round(proy["ventas_totales"][primer_anio]).sum()),
+    }
+
+
+def evaluar_presets(modelos=None, escenarios=None, **cambios):
+    """Evalúa todas las combinaciones modelo × escenario en una sola llamada
+
+    `cambios` se aplica por igual a todas las combinaciones (p. ej. un mismo
+    flujo para comparar modelos en la misma ubicación).
+    """
+    modelos = list(modelos or MODELOS)
+    escenarios = list(escenarios or ESCENARIOS)
+    combinaciones = [(mo, es) for mo in modelos for es in escenarios]
+
+    params = apilar([parametros(mo, es, **cambios) for mo, es in combinaciones])
+    base = mes_base(params)
+
+    return pd.DataFrame({
+        "modelo": [mo for mo, _ in combinaciones],
+        "escenario": [es for _, es in combinaciones],
+        "inversion": params["inversion"],
+        "ventas_totales": base["ventas_totales"],
+        "utilidad_neta": base["utilidad_neta"],
+        "margen_neto": base["margen_neto"],
+        "ventas_be": base["ventas_be"],
+        "roi_anual": base["roi_anual"],
+        "meses_recuperacion": base["meses_recuperacion"],
+    })
@@ -0,0 +1,209 @@
+"""Motor de la corrida financiera: mes base y proyección mensual.
+
+Los parámetros pueden ser escalares o arreglos de NumPy. Los arreglos se
+combinan por broadcasting, así que una sola llamada evalúa tantos escenarios
+como filas tengan los parámetros, sin ciclos de Python.
+"""
+import numpy as np
+
+from .presets import MODELOS, PRESETS
+
+# Valores fijos de operación (simplificados)
+HORAS = 12
+DIAS = 28
+
+CAMPOS = (
+    "flujo", "conversion", "ticket", "cogs", "gastos_fijos", "gastos_var", "crec",
+    "consultas", "surten", "ticket_receta", "ingreso_consulta", "cogs_receta",
+    "abarrotes_pct", "cogs_abarrotes", "inversion", "horas", "dias",
+)
+
+
+def parametros(modelo, escenario, **cambios):
+    """Arma los parámetros de un preset con los mismos defaults que la app"""
+    m = MODELOS[modelo]
+    p = PRESETS[modelo][escenario]
+
+    params = {
+        "flujo": p["flujo"],
+        "conversion": p["conversion"],
+        "ticket": p["ticket"],
+        "cogs": p["cogs"],
+        "gastos_fijos": p["gastos_fijos"],
+        "gastos_var": p["gastos_var"],
+        "crec": p["crec"],
+        "consultas": 0,
+        "surten": 0,
+        "ticket_receta": 0,
+        "ingreso_consulta": 0,
+        "cogs_receta": p["cogs"],
+        "abarrotes_pct": 0,
+        "cogs_abarrotes": 0,
+        "inversion": m["inversion"],
+        "horas": HORAS,
+        "dias": DIAS,
+    }
+    if m["consultorio"]:
+        params.update(
+            consultas=p.get("consultas", 0),
+            surten=p.get("surten", 0.6),
+            ticket_receta=p.get("ticket_receta", 120),
+            ingreso_consulta=p.get("ingreso_consulta", 40),
+            cogs_receta=p.get("cogs_receta", p["cogs"]),
+        )
+    if m["abarrotes"]:
+        params.update(
+            abarrotes_pct=p.get("abarrotes_pct", 0.15),
+            cogs_abarrotes=p.get("cogs_abarrotes", 0.88),
+        )
+
+    params.update(cambios)
+    return params
+
+
+def _arreglos(params):
+    """Convierte los parámetros a arreglos float (los faltantes toman su default)"""
+    faltantes = {"horas": HORAS, "dias": DIAS, "cogs_receta": params.get("cogs", 0)}
+    return {
+        k: np.asarray(params.get(k, faltantes.get(k, 0)), dtype=float)
+        for k in CAMPOS
+    }
+
+
+def _dividir(num, den, defecto):
+    """num / den donde den > 0; `defecto` en otro caso"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(den > 0, num / np.where(den > 0, den, 1), defecto)
+
+
+def _escalares(resultado):
+    """Regresa escalares de NumPy en lugar de arreglos de dimensión cero"""
+    return {k: v[()] if isinstance(v, np.ndarray) else v for k, v in resultado.items()}
+
+
+def mes_base(params):
+    """Calcula el mes base: ventas, COGS, utilidades, punto de equilibrio y ROI"""
+    q = _arreglos(params)
+
+    flujo_mes = q["flujo"] * q["horas"] * q["dias"]
+    clientes_mes = np.floor(flujo_mes * q["conversion"])
+
+    # Ventas
+    ventas_farmacia = clientes_mes * q["ticket"]
+    consultas_mes = q["consultas"] * q["dias"]
+    ventas_recetas = consultas_mes * q["surten"] * q["ticket_receta"]
+    ingresos_consulta = consultas_mes * q["ingreso_consulta"]
+    ventas_abarrotes = ventas_farmacia * q["abarrotes_pct"]
+    ventas_totales = ventas_farmacia + ventas_recetas + ventas_abarrotes + ingresos_consulta
+
+    # COGS
+    cogs_total = (
+        ventas_farmacia * q["cogs"]
+        + ventas_recetas * q["cogs_receta"]
+        + ventas_abarrotes * q["cogs_abarrotes"]
+    )
+
+    # Utilidades
+    utilidad_bruta = ventas_totales - cogs_total
+    gastos_variables = ventas_totales * q["gastos_var"]
+    utilidad_neta = utilidad_bruta - q["gastos_fijos"] - gastos_variables
+    margen_neto = _dividir(utilidad_neta, ventas_totales, 0.0)
+
+    # Ticket promedio ponderado (todas las fuentes de ingreso)
+    ticket_prom = _dividir(ventas_totales, clientes_mes + consultas_mes, 0.0)
+
+    # Break-even
+    contribucion = 1 - q["cogs"] - q["gastos_var"]
+    ventas_be = _dividir(q["gastos_fijos"], contribucion, np.inf)
+    clientes_be = np.where(contribucion > 0, _dividir(ventas_be, q["ticket"], 0.0), np.inf)
+
+    # ROI
+    roi_anual = _dividir(utilidad_neta * 12, q["inversion"], 0.0)
+    meses_recuperacion = _dividir(q["inversion"], utilidad_neta, np.inf)
+
+    return _escalares({
+        "clientes_mes": clientes_mes,
+        "consultas_mes": consultas_mes,
+        "ventas_farmacia": ventas_farmacia,
+        "ventas_recetas": ventas_recetas,
+        "ingresos_consulta": ingresos_consulta,
+        "ventas_abarrotes": ventas_abarrotes,
+        "ventas_totales": ventas_totales,
+        "cogs_total": cogs_total,
+        "utilidad_bruta": utilidad_bruta,
+        "gastos_fijos": q["gastos_fijos"],
+        "gastos_variables": gastos_variables,
+        "utilidad_neta": utilidad_neta,
+        "margen_neto": margen_neto,
+        "ticket_prom": ticket_prom,
+        "contribucion": contribucion,
+        "ventas_be": ventas_be,
+        "clientes_be": clientes_be,
+        "roi_anual": roi_anual,
+        "meses_recuperacion": meses_recuperacion,
+    })
+
+
+def factores(crec, meses=12, estacionalidad=None):
+    """Factor de crecimiento compuesto por estacionalidad, con forma (..., meses)"""
+    if meses < 1:
+        raise ValueError(f"El horizonte debe ser de al menos un mes (se recibió {meses})")
+    t = np.arange(meses)
+    factor = (1 + np.asarray(crec, dtype=float)[..., None]) ** t
+    if estacionalidad is not None:
+        # Un vector de 12 meses se repite a lo largo de todo el horizonte
+        factor = factor * np.resize(np.asarray(estacionalidad, dtype=float), meses)
+    return factor
+
+
+def proyectar(params, meses=12, estacionalidad=None):
+    """Proyecta la corrida mes a mes; cada renglón es un arreglo (..., meses)"""
+    base = mes_base(params)
+    factor = factores(params["crec"], meses, estacionalidad)
+
+    def serie(x):
+        return np.asarray(x, dtype=float)[..., None] * factor
+
+    vf = serie(base["ventas_farmacia"])
+    vr = serie(base["ventas_recetas"])
+    va = serie(base["ventas_abarrotes"])
+    ic = serie(base["ingresos_consulta"])
+    vt = vf + vr + va + ic
+
+    q = _arreglos(params)
+    ct = (
+        vf * q["cogs"][..., None]
+        + vr * q["cogs_receta"][..., None]
+        + va * q["cogs_abarrotes"][..., None]
+    )
+    ub = vt - ct
+    gv = vt * q["gastos_var"][..., None]
+    gf = np.broadcast_to(q["gastos_fijos"][..., None], vt.shape)
+    un = ub - gf - gv
+
+    return {
+        "mes": np.arange(1, meses + 1),
+        "ventas_farmacia": vf,
+        "ventas_recetas": vr,
+        "ventas_abarrotes": va,
+        "ingresos_consulta": ic,
+        "ventas_totales": vt,
+        "cogs": ct,
+        "utilidad_bruta": ub,
+        "gastos_fijos": gf,
+        "gastos_variables": gv,
+        "utilidad_neta": un,
+        "margen_neto": _dividir(un, vt, 0.0),
+    }
+
+
+def proyectar_utilidad(params, meses=12, estacionalidad=None):
+    """Solo la utilidad neta proyectada (..., meses); más barata que `proyectar`
+
+    Todas las líneas de ingreso crecen con el mismo factor, así que la
+    utilidad del mes t es (utilidad base + gastos fijos) * factor_t - gastos fijos.
+    """
+    base = mes_base(params)
+    gastos_fijos = np.asarray(base["gastos_fijos"], dtype=float)[..., None]
+    contribucion = np.asarray(base["utilidad_neta"], dtype=float)[..., None] + gastos_fijos
+    return contribucion * factores(params["crec"], meses, estacionalidad) - gastos_fijos
@@ -0,0 +1,134 @@
+"""Buscador de metas: qué flujo, ticket, conversión, gastos fijos o crecimiento necesitas.
+
+Todas las metas se reducen a una condición lineal sobre la contribución del mes
+base (C = utilidad neta + gastos fijos, que no depende de los gastos fijos):
+
+    C * k - gastos_fijos * j = r
+
+`k` es el factor de crecimiento que aplica a la meta (1 para las métricas del
+mes base, factor_m para la utilidad del mes m y la suma de factores para la
+recuperación acumulada). Como C es lineal en las ventas de farmacia, flujo,
+ticket, conversión y gastos fijos se despejan en forma cerrada. El crecimiento
+solo entra en `k` a través del interés compuesto, así que se resuelve con
+bisección vectorizada.
+
+Los parámetros y `valor` se combinan por broadcasting: con `flujo` de forma
+(n, 1) y `valor` de forma (m,) se obtiene la tabla completa de n × m en una
+sola llamada.
+"""
+import numpy as np
+
+from .motor import _arreglos, factores, mes_base
+
+OBJETIVOS = {
+    "utilidad_neta": "Utilidad neta mensual ($)",
+    "meses_recuperacion": "Meses de recuperación",
+    "roi_anual": "ROI anual",
+    "recuperacion_real": "Meses de recuperación con crecimiento",
+}
+
+VARIABLES = ("flujo", "ticket", "conversion", "gastos_fijos", "crec")
+
+# Rango de búsqueda del crecimiento mensual
+CREC_MIN, CREC_MAX = -0.5, 1.0
+
+# Holgura relativa para que la meta se cumpla pese al redondeo de punto flotante
+HOLGURA = 1e-9
+
+
+def _recta_farmacia(params):
+    """Contribución del mes base como recta en las ventas de farmacia
+
+    Regresa (pendiente, ordenada) tales que C = pendiente * ventas_farmacia +
+    ordenada. Se evalúa el motor en dos puntos para no repetir sus fórmulas.
+    """
+    q = _arreglos(params)
+    sin_farmacia = dict(params, ticket=0)
+    con_farmacia = dict(params, ticket=1, flujo=1, conversion=1, horas=1)
+    c0 = mes_base(sin_farmacia)["utilidad_neta"] + q["gastos_fijos"]
+    c1 = mes_base(con_farmacia)["utilidad_neta"] + q["gastos_fijos"]
+    # Con flujo, horas y conversión en 1 hay `dias` clientes de $1
+    return (c1 - c0) / q["dias"], c0
+
+
+def _condicion(objetivo, valor, q, crec, mes, estacionalidad):
+    """Coeficientes (k, j, r) de la condición C * k - gastos_fijos * j = r"""
+    valor = np.asarray(valor, dtype=float)
+    if objetivo == "utilidad_neta":
+        k = factores(crec, mes, estacionalidad)[..., mes - 1]
+        return k, 1.0, valor
+    if objetivo == "meses_recuperacion":
+        with np.errstate(divide="ignore"):
+            return 1.0, 1.0, np.where(valor > 0, q["inversion"] / valor, np.nan)
+    if objetivo == "roi_anual":
+        return 1.0, 1.0, valor * q["inversion"] / 12
+    if objetivo == "recuperacion_real":
+        meses = int(np.ceil(np.max(valor)))
+        suma = np.cumsum(factores(crec, meses, estacionalidad), axis=-1)
+        t = np.clip(np.ceil(valor).astype(int), 1, meses)
+        k = np.take_along_axis(*np.broadcast_arrays(suma, (t - 1)[..., None]), axis=-1)[..., 0]
+        return k, t, q["inversion"]
+    raise ValueError(f"Meta desconocida: {objetivo!r} (usa una de {', '.join(OBJETIVOS)})")
+
+
+def resolver(params, variable, objetivo, valor, mes=1, estacionalidad=None):
+    """Valor de `variable` necesario para que `objetivo` llegue a `valor`
+
+    Los demás parámetros se quedan fijos. Para `gastos_fijos` regresa el
+    máximo que aguanta la meta. Regresa NaN donde la meta es inalcanzable
+    (p. ej. conversión mayor a 100% o margen de contribución negativo).
+    """
+    if variable not in VARIABLES:
+        raise ValueError(f"Variable desconocida: {variable!r} (usa una de {', '.join(VARIABLES)})")
+    q = _arreglos(params)
+
+    if variable == "crec":
+        return _resolver_crec(params, objetivo, valor, mes, estacionalidad)
+
+    k, j, r = _condicion(objetivo, valor, q, q["crec"], mes, estacionalidad)
+    pendiente, ordenada = _recta_farmacia(params)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if variable == "gastos_fijos":
+            contribucion = pendiente * mes_base(params)["ventas_farmacia"] + ordenada
+            requerido = (contribucion * k - r) / j * (1 - HOLGURA)
+            return np.where(requerido >= 0, requerido, np.nan)
+
+        contribucion = (r + q["gastos_fijos"] * j) / k
+        ventas_farmacia = np.where(pendiente > 0, (contribucion - ordenada) / pendiente, np.nan)
+        ventas_farmacia = np.maximum(ventas_farmacia, 0) * (1 + HOLGURA)
+
+        if variable == "ticket":
+            clientes = np.floor(q["flujo"] * q["horas"] * q["dias"] * q["conversion"])
+            return np.where(clientes > 0, ventas_farmacia / clientes, np.nan)
+
+        # Los clientes se redondean hacia abajo en el motor: se pide el entero siguiente
+        clientes = np.ceil(np.where(q["ticket"] > 0, ventas_farmacia / q["ticket"], np.nan))
+        if variable == "flujo":
+            return clientes / (q["horas"] * q["dias"] * q["conversion"]) * (1 + HOLGURA)
+        conversion = clientes / (q["flujo"] * q["horas"] * q["dias"]) * (1 + HOLGURA)
+        return np.where(conversion <= 1, conversion, np.nan)
+
+
+def _resolver_crec(params, objetivo, valor, mes, estacionalidad, iteraciones=60):
+    """Bisección vectorizada sobre el crecimiento mensual"""
+    if objetivo in ("meses_recuperacion", "roi_anual"):
+        raise ValueError(f"La meta {objetivo!r} se mide en el mes base y no depende del crecimiento")
+    q = _arreglos(params)
+    contribucion = mes_base(params)["utilidad_neta"] + q["gastos_fijos"]
+
+    def exceso(crec):
+        k, j, r = _condicion(objetivo, valor, q, crec, mes, estacionalidad)
+        return contribucion * k - q["gastos_fijos"] * j - r
+
+    forma = np.broadcast(exceso(np.float64(0)), contribucion).shape
+    bajo = np.full(forma, CREC_MIN)
+    alto = np.full(forma, CREC_MAX)
+    ya_cumple = exceso(bajo) >= 0
+    alcanzable = exceso(alto) >= 0
+    for _ in range(iteraciones):
+        medio = (bajo + alto) / 2
+        sube = exceso(medio) < 0
+        bajo = np.where(sube, medio, bajo)
+        alto = np.where(sube, alto, medio)
+    return np.where(ya_cumple, CREC_MIN, np.where(alcanzable, alto + HOLGURA, np.nan))
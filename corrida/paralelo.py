@@ -0,0 +1,211 @@
+"""Monte Carlo multinúcleo para corridas de millones de trayectorias.
+
+La simulación se parte en bloques con su propia semilla (derivada de una
+`SeedSequence`), así que el resultado es el mismo sin importar cuántos procesos
+se usen. Cada proceso recorre sus bloques y acumula histogramas por mes en un
+búfer de memoria compartida; nunca se regresa la matriz completa. Los bins son
+uniformes en asinh(utilidad / escala), con rango y escala tomados de una corrida
+piloto: la resolución es relativa, así que las colas largas de horizontes de
+varios años no degradan los percentiles bajos. Los cuantiles finales se leen de
+los histogramas combinados con un error máximo de un bin.
+
+Uso desde la terminal:
+
+    python -m corrida.paralelo --modelo "🛒 Super" --escenario Medio -n 10000000 --meses 60
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from .motor import mes_base, parametros, proyectar_utilidad
+from .presets import ESCENARIOS, MODELOS
+from .simulacion import muestrear_parametros
+
+# Histograma de meses de recuperación: un bin por mes hasta este tope (+ infinito)
+MESES_RECUPERACION_MAX = 240
+
+
+def _vistas(shm, procesos, meses, bins):
+    """Vistas de NumPy sobre el bloque de memoria compartida"""
+    formas = {
+        "conteos": ((procesos, meses, bins), np.int64),
+        "suma": ((procesos, meses), np.float64),
+        "minimo": ((procesos, meses), np.float64),
+        "maximo": ((procesos, meses), np.float64),
+        "recuperacion": ((procesos, MESES_RECUPERACION_MAX + 2), np.int64),
+        "sin_equilibrio": ((procesos,), np.int64),
+    }
+    vistas, inicio = {}, 0
+    for clave, (forma, tipo) in formas.items():
+        vistas[clave] = np.ndarray(forma, dtype=tipo, buffer=shm.buf, offset=inicio)
+        inicio += int(np.prod(forma)) * np.dtype(tipo).itemsize
+    return vistas
+
+
+def _tamano_buferes(procesos, meses, bins):
+    """Bytes necesarios para todos los búferes compartidos"""
+    return 8 * (
+        procesos * meses * bins + 3 * procesos * meses
+        + procesos * (MESES_RECUPERACION_MAX + 2) + procesos
+    )
+
+
+def _correr_carril(tarea):
+    """Simula los bloques asignados a un carril y acumula en su rebanada compartida"""
+    (nombre, carril, procesos, bloques, params, meses, distribuciones,
+     estacionalidad, escala, z_bajo, z_ancho, bins) = tarea
+    shm = shared_memory.SharedMemory(name=nombre)
+    b = _vistas(shm, procesos, meses, bins)
+    try:
+        desplazamiento = np.arange(meses) * bins
+        for semilla, n in bloques:
+            muestras = muestrear_parametros(params, n, distribuciones, semilla)
+            utilidad = np.broadcast_to(proyectar_utilidad(muestras, meses, estacionalidad), (n, meses))
+
+            idx = np.floor((np.arcsinh(utilidad / escala) - z_bajo) / z_ancho).astype(np.int64)
+            np.clip(idx, 0, bins - 1, out=idx)
+            b["conteos"][carril] += np.bincount(
+                (idx + desplazamiento).ravel(), minlength=meses * bins
+            ).reshape(meses, bins)
+            b["suma"][carril] += utilidad.sum(axis=0)
+            np.minimum(b["minimo"][carril], utilidad.min(axis=0), out=b["minimo"][carril])
+            np.maximum(b["maximo"][carril], utilidad.max(axis=0), out=b["maximo"][carril])
+
+            recuperacion = np.broadcast_to(mes_base(muestras)["meses_recuperacion"], (n,))
+            mes_rec = np.where(
+                np.isfinite(recuperacion),
+                np.minimum(np.ceil(recuperacion), MESES_RECUPERACION_MAX),
+                MESES_RECUPERACION_MAX + 1,
+            ).astype(np.int64)
+            b["recuperacion"][carril] += np.bincount(mes_rec, minlength=MESES_RECUPERACION_MAX + 2)
+            b["sin_equilibrio"][carril] += int(np.count_nonzero(np.all(utilidad <= 0, axis=1)))
+        return carril, sum(n for _, n in bloques)
+    finally:
+        del b
+        shm.close()
+
+
+def _cuantiles_histograma(conteos, escala, z_bajo, z_ancho, qs):
+    """Cuantiles por mes a partir de histogramas (interpolación dentro del bin)"""
+    acumulado = np.cumsum(conteos, axis=-1)
+    filas = np.arange(conteos.shape[0])
+    resultado = np.empty((conteos.shape[0], len(qs)))
+    for j, q in enumerate(qs):
+        objetivo = q / 100 * acumulado[:, -1]
+        idx = np.minimum((acumulado < objetivo[:, None]).sum(axis=1), conteos.shape[1] - 1)
+        previo = np.where(idx > 0, acumulado[filas, idx - 1], 0)
+        en_bin = np.maximum(conteos[filas, idx], 1)
+        z = z_bajo + (idx + (objetivo - previo) / en_bin) * z_ancho
+        resultado[:, j] = np.sinh(z) * escala
+    return resultado
+
+
+def simular_paralelo(params, n=10_000_000, meses=60, distribuciones=None, semilla=0,
+                     procesos=None, bloque=50_000, bins=1024, cuantiles=(5, 50, 95),
+                     estacionalidad=None):
+    """Corre `n` trayectorias repartidas en un pool de procesos
+
+    Regresa un diccionario con un DataFrame de cuantiles y promedio de la
+    utilidad neta por mes, la distribución de meses de recuperación y la
+    probabilidad de no alcanzar nunca el punto de equilibrio.
+    """
+    if n < 1:
+        raise ValueError(f"Se necesita al menos una trayectoria (se recibió n={n})")
+    procesos = procesos or os.cpu_count() or 1
+    semillas = np.random.SeedSequence(semilla).spawn(-(-n // bloque) + 1)
+
+    # Piloto para fijar rango y escala de los histogramas (los extremos caen en los bins de orilla)
+    n_piloto = min(n, 20_000)
+    piloto = np.broadcast_to(proyectar_utilidad(
+        muestrear_parametros(params, n_piloto, distribuciones, semillas[0]),
+        meses, estacionalidad,
+    ), (n_piloto, meses))
+    escala = np.maximum(np.median(np.abs(piloto), axis=0) * 0.05, 1.0)
+    z = np.arcsinh(piloto / escala)
+    margen = np.maximum((z.max(axis=0) - z.min(axis=0)) * 0.25, 0.5)
+    z_bajo = z.min(axis=0) - margen
+    z_ancho = (z.max(axis=0) + margen - z_bajo) / bins
+
+    tamanos = [min(bloque, n - i) for i in range(0, n, bloque)]
+    bloques = list(zip(semillas[1:], tamanos))
+    carriles = [bloques[i::procesos] for i in range(procesos)]
+    carriles = [c for c in carriles if c]
+
+    shm = shared_memory.SharedMemory(create=True, size=_tamano_buferes(len(carriles), meses, bins))
+    try:
+        b = _vistas(shm, len(carriles), meses, bins)
+        for clave in b:
+            b[clave].fill(0)
+        b["minimo"].fill(np.inf)
+        b["maximo"].fill(-np.inf)
+
+        tareas = [
+            (shm.name, i, len(carriles), c, params, meses, distribuciones,
+             estacionalidad, escala, z_bajo, z_ancho, bins)
+            for i, c in enumerate(carriles)
+        ]
+        if len(tareas) == 1:
+            list(map(_correr_carril, tareas))
+        else:
+            with ProcessPoolExecutor(max_workers=len(tareas)) as pool:
+                list(pool.map(_correr_carril, tareas))
+
+        valores = np.clip(
+            _cuantiles_histograma(b["conteos"].sum(axis=0), escala, z_bajo, z_ancho, cuantiles),
+            b["minimo"].min(axis=0)[:, None],
+            b["maximo"].max(axis=0)[:, None],
+        )
+        resumen = pd.DataFrame(valores, columns=[f"P{q:g}" for q in cuantiles])
+        resumen.insert(0, "Mes", np.arange(1, meses + 1))
+        resumen["Promedio"] = b["suma"].sum(axis=0) / n
+
+        recuperacion = b["recuperacion"].sum(axis=0)
+        resultado = {
+            "resumen": resumen,
+            "recuperacion": pd.Series(
+                recuperacion[:-1] / n, index=pd.RangeIndex(0, MESES_RECUPERACION_MAX + 1, name="Mes"),
+            ),
+            "prob_sin_recuperacion": float(recuperacion[-1] / n),
+            "prob_sin_equilibrio": float(b["sin_equilibrio"].sum() / n),
+            "n": n,
+        }
+        return resultado
+    finally:
+        b = None  # Las vistas deben soltarse antes de cerrar la memoria compartida
+        shm.close()
+        shm.unlink()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Monte Carlo multinúcleo de la corrida financiera")
+    parser.add_argument("--modelo", choices=list(MODELOS), default="🛒 Super")
+    parser.add_argument("--escenario", choices=ESCENARIOS, default="Medio")
+    parser.add_argument("-n", type=int, default=10_000_000, help="Número de trayectorias")
+    parser.add_argument("--meses", type=int, default=60)
+    parser.add_argument("--procesos", type=int, default=None)
+    parser.add_argument("--semilla", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    try:
+        resultado = simular_paralelo(
+            parametros(args.modelo, args.escenario), n=args.n, meses=args.meses,
+            semilla=args.semilla, procesos=args.procesos,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    segundos = time.perf_counter() - inicio
+
+    print(resultado["resumen"].round(0).to_string(index=False))
+    print(f"\nProbabilidad de no llegar nunca al equilibrio: {resultado['prob_sin_equilibrio']*100:.2f}%")
+    print(f"Probabilidad de no recuperar la inversión: {resultado['prob_sin_recuperacion']*100:.2f}%")
+    print(f"{args.n:,} trayectorias en {segundos:.1f} s ({args.n / segundos:,.0f} trayectorias/s)")
+
+
+if __name__ == "__main__":
+    main()
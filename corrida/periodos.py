@@ -0,0 +1,70 @@
+"""Resúmenes por periodo (mes, trimestre, semestre, año) de una proyección.
+
+Trabaja sobre los arreglos numéricos de `proyectar`, nunca sobre las tablas ya
+formateadas. Todos los periodos salen de un solo groupby, así que el costo
+crece linealmente con el horizonte aunque sea de varios años.
+"""
+import numpy as np
+import pandas as pd
+
+# Meses que abarca cada periodo
+PERIODOS = {"mes": 1, "trimestre": 3, "semestre": 6, "año": 12}
+
+
+def _etiqueta(periodo, numero, inicio, fin):
+    """Nombre para mostrar: "Mes 4", "Mes 4-6" o "Año 2" """
+    if periodo == "año":
+        return f"Año {numero}"
+    if inicio == fin:
+        return f"Mes {inicio}"
+    return f"Mes {inicio}-{fin}"
+
+
+def resumir(proy, inversion=0, periodos=None):
+    """Ventas, utilidad neta, margen y flujo acumulado por periodo
+
+    Regresa un diccionario {periodo: DataFrame} con columnas numero, etiqueta,
+    mes_inicio, mes_fin, ventas_totales, utilidad_neta, margen_neto y
+    flujo_acumulado (utilidad acumulada al cierre del periodo menos la
+    inversión). Si el horizonte no es múltiplo del periodo, el último queda
+    incompleto (p. ej. "Mes 13-14").
+    """
+    periodos = list(PERIODOS) if periodos is None else list(periodos)
+    desconocidos = [p for p in periodos if p not in PERIODOS]
+    if desconocidos:
+        raise ValueError(f"Periodo desconocido: {desconocidos[0]!r} (usa uno de {', '.join(PERIODOS)})")
+
+    ventas = np.asarray(proy["ventas_totales"], dtype=float)
+    utilidad = np.asarray(proy["utilidad_neta"], dtype=float)
+    n, k = len(ventas), len(periodos)
+    mes = np.arange(1, n + 1)
+
+    # Un renglón por (periodo, mes) para resolver todos los periodos en un solo groupby
+    tamanos = np.repeat([PERIODOS[p] for p in periodos], n)
+    meses = pd.DataFrame({
+        "periodo": np.repeat(periodos, n),
+        "numero": (np.tile(mes, k) - 1) // tamanos + 1,
+        "mes": np.tile(mes, k),
+        "ventas_totales": np.tile(ventas, k),
+        "utilidad_neta": np.tile(utilidad, k),
+    })
+    resumen = meses.groupby(["periodo", "numero"], sort=False).agg(
+        mes_inicio=("mes", "min"),
+        mes_fin=("mes", "max"),
+        ventas_totales=("ventas_totales", "sum"),
+        utilidad_neta=("utilidad_neta", "sum"),
+    ).reset_index()
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        resumen["margen_neto"] = np.where(
+            resumen["ventas_totales"] > 0, resumen["utilidad_neta"] / resumen["ventas_totales"], 0.0
+        )
+    resumen["flujo_acumulado"] = np.cumsum(utilidad)[resumen["mes_fin"].to_numpy() - 1] - inversion
+    resumen.insert(2, "etiqueta", [
+        _etiqueta(*fila) for fila in resumen[["periodo", "numero", "mes_inicio", "mes_fin"]].itertuples(index=False)
+    ])
+
+    return {
+        periodo: tabla.drop(columns="periodo").reset_index(drop=True)
+        for periodo, tabla in resumen.groupby("periodo", sort=False)
+    }
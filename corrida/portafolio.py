@@ -0,0 +1,140 @@
+"""Portafolio de tiendas: muchas corridas consolidadas en un mismo calendario.
+
+Cada tienda tiene su modelo, escenario, flujo, ticket, gastos fijos, inversión
+y mes de apertura. Todas se proyectan en una sola llamada al motor como una
+matriz (tiendas × meses) y luego se recorren a su mes de apertura con un
+índice, sin ciclos por tienda: el costo crece linealmente con el número de
+tiendas y con el horizonte.
+"""
+import numpy as np
+import pandas as pd
+
+from .lote import apilar
+from .motor import parametros, proyectar
+from .presets import ESCENARIOS, MODELOS
+
+# Columnas opcionales: vacías toman el valor del preset de la tienda
+OPCIONALES = ("flujo", "ticket", "gastos_fijos", "inversion")
+
+
+def parametros_tiendas(tiendas):
+    """Parámetros apilados (un arreglo por campo, una posición por tienda)
+
+    `tiendas` es un DataFrame (o lista de diccionarios) con columnas modelo y
+    escenario, más las columnas de OPCIONALES que se quieran cambiar.
+    """
+    tiendas = pd.DataFrame(tiendas)
+    for columna, validos in (("modelo", MODELOS), ("escenario", ESCENARIOS)):
+        desconocidos = set(tiendas[columna]) - set(validos)
+        if desconocidos:
+            raise ValueError(
+                f"{columna.capitalize()} desconocido: {sorted(desconocidos)[0]!r} (usa uno de {', '.join(validos)})"
+            )
+
+    # Un preset por combinación distinta; cada tienda toma el suyo por índice
+    codigos, combinaciones = pd.MultiIndex.from_frame(tiendas[["modelo", "escenario"]]).factorize()
+    presets = apilar([parametros(mo, es) for mo, es in combinaciones])
+    params = {k: v[codigos] for k, v in presets.items()}
+
+    for campo in OPCIONALES:
+        if campo in tiendas:
+            valores = pd.to_numeric(tiendas[campo], errors="coerce").to_numpy(dtype=float)
+            params[campo] = np.where(np.isnan(valores), params[campo], valores)
+    return params
+
+
+def mes_recuperacion(acumulado):
+    """Mes (1 = el primero) desde el cual la caja acumulada ya no vuelve a ser negativa
+
+    Trabaja sobre el último eje; regresa inf donde al final del horizonte la
+    caja sigue negativa y 0 donde nunca fue negativa.
+    """
+    negativo = np.asarray(acumulado) < 0
+    meses = negativo.shape[-1]
+    ultimo_negativo = meses - 1 - np.argmax(negativo[..., ::-1], axis=-1)
+    recuperacion = np.where(ultimo_negativo < meses - 1, ultimo_negativo + 2.0, np.inf)
+    return np.where(negativo.any(axis=-1), recuperacion, 0.0)
+
+
+def proyectar_portafolio(tiendas, meses=36):
+    """Proyección consolidada y por tienda en el calendario del portafolio
+
+    El mes 1 es el primer mes del calendario del portafolio; cada tienda
+    invierte en su `mes_apertura` (1 si no se da) y empieza a vender ese mismo
+    mes. Regresa un diccionario con:
+
+    - consolidado: DataFrame por mes (tiendas abiertas, ventas, utilidad,
+      inversión, flujo de caja y caja acumulada)
+    - tiendas: DataFrame con una fila por tienda (datos, totales del horizonte,
+      caja final y meses de recuperación desde su apertura)
+    - ventas, utilidad, flujo_caja: matrices (tiendas × meses) para el detalle
+    - recuperacion: mes del portafolio en que la caja acumulada queda en positivo
+    - capital_maximo: la mayor caja negativa acumulada (lo que hay que fondear)
+    """
+    tiendas = pd.DataFrame(tiendas).reset_index(drop=True)
+    params = parametros_tiendas(tiendas)
+    if "mes_apertura" in tiendas:
+        apertura = pd.to_numeric(tiendas["mes_apertura"], errors="coerce").fillna(1).to_numpy(dtype=int)
+    else:
+        apertura = np.ones(len(tiendas), dtype=int)
+    if (apertura < 1).any():
+        raise ValueError("El mes de apertura debe ser 1 o mayor")
+
+    # Proyección desde la apertura de cada tienda, recorrida a su mes calendario
+    proy = proyectar(params, meses=meses)
+    desfase = apertura - 1
+    indice = np.arange(meses)[None, :] - desfase[:, None]
+    abierta = indice >= 0
+    indice = np.maximum(indice, 0)
+
+    def calendario(serie):
+        return np.where(abierta, np.take_along_axis(serie, indice, axis=1), 0.0)
+
+    ventas = calendario(proy["ventas_totales"])
+    utilidad = calendario(proy["utilidad_neta"])
+    inversion = np.zeros_like(utilidad)
+    dentro = np.flatnonzero(desfase < meses)
+    inversion[dentro, desfase[dentro]] = params["inversion"][dentro]
+    flujo_caja = utilidad - inversion
+
+    acumulado_tiendas = np.cumsum(flujo_caja, axis=1)
+    flujo_total = flujo_caja.sum(axis=0)
+    acumulado = np.cumsum(flujo_total)
+
+    # Meses de operación hasta recuperar, contados desde la apertura de cada tienda
+    recuperacion_tiendas = mes_recuperacion(acumulado_tiendas)
+    recuperacion_tiendas = np.where(recuperacion_tiendas > 0, recuperacion_tiendas - desfase, 0.0)
+
+    resumen = pd.DataFrame({
+        "nombre": tiendas["nombre"] if "nombre" in tiendas else [f"Tienda {i + 1}" for i in range(len(tiendas))],
+        "modelo": tiendas["modelo"],
+        "escenario": tiendas["escenario"],
+        "mes_apertura": apertura,
+        "flujo": params["flujo"],
+        "ticket": params["ticket"],
+        "gastos_fijos": params["gastos_fijos"],
+        "inversion": params["inversion"],
+        "ventas_totales": ventas.sum(axis=1),
+        "utilidad_neta": utilidad.sum(axis=1),
+        "caja_final": acumulado_tiendas[:, -1],
+        "meses_recuperacion": recuperacion_tiendas,
+    })
+    consolidado = pd.DataFrame({
+        "mes": np.arange(1, meses + 1),
+        "tiendas_abiertas": abierta.sum(axis=0),
+        "ventas_totales": ventas.sum(axis=0),
+        "utilidad_neta": utilidad.sum(axis=0),
+        "inversion": inversion.sum(axis=0),
+        "flujo_caja": flujo_total,
+        "caja_acumulada": acumulado,
+    })
+
+    return {
+        "consolidado": consolidado,
+        "tiendas": resumen,
+        "ventas": ventas,
+        "utilidad": utilidad,
+        "flujo_caja": flujo_caja,
+        "recuperacion": float(mes_recuperacion(acumulado)),
+        "capital_maximo": float(max(0.0, -acumulado.min())),
+    }
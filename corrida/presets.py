@@ -0,0 +1,76 @@
+"""Presets por modelo de franquicia y escenario"""
+
+ESCENARIOS = ["Conservador", "Medio", "Alto"]
+
+MODELOS = {
+    "🏪 Mini": {"consultorio": False, "abarrotes": False, "inversion": 570000},
+    "🩺 Consultorio": {"consultorio": True, "abarrotes": False, "inversion": 700000},
+    "🛒 Super": {"consultorio": True, "abarrotes": True, "inversion": 950000},
+}
+
+# ANÁLISIS DE MÁRGENES POR CATEGORÍA (Como analista financiero de farmacias)
+# Genéricos: 35-45% margen | Patente: 15-25% margen | Abarrotes: 8-15% margen
+# Mix promedio ponderado según flujo y conversión por escenario
+
+PRESETS = {
+    "🏪 Mini": {
+        "Conservador": {"flujo": 30, "conversion": 0.08, "ticket": 75, "cogs": 0.72, "gastos_fijos": 22000, "gastos_var": 0.03, "crec": 0.015},
+        "Medio":       {"flujo": 60, "conversion": 0.12, "ticket": 95, "cogs": 0.68, "gastos_fijos": 28000, "gastos_var": 0.05, "crec": 0.03},
+        "Alto":        {"flujo": 100, "conversion": 0.16, "ticket": 120, "cogs": 0.65, "gastos_fijos": 35000, "gastos_var": 0.07, "crec": 0.045},
+    },
+    "🩺 Consultorio": {
+        "Conservador": {"flujo": 45, "conversion": 0.09, "ticket": 85, "cogs": 0.70, "gastos_fijos": 35000, "gastos_var": 0.04, "crec": 0.02,
+                        "consultas": 8, "surten": 0.60, "ticket_receta": 120, "ingreso_consulta": 40, "cogs_receta": 0.62},
+        "Medio":       {"flujo": 80, "conversion": 0.13, "ticket": 110, "cogs": 0.67, "gastos_fijos": 45000, "gastos_var": 0.06, "crec": 0.035,
+                        "consultas": 15, "surten": 0.72, "ticket_receta": 180, "ingreso_consulta": 60, "cogs_receta": 0.58},
+        "Alto":        {"flujo": 140, "conversion": 0.17, "ticket": 150, "cogs": 0.63, "gastos_fijos": 58000, "gastos_var": 0.08, "crec": 0.05,
+                        "consultas": 25, "surten": 0.85, "ticket_receta": 250, "ingreso_consulta": 85, "cogs_receta": 0.55},
+    },
+    "🛒 Super": {
+        "Conservador": {"flujo": 60, "conversion": 0.10, "ticket": 90, "cogs": 0.74, "gastos_fijos": 48000, "gastos_var": 0.04, "crec": 0.025,
+                        "consultas": 10, "surten": 0.65, "ticket_receta": 140, "ingreso_consulta": 45, "cogs_receta": 0.62,
+                        "abarrotes_pct": 0.15, "cogs_abarrotes": 0.90},
+        "Medio":       {"flujo": 110, "conversion": 0.14, "ticket": 120, "cogs": 0.69, "gastos_fijos": 62000, "gastos_var": 0.06, "crec": 0.04,
+                        "consultas": 18, "surten": 0.75, "ticket_receta": 200, "ingreso_consulta": 70, "cogs_receta": 0.58,
+                        "abarrotes_pct": 0.22, "cogs_abarrotes": 0.88},
+        "Alto":        {"flujo": 180, "conversion": 0.18, "ticket": 165, "cogs": 0.65, "gastos_fijos": 78000, "gastos_var": 0.08, "crec": 0.055,
+                        "consultas": 30, "surten": 0.88, "ticket_receta": 280, "ingreso_consulta": 100, "cogs_receta": 0.55,
+                        "abarrotes_pct": 0.32, "cogs_abarrotes": 0.85},
+    },
+}
+
+# Presets de gastos fijos por modelo
+GASTOS_FIJOS_PRESETS = {
+    "🏪 Mini": {
+        "Renta": 8000,
+        "Nómina": 6000,
+        "Luz": 1500,
+        "Internet/Tel": 500,
+        "Contador": 1000,
+        "Seguros": 500,
+        "Limpieza": 500,
+    },
+    "🩺 Consultorio": {
+        "Renta": 12000,
+        "Nómina farmacia": 8000,
+        "Nómina médico": 10000,
+        "Luz": 2500,
+        "Internet/Tel": 800,
+        "Contador": 1500,
+        "Seguros": 1200,
+        "Limpieza": 800,
+        "Insumos médicos": 1200,
+    },
+    "🛒 Super": {
+        "Renta": 18000,
+        "Nómina farmacia": 10000,
+        "Nómina médico": 10000,
+        "Nómina abarrotes": 5000,
+        "Luz": 4000,
+        "Internet/Tel": 1000,
+        "Contador": 2000,
+        "Seguros": 1500,
+        "Limpieza": 1200,
+        "Insumos médicos": 1300,
+    },
+}
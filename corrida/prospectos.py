@@ -0,0 +1,162 @@
+"""Corridas y reportes PDF por lotes para una lista de prospectos.
+
+Lee un CSV con columnas nombre, ubicacion, modelo, escenario, flujo, ticket e
+inversion (las tres últimas son opcionales: vacías toman el valor del preset).
+El archivo se procesa renglón por renglón sin cargarlo completo; cada corrida
+y su PDF se construyen en un pool de procesos y al final se escribe un
+resumen en CSV (y Parquet si se pide y hay motor instalado).
+
+Uso desde la terminal:
+
+    python -m corrida.prospectos prospectos.csv --salida reportes/ --parquet
+"""
+import argparse
+import csv
+import os
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+from .lote import correr_corrida
+from .motor import parametros
+from .presets import ESCENARIOS, MODELOS
+
+# Columnas numéricas opcionales del CSV
+NUMERICAS = ("flujo", "ticket", "inversion")
+
+# Columnas del resumen, en orden (también las de un archivo sin prospectos)
+RESUMEN = (
+    "fila", "nombre", "ubicacion", "modelo", "escenario", "flujo", "ticket", "inversion",
+    "ventas_totales", "utilidad_neta", "margen_neto", "roi_anual", "meses_recuperacion",
+    "ventas_anual", "util_anual", "archivo", "error",
+)
+
+
+def _buscar(texto, opciones, que):
+    """Encuentra `texto` en `opciones` sin importar mayúsculas ni emoji"""
+    buscado = texto.strip().lower()
+    for opcion in opciones:
+        if buscado in (opcion.lower(), opcion.split(" ", 1)[-1].lower()):
+            return opcion
+    raise ValueError(f"{que} desconocido: {texto!r} (usa uno de {', '.join(opciones)})")
+
+
+def _archivo_pdf(fila, nombre):
+    """Nombre de archivo seguro y único para el reporte de un renglón"""
+    limpio = re.sub(r"[^\w-]+", "_", nombre).strip("_") or "prospecto"
+    return f"{fila:05d}_{limpio[:60]}.pdf"
+
+
+def leer_prospectos(ruta):
+    """Itera los renglones del CSV como (número de fila, diccionario)"""
+    with open(ruta, newline="", encoding="utf-8-sig") as f:
+        for fila, renglon in enumerate(csv.DictReader(f), start=1):
+            yield fila, {(k or "").strip().lower(): (v or "").strip() for k, v in renglon.items()}
+
+
+def procesar_prospecto(tarea):
+    """Corre la corrida de un prospecto y escribe su PDF (se ejecuta en el pool)"""
+    fila, renglon, salida = tarea
+    resumen = {
+        "fila": fila,
+        "nombre": renglon.get("nombre", ""),
+        "ubicacion": renglon.get("ubicacion", ""),
+        "modelo": renglon.get("modelo", ""),
+        "escenario": renglon.get("escenario", ""),
+    }
+    try:
+        modelo = _buscar(renglon.get("modelo", ""), list(MODELOS), "Modelo")
+        escenario = _buscar(renglon.get("escenario", ""), ESCENARIOS, "Escenario")
+        cambios = {campo: float(renglon[campo]) for campo in NUMERICAS if renglon.get(campo)}
+        if "inversion" in cambios:
+            cambios["inversion"] = int(round(cambios["inversion"]))
+        params = parametros(modelo, escenario, **cambios)
+        corrida = correr_corrida(params)
+
+        # ReportLab se importa aquí para que el proceso principal no lo cargue
+        from .reporte import construir_pdf
+
+        datos_f = {"nombre": resumen["nombre"], "ubicacion": resumen["ubicacion"], "proposito": "Nueva apertura"}
+        archivo = _archivo_pdf(fila, resumen["nombre"])
+        with open(os.path.join(salida, archivo), "wb") as f:
+            f.write(construir_pdf(datos_f, modelo, escenario, params, corrida))
+    except Exception as e:
+        # Cualquier falla (datos, disco o ReportLab) queda en su renglón y el lote sigue
+        resumen["error"] = str(e) or type(e).__name__
+        return resumen
+
+    base = corrida["base"]
+    resumen.update(
+        modelo=modelo,
+        escenario=escenario,
+        flujo=params["flujo"],
+        ticket=params["ticket"],
+        inversion=params["inversion"],
+        ventas_totales=float(base["ventas_totales"]),
+        utilidad_neta=float(base["utilidad_neta"]),
+        margen_neto=float(base["margen_neto"]),
+        roi_anual=float(base["roi_anual"]),
+        meses_recuperacion=float(base["meses_recuperacion"]),
+        ventas_anual=corrida["ventas_anual"],
+        util_anual=corrida["util_anual"],
+        archivo=archivo,
+        error="",
+    )
+    return resumen
+
+
+def procesar_archivo(ruta, salida, procesos=None, pendientes_max=None):
+    """Procesa todo el CSV y regresa el resumen como DataFrame (en orden de fila)
+
+    Solo se mantienen en vuelo `pendientes_max` renglones a la vez, así que la
+    memoria no crece con el tamaño del archivo de entrada.
+    """
+    os.makedirs(salida, exist_ok=True)
+    procesos = procesos or os.cpu_count() or 1
+    pendientes_max = pendientes_max or procesos * 4
+
+    resultados, pendientes = [], set()
+    with ProcessPoolExecutor(max_workers=procesos) as pool:
+        for fila, renglon in leer_prospectos(ruta):
+            if len(pendientes) >= pendientes_max:
+                listos, pendientes = wait(pendientes, return_when=FIRST_COMPLETED)
+                resultados.extend(futuro.result() for futuro in listos)
+            pendientes.add(pool.submit(procesar_prospecto, (fila, renglon, salida)))
+        resultados.extend(futuro.result() for futuro in wait(pendientes).done)
+
+    return pd.DataFrame(resultados, columns=list(RESUMEN)).sort_values("fila", ignore_index=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Corridas y reportes PDF para una lista de prospectos")
+    parser.add_argument("archivo", help="CSV con nombre, ubicacion, modelo, escenario, flujo, ticket, inversion")
+    parser.add_argument("--salida", default="reportes", help="Carpeta para los PDFs y el resumen")
+    parser.add_argument("--procesos", type=int, default=None)
+    parser.add_argument("--parquet", action="store_true", help="Escribir también resumen.parquet")
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    resumen = procesar_archivo(args.archivo, args.salida, procesos=args.procesos)
+    segundos = time.perf_counter() - inicio
+    if resumen.empty:
+        print(f"{args.archivo} no tiene prospectos (solo encabezado o vacío); no se generaron reportes")
+
+    resumen.to_csv(os.path.join(args.salida, "resumen.csv"), index=False)
+    if args.parquet:
+        try:
+            resumen.to_parquet(os.path.join(args.salida, "resumen.parquet"), index=False)
+        except ImportError:
+            print("Aviso: instala pyarrow para escribir Parquet; solo se generó resumen.csv")
+
+    errores = resumen[resumen["error"] != ""]
+    for e in errores.itertuples():
+        print(f"Fila {e.fila} ({e.nombre or 'sin nombre'}): {e.error}")
+    generados = len(resumen) - len(errores)
+    print(f"{generados:,} reportes en {segundos:.1f} s ({generados / segundos:,.1f} reportes/s), "
+          f"{len(errores):,} con error → {os.path.abspath(args.salida)}")
+
+
+if __name__ == "__main__":
+    main()
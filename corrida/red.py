@@ -0,0 +1,116 @@
+"""Red de tiendas propias: canibalización al abrir tiendas nuevas cerca de otras.
+
+Dos tiendas a menos de `radio` km se reparten clientes: cada vecina j le
+quita a la tienda i un peso w = intensidad × (1 - d / radio) y la tienda
+conserva 1 / (1 + suma de sus w) del flujo que tendría sola (dos tiendas en
+el mismo punto se quedan con la mitad cada una). Las parejas salen del índice
+de rejilla de `espacial`, así que solo existen las de tiendas cercanas (nunca
+una matriz N × N) y las sumas por tienda son np.bincount.
+
+El flujo de las tiendas existentes es el que ya tienen hoy, con la red
+actual; el de las nuevas, el que tendrían solas, como en la corrida de una
+tienda. Todas las tiendas se proyectan en una sola llamada al motor.
+"""
+import numpy as np
+import pandas as pd
+
+from .espacial import Rejilla
+from .motor import proyectar
+from .portafolio import parametros_tiendas
+
+# Qué tanto se comparten clientes dos tiendas pegadas (1 = a la mitad)
+INTENSIDAD = 1.0
+
+
+def _vecinas(lat, lon, radio, intensidad):
+    """Parejas dirigidas (i, j, w) de tiendas distintas a `radio` km o menos"""
+    partes = list(Rejilla(lat, lon, radio).pares(lat, lon))
+    if not partes:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+    i, j, d = (np.concatenate(p) for p in zip(*partes))
+    distintas = i != j
+    return i[distintas], j[distintas], intensidad * (1 - d[distintas] / radio)
+
+
+def _anuales(params, flujo, meses, estacionalidad):
+    """Ventas y utilidad neta del horizonte con otro flujo por tienda"""
+    proy = proyectar({**params, "flujo": flujo}, meses=meses, estacionalidad=estacionalidad)
+    return proy["ventas_totales"].sum(axis=-1), proy["utilidad_neta"].sum(axis=-1)
+
+
+def canibalizacion(tiendas, radio=1.5, intensidad=INTENSIDAD, meses=12, estacionalidad=None):
+    """Reproyecta la red con las tiendas nuevas y mide lo que aporta cada una
+
+    `tiendas` trae nombre, lat, lon, estado ("existente" o "nueva"), modelo y
+    escenario, más las columnas opcionales del portafolio (flujo, ticket,
+    gastos_fijos, inversion). Regresa un diccionario con:
+
+    - tiendas: DataFrame por tienda con flujo, retención (flujo después /
+      flujo), ventas y utilidad antes y después de las aperturas; en las
+      nuevas, su aporte neto (su utilidad menos lo que le quita a las demás,
+      con las otras nuevas abiertas)
+    - utilidad_antes, utilidad_despues, incremental: utilidad del horizonte de
+      la red sin y con las nuevas, y la diferencia
+    - canibalizacion: utilidad que pierden las tiendas existentes
+    - pares: número de parejas de tiendas cercanas
+    """
+    tiendas = pd.DataFrame(tiendas).reset_index(drop=True)
+    faltantes = [c for c in ("lat", "lon", "estado") if c not in tiendas]
+    if faltantes:
+        raise ValueError(f"Faltan columnas: {', '.join(faltantes)}")
+    lat = pd.to_numeric(tiendas["lat"], errors="coerce").to_numpy(dtype=float)
+    lon = pd.to_numeric(tiendas["lon"], errors="coerce").to_numpy(dtype=float)
+    if np.isnan(lat).any() or np.isnan(lon).any():
+        raise ValueError("Todas las tiendas necesitan lat y lon")
+    nueva = tiendas["estado"].astype(str).str.strip().str.lower().str.startswith(("nuev", "plan")).to_numpy()
+    params = parametros_tiendas(tiendas)
+    flujo = params["flujo"].astype(float)
+
+    i, j, w = _vecinas(lat, lon, radio, intensidad)
+    n = len(tiendas)
+    suma_todas = np.bincount(i, w, n)
+    entre_existentes = ~nueva[i] & ~nueva[j]
+    suma_existentes = np.bincount(i[entre_existentes], w[entre_existentes], n)
+
+    # Flujo de cada tienda si estuviera sola: las existentes ya traen la red actual descontada
+    flujo_solo = np.where(nueva, flujo, flujo * (1 + suma_existentes))
+    flujo_despues = flujo_solo / (1 + suma_todas)
+    ventas_despues, utilidad_despues = _anuales(params, flujo_despues, meses, estacionalidad)
+    ventas_antes, utilidad_antes = _anuales(params, flujo, meses, estacionalidad)
+    ventas_antes = np.where(nueva, 0.0, ventas_antes)
+    utilidad_antes = np.where(nueva, 0.0, utilidad_antes)
+
+    # Aporte de cada nueva k: su utilidad más el cambio en sus vecinas j si k no abriera
+    hacia_nueva = nueva[j]
+    vecina, nueva_k, w_k = i[hacia_nueva], j[hacia_nueva], w[hacia_nueva]
+    params_vecinas = {campo: v[vecina] for campo, v in params.items()}
+    _, utilidad_sin_k = _anuales(
+        params_vecinas, flujo_solo[vecina] / (1 + suma_todas[vecina] - w_k), meses, estacionalidad
+    )
+    quita = np.bincount(nueva_k, utilidad_sin_k - utilidad_despues[vecina], n)
+    aporte = np.where(nueva, utilidad_despues - quita, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        retencion = np.where(flujo > 0, flujo_despues / flujo, 1.0)
+
+    resumen = pd.DataFrame({
+        "nombre": tiendas["nombre"] if "nombre" in tiendas else [f"Tienda {k + 1}" for k in range(n)],
+        "estado": np.where(nueva, "Nueva", "Existente"),
+        "modelo": tiendas["modelo"],
+        "vecinas": np.bincount(i, minlength=n),
+        "flujo": flujo,
+        "flujo_despues": flujo_despues,
+        "retencion": retencion,
+        "ventas_antes": ventas_antes,
+        "ventas_despues": ventas_despues,
+        "utilidad_antes": utilidad_antes,
+        "utilidad_despues": utilidad_despues,
+        "aporte_neto": aporte,
+    })
+    return {
+        "tiendas": resumen,
+        "utilidad_antes": float(utilidad_antes.sum()),
+        "utilidad_despues": float(utilidad_despues.sum()),
+        "incremental": float(utilidad_despues.sum() - utilidad_antes.sum()),
+        "canibalizacion": float((utilidad_antes - utilidad_despues)[~nueva].sum()),
+        "pares": len(i) // 2,
+    }
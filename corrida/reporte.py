@@ -0,0 +1,462 @@
+"""Reporte PDF de la corrida para presentar la oportunidad de franquicia.
+
+ReportLab solo se carga al importar este módulo; la app lo importa hasta que
+se pide el primer PDF para que el login no pague ese costo. Los estilos y los
+bloques de texto fijo se arman una sola vez por proceso, y los bytes de cada
+reporte se guardan en un caché indexado por sus datos de entrada.
+"""
+import copy
+import io
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from functools import lru_cache
+from multiprocessing import get_context
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from .cache import CacheLRU, clave_parametros
+from .presets import ESCENARIOS, MODELOS
+
+# PDFs ya generados, compartidos por todas las sesiones del proceso
+CACHE_PDF = CacheLRU(max_entradas=64, ttl=3600)
+
+POTENCIAL_MODELO = {
+    "🏪 Mini": """
+        • <b>Inversión accesible</b> con rápido retorno<br/>
+        • <b>Operación simple</b> - ideal para emprendedores nuevos<br/>
+        • <b>Mercado amplio</b> - todos necesitan medicamentos<br/>
+        • <b>Márgenes atractivos</b> en medicamentos genéricos (35-45%)<br/>
+        """,
+    "🩺 Consultorio": """
+        • <b>Doble flujo de ingresos:</b> farmacia + consultas médicas<br/>
+        • <b>Sinergia perfecta</b> - pacientes surten recetas inmediatamente<br/>
+        • <b>Fidelización alta</b> - relación médico-paciente duradera<br/>
+        • <b>Márgenes superiores</b> en recetas especializadas (38-42%)<br/>
+        """,
+    "🛒 Super": """
+        • <b>Modelo integral</b> - farmacia, consultorio y conveniencia<br/>
+        • <b>Máximo tráfico</b> - abarrotes atraen clientes diarios<br/>
+        • <b>Venta cruzada</b> - un cliente, múltiples compras<br/>
+        • <b>Diversificación</b> - múltiples fuentes de ingreso<br/>
+        """,
+}
+
+PROXIMOS_PASOS = """
+    <b>1. VALIDACIÓN DE UBICACIÓN:</b> Confirmar flujo peatonal y análisis de competencia<br/>
+    <b>2. FINANCIAMIENTO:</b> Estructurar inversión inicial y capital de trabajo<br/>
+    <b>3. CAPACITACIÓN:</b> Programa integral de entrenamiento Farmacia Líbano<br/>
+    <b>4. PUESTA EN MARCHA:</b> Plan de lanzamiento y marketing inicial<br/>
+    <b>5. SEGUIMIENTO:</b> Monitoreo mensual de KPIs y optimización continua<br/><br/>
+
+    <b>Contacto Franquicias:</b> franquicias@farmacialibano.com<br/>
+    <b>Teléfono:</b> 800-LIBANO (800-542-2266)<br/>
+    """
+
+
+@lru_cache(maxsize=None)
+def _estilos():
+    """Estilos de párrafo y de tabla del reporte (se crean una vez por proceso)"""
+    styles = getSampleStyleSheet()
+    normal = styles['Normal']
+    return {
+        "normal": normal,
+        "heading2": styles['Heading2'],
+        "titulo": ParagraphStyle('CustomTitle', parent=styles['Heading1'],
+                                 fontSize=26, spaceAfter=20, textColor=colors.Color(0, 0.239, 0.478)),
+        "encabezado": ParagraphStyle('CustomHeading', parent=styles['Heading2'],
+                                     fontSize=16, spaceAfter=12, textColor=colors.Color(0, 0.651, 0.318)),
+        "subtitulo": ParagraphStyle('CustomSubtitle', parent=normal,
+                                    fontSize=12, spaceAfter=8, textColor=colors.Color(0, 0.651, 0.318)),
+        "pie": ParagraphStyle('Footer', parent=normal,
+                              fontSize=9, textColor=colors.gray, alignment=1),
+        "conclusion": {
+            nivel: ParagraphStyle('Conclusion', parent=normal, fontSize=11, textColor=color)
+            for nivel, color in (
+                ("excelente", colors.Color(0, 0.5, 0)),  # Verde
+                ("viable", colors.Color(0.7, 0.7, 0)),  # Amarillo
+                ("ajustes", colors.Color(0.8, 0.2, 0)),  # Rojo suave (no muy negativo)
+            )
+        },
+        "tabla_metricas": TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.Color(0, 0.651, 0.318)),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 11),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.Color(0.95, 0.98, 0.95)),
+            ('GRID', (0, 0), (-1, -1), 1, colors.darkgray),
+            ('FONTSIZE', (0, 1), (-1, -1), 10),
+        ]),
+        "tabla_ventas": TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.Color(0, 0.239, 0.478)),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+            ('BACKGROUND', (0, -1), (-1, -1), colors.Color(0.9, 0.95, 0.9)),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+            ('BACKGROUND', (0, 1), (-1, -2), colors.Color(0.98, 0.98, 1.0)),
+            ('GRID', (0, 0), (-1, -1), 1, colors.darkgray),
+        ]),
+        "tabla_periodos": TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.Color(0, 0.651, 0.318)),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 10),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 8),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.Color(0.95, 0.98, 0.95)),
+            ('GRID', (0, 0), (-1, -1), 1, colors.darkgray),
+        ]),
+    }
+
+
+@lru_cache(maxsize=None)
+def _bloques_fijos():
+    """Párrafos que no dependen de la corrida, ya interpretados por ReportLab
+
+    Interpretar el marcado de un Paragraph es la parte cara; cada reporte usa
+    copias superficiales para que el acomodo de una página no afecte a otra.
+    """
+    e = _estilos()
+    titulos = (
+        "🎯 Análisis del Escenario", "💡 Potencial del Modelo", "📊 Resultados Proyectados",
+        "💰 Estructura de Ingresos Mensuales", "📈 Evolución Trimestral del Primer Año",
+        "🏆 Evaluación de la Oportunidad", "🚀 Próximos Pasos Recomendados",
+    )
+    return {
+        "encabezado": [
+            Paragraph("<b>+FARMACIA LÍBANO</b>", e["titulo"]),
+            Paragraph("OPORTUNIDAD DE INVERSIÓN - ANÁLISIS FINANCIERO", e["heading2"]),
+            Paragraph("<i>Siempre al cuidado de tu salud</i>", e["subtitulo"]),
+            Spacer(1, 15),
+        ],
+        "titulos": {titulo: Paragraph(titulo, e["encabezado"]) for titulo in titulos},
+        "potencial": {
+            modelo: Paragraph(f"""
+    <b>El modelo {modelo} está diseñado para maximizar oportunidades:</b><br/>
+    """ + texto, e["normal"])
+            for modelo, texto in POTENCIAL_MODELO.items()
+        },
+        "proximos_pasos": Paragraph(PROXIMOS_PASOS, e["normal"]),
+        "confidencial": Paragraph("Farmacia Líbano - Análisis Financiero Confidencial", e["pie"]),
+    }
+
+
+def nombre_archivo(modelo, escenario):
+    """Nombre de descarga del reporte de una combinación modelo/escenario"""
+    return f"corrida_financiera_{modelo.replace(' ', '_').lower()}_{escenario.lower()}.pdf"
+
+
+def _clave_reporte(datos_f, modelo, escenario, params, corrida, fecha):
+    """Llave del caché de PDFs: todo lo que cambia el contenido del reporte"""
+    return clave_parametros(
+        datos_f, modelo, escenario, params,
+        corrida["proy"]["ventas_totales"], corrida["proy"]["utilidad_neta"],
+        fecha.strftime('%Y-%m-%d'),
+    )
+
+
+def _avance(progreso):
+    """Traduce los eventos de avance de ReportLab a una fracción entre 0 y 1"""
+    total = [1]
+
+    def recibir(tipo, valor):
+        if tipo == "SIZE_EST":
+            total[0] = max(valor, 1)
+        elif tipo == "PROGRESS":
+            progreso(valor / total[0])
+
+    return recibir
+
+
+def generar_reporte_pdf(datos_f, modelo, escenario, params, corrida, progreso=None):
+    """Genera un reporte PDF profesional para presentar oportunidad de franquicia
+
+    `corrida` es el resultado de la corrida en pantalla (mes base, proyección,
+    resúmenes por periodo y totales del primer año). Pedir dos veces el mismo
+    reporte el mismo día regresa los bytes guardados sin volver a construirlo.
+    """
+    datos_f = datos_f or {}
+    fecha = datetime.now()
+    clave = _clave_reporte(datos_f, modelo, escenario, params, corrida, fecha)
+    return CACHE_PDF.obtener(
+        clave, lambda: construir_pdf(datos_f, modelo, escenario, params, corrida, fecha, progreso)
+    )
+
+
+@lru_cache(maxsize=None)
+def _pool_procesos():
+    """Pool persistente para construir varios PDFs a la vez (se crea al primer uso)
+
+    Usa `spawn` porque el servidor de Streamlit tiene hilos vivos y un `fork`
+    podría heredar candados tomados.
+    """
+    procesos = min(len(MODELOS) * len(ESCENARIOS), os.cpu_count() or 1)
+    return ProcessPoolExecutor(max_workers=procesos, mp_context=get_context("spawn"))
+
+
+def generar_zip(datos_f, corridas):
+    """ZIP con un reporte por cada (modelo, escenario, params, corrida)
+
+    Los reportes que ya están en caché se reutilizan; los demás se construyen
+    al mismo tiempo en el pool de procesos y se van agregando al ZIP conforme
+    terminan, así que la espera es la del PDF más lento.
+    """
+    datos_f = datos_f or {}
+    fecha = datetime.now()
+    buffer = io.BytesIO()
+    # Los PDF ya vienen comprimidos: volver a comprimirlos no ahorra casi nada
+    with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_STORED) as archivo_zip:
+        faltantes = []
+        for modelo, escenario, params, corrida in corridas:
+            clave = _clave_reporte(datos_f, modelo, escenario, params, corrida, fecha)
+            pdf = CACHE_PDF.buscar(clave)
+            if pdf is None:
+                faltantes.append((clave, (datos_f, modelo, escenario, params, corrida, fecha)))
+            else:
+                archivo_zip.writestr(nombre_archivo(modelo, escenario), pdf)
+
+        if len(faltantes) > 1 and (os.cpu_count() or 1) > 1:
+            futuros = {_pool_procesos().submit(construir_pdf, *args): (clave, args) for clave, args in faltantes}
+            terminados = ((futuro.result(), *futuros[futuro]) for futuro in as_completed(futuros))
+        else:
+            terminados = ((construir_pdf(*args), clave, args) for clave, args in faltantes)
+
+        for pdf, clave, args in terminados:
+            CACHE_PDF.guardar(clave, pdf)
+            archivo_zip.writestr(nombre_archivo(args[1], args[2]), pdf)
+
+    return buffer.getvalue()
+
+
+def construir_pdf(datos_f, modelo, escenario, params, corrida, fecha=None, progreso=None):
+    """Construye el PDF desde cero (sin pasar por el caché de bytes)
+
+    `progreso`, si se da, se llama con la fracción de bloques ya acomodados.
+    """
+    fecha = fecha or datetime.now()
+    e = _estilos()
+    fijos = _bloques_fijos()
+
+    def titulo(texto):
+        return copy.copy(fijos["titulos"][texto])
+
+    m = MODELOS[modelo]
+    conversion = params["conversion"]
+    inversion = params["inversion"]
+    util_anual = corrida["util_anual"]
+    ventas_anual = corrida["ventas_anual"]
+
+    base = corrida["base"]
+    clientes_mes = int(base["clientes_mes"])
+    ventas_farmacia = float(base["ventas_farmacia"])
+    ventas_recetas = float(base["ventas_recetas"])
+    ingresos_consulta = float(base["ingresos_consulta"])
+    ventas_abarrotes = float(base["ventas_abarrotes"])
+    ventas_totales = float(base["ventas_totales"])
+    utilidad_neta = float(base["utilidad_neta"])
+    margen_neto = float(base["margen_neto"])
+    ventas_be = float(base["ventas_be"])
+    roi_anual = float(base["roi_anual"])
+    meses_recuperacion = float(base["meses_recuperacion"])
+
+    # Buffer para el PDF
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
+    if progreso is not None:
+        doc.setProgressCallBack(_avance(progreso))
+
+    # Contenido del PDF
+    story = []
+
+    # Encabezado profesional
+    story.extend(copy.copy(f) for f in fijos["encabezado"])
+
+    # Información del franquiciatario
+    franquicia_info = f"""
+    <b>Preparado para:</b> {datos_f.get('nombre', 'N/A')}<br/>
+    <b>Ubicación:</b> {datos_f.get('ubicacion', 'N/A')}<br/>
+    <b>Propósito:</b> {datos_f.get('proposito', 'N/A')}<br/>
+    """
+    story.append(Paragraph(franquicia_info, e["normal"]))
+    story.append(Spacer(1, 10))
+
+    # Información del modelo
+    conversion_rate = conversion * 100
+    modelo_info = f"""
+    <b>Modelo de Franquicia:</b> {modelo}<br/>
+    <b>Escenario Analizado:</b> {escenario}<br/>
+    <b>Inversión Requerida:</b> ${inversion:,}<br/>
+    <b>Fecha de Análisis:</b> {fecha.strftime('%d/%m/%Y')}<br/>
+    """
+    story.append(Paragraph(modelo_info, e["normal"]))
+    story.append(Spacer(1, 15))
+
+    # Explicación del escenario (VENDEDOR)
+    story.append(titulo("🎯 Análisis del Escenario"))
+
+    if escenario == "Conservador":
+        escenario_desc = f"""
+        <b>Escenario Conservador ({conversion_rate:.1f}% de conversión):</b><br/>
+        Este análisis considera condiciones iniciales prudentes, ideal para inversores que prefieren proyecciones realistas. 
+        De cada 100 personas que pasan por tu farmacia, {int(conversion_rate)} realizarán compras. 
+        <b>Es el escenario perfecto para comenzar con confianza,</b> ya que cualquier mejora en ubicación o servicio 
+        incrementará significativamente estos resultados base.
+        """
+    elif escenario == "Medio":
+        escenario_desc = f"""
+        <b>Escenario Medio ({conversion_rate:.1f}% de conversión):</b><br/>
+        Representa las condiciones más probables de operación con ubicación decente y servicio establecido. 
+        De cada 100 visitantes, {int(conversion_rate)} se convierten en clientes. 
+        <b>Este es nuestro escenario recomendado</b> basado en el desempeño histórico de franquiciados exitosos 
+        en ubicaciones similares.
+        """
+    else:  # Alto
+        escenario_desc = f"""
+        <b>Escenario Alto ({conversion_rate:.1f}% de conversión):</b><br/>
+        Proyecta resultados en ubicaciones premium con excelente flujo peatonal y mínima competencia. 
+        {int(conversion_rate)} de cada 100 personas se convierten en clientes. 
+        <b>Representa el potencial máximo alcanzable</b> con ubicación estratégica y operación optimizada.
+        """
+
+    story.append(Paragraph(escenario_desc, e["normal"]))
+    story.append(Spacer(1, 15))
+
+    # Potencial del modelo (VENDEDOR)
+    story.append(titulo("💡 Potencial del Modelo"))
+
+    story.append(copy.copy(fijos["potencial"][modelo]))
+    story.append(Spacer(1, 20))
+
+    # Resumen ejecutivo (MÁS VENDEDOR)
+    story.append(titulo("📊 Resultados Proyectados"))
+
+    # Tabla de métricas principales (mejorada)
+    metricas_data = [
+        ['MÉTRICA CLAVE', 'RESULTADO'],
+        ['Clientes mensuales', f'{clientes_mes:,} personas'],
+        ['Ingresos mensuales', f'${ventas_totales:,.0f}'],
+        ['Utilidad neta mensual', f'${utilidad_neta:,.0f}'],
+        ['Margen de utilidad', f'{margen_neto*100:.1f}%'],
+        ['ROI anualizado', f'{roi_anual*100:.1f}%'],
+        ['Período de recuperación', f'{meses_recuperacion:.1f} meses'],
+        ['Punto de equilibrio', f'${ventas_be:,.0f}/mes'],
+        ['Ingresos primer año', f'${ventas_anual:,.0f}'],
+        ['Utilidad primer año', f'${util_anual:,.0f}'],
+    ]
+
+    metricas_table = Table(metricas_data, colWidths=[3.2*inch, 2.3*inch])
+    metricas_table.setStyle(e["tabla_metricas"])
+
+    story.append(metricas_table)
+    story.append(Spacer(1, 20))
+
+    # Estructura de ingresos (MÁS VISUAL)
+    story.append(titulo("💰 Estructura de Ingresos Mensuales"))
+
+    ventas_data = [['LÍNEA DE NEGOCIO', 'INGRESOS', 'PARTICIPACIÓN']]
+    ventas_data.append(['💊 Farmacia', f'${ventas_farmacia:,.0f}', f'{(ventas_farmacia/ventas_totales*100):.1f}%'])
+
+    if m["consultorio"]:
+        ventas_data.append(['💉 Recetas médicas', f'${ventas_recetas:,.0f}', f'{(ventas_recetas/ventas_totales*100):.1f}%'])
+        ventas_data.append(['🩺 Consultas', f'${ingresos_consulta:,.0f}', f'{(ingresos_consulta/ventas_totales*100):.1f}%'])
+
+    if m["abarrotes"]:
+        ventas_data.append(['🛒 Conveniencia', f'${ventas_abarrotes:,.0f}', f'{(ventas_abarrotes/ventas_totales*100):.1f}%'])
+
+    ventas_data.append(['🎯 TOTAL MENSUAL', f'${ventas_totales:,.0f}', '100.0%'])
+
+    ventas_table = Table(ventas_data, colWidths=[2.2*inch, 1.8*inch, 1.5*inch])
+    ventas_table.setStyle(e["tabla_ventas"])
+
+    story.append(ventas_table)
+    story.append(Spacer(1, 20))
+
+    # Evolución del negocio (TRIMESTRAL - más atractivo)
+    story.append(titulo("📈 Evolución Trimestral del Primer Año"))
+
+    proy_data = [['PERÍODO', 'INGRESOS', 'UTILIDAD NETA', 'MARGEN']]
+    trimestres = corrida["periodos"]["trimestre"]
+    for t in trimestres[trimestres["mes_fin"] <= 12].itertuples():
+        proy_data.append([
+            t.etiqueta,
+            f'${t.ventas_totales:,.0f}',
+            f'${t.utilidad_neta:,.0f}',
+            f'{t.margen_neto * 100:.1f}%'
+        ])
+
+    proy_table = Table(proy_data, colWidths=[1.3*inch, 1.7*inch, 1.7*inch, 1.0*inch])
+    proy_table.setStyle(e["tabla_periodos"])
+
+    story.append(proy_table)
+    story.append(Spacer(1, 20))
+
+    # Evaluación de la oportunidad (MUY VENDEDOR)
+    story.append(titulo("🏆 Evaluación de la Oportunidad"))
+
+    if utilidad_neta > 0 and meses_recuperacion < 24:
+        nivel = "excelente"
+        conclusion = f"""
+        <b>✅ OPORTUNIDAD EXCELENTE</b><br/><br/>
+
+        <b>Rentabilidad Comprobada:</b> Genera ${utilidad_neta:,.0f} de utilidad mensual neta<br/>
+        <b>Recuperación Rápida:</b> Inversión recuperada en {meses_recuperacion:.1f} meses<br/>
+        <b>ROI Atractivo:</b> {roi_anual*100:.1f}% anual - superior a alternativas tradicionales<br/>
+        <b>Mercado Estable:</b> Sector salud con demanda constante y creciente<br/><br/>
+
+        <b>RECOMENDACIÓN:</b> Proceder con la inversión. Los números demuestran 
+        una oportunidad sólida con riesgo controlado y potencial de crecimiento.
+        """
+    elif utilidad_neta > 0:
+        nivel = "viable"
+        conclusion = f"""
+        <b>⚠️ OPORTUNIDAD VIABLE CON CONSIDERACIONES</b><br/><br/>
+
+        <b>Rentabilidad Positiva:</b> ${utilidad_neta:,.0f}/mes en utilidades<br/>
+        <b>Recuperación Moderada:</b> {meses_recuperacion:.1f} meses para recuperar inversión<br/>
+        <b>Potencial de Mejora:</b> Optimizaciones operativas pueden acelerar retornos<br/><br/>
+
+        <b>RECOMENDACIÓN:</b> Evaluar mejoras en ubicación o eficiencias operativas 
+        para acelerar la recuperación. Base sólida con oportunidades de optimización.
+        """
+    else:
+        nivel = "ajustes"
+        conclusion = f"""
+        <b>📊 OPORTUNIDAD REQUIERE AJUSTES</b><br/><br/>
+
+        <b>Análisis Detallado:</b> Los números actuales sugieren optimizar parámetros<br/>
+        <b>Potencial Latente:</b> Ajustes en location/operación pueden mejorar resultados<br/>
+        <b>Soporte Líbano:</b> Nuestro equipo puede ayudar a optimizar la propuesta<br/><br/>
+
+        <b>RECOMENDACIÓN:</b> Revisar ubicación propuesta y explorar alternativas. 
+        El modelo es probadamente exitoso con los parámetros correctos.
+        """
+
+    story.append(Paragraph(conclusion, e["conclusion"][nivel]))
+    story.append(Spacer(1, 20))
+
+    # Próximos pasos (CALL TO ACTION)
+    story.append(titulo("🚀 Próximos Pasos Recomendados"))
+
+    story.append(copy.copy(fijos["proximos_pasos"]))
+
+    # Pie de página profesional
+    story.append(Spacer(1, 25))
+    story.append(copy.copy(fijos["confidencial"]))
+    story.append(Paragraph(f"Generado el {fecha.strftime('%d de %B, %Y')}", e["pie"]))
+
+    # Construir PDF
+    doc.build(story)
+
+    # Retornar el PDF
+    buffer.seek(0)
+    return buffer.getvalue()
@@ -0,0 +1,66 @@
+"""Análisis de sensibilidad (tornado) en una sola pasada del motor"""
+import numpy as np
+import pandas as pd
+
+from .motor import mes_base
+
+# Variables que se mueven ±delta y su nombre para mostrar
+VARIABLES = {
+    "flujo": "Flujo peatonal",
+    "ticket": "Ticket promedio",
+    "conversion": "Conversión",
+    "cogs": "Costo de mercancía",
+    "gastos_var": "Gastos variables",
+    "consultas": "Consultas por día",
+    "ticket_receta": "Compra con receta",
+    "abarrotes_pct": "Abarrotes (% de ventas)",
+}
+
+
+def tornado(params, delta=0.10, gastos_fijos_items=None, variables=None):
+    """Mueve cada variable ±delta y mide el cambio en utilidad neta y recuperación
+
+    Cada renglón de `gastos_fijos_items` se trata como una variable más (el
+    total de gastos fijos cambia solo por ese concepto). Todas las
+    perturbaciones se evalúan juntas como una matriz de 2×K escenarios.
+    Las variables en cero se omiten porque no mueven nada.
+    """
+    variables = VARIABLES if variables is None else variables
+    perturbaciones = [
+        (v, nombre, v, params[v])
+        for v, nombre in variables.items()
+        if params.get(v, 0)
+    ]
+    perturbaciones += [
+        (f"gf_{concepto}", f"Gasto fijo: {concepto}", "gastos_fijos", monto)
+        for concepto, monto in (gastos_fijos_items or {}).items()
+        if monto
+    ]
+    k = len(perturbaciones)
+    if k == 0:
+        return pd.DataFrame(columns=[
+            "variable", "nombre", "utilidad_baja", "utilidad_alta", "impacto_utilidad",
+            "recuperacion_baja", "recuperacion_alta",
+        ])
+
+    # Matriz de 2K escenarios: el renglón 2i baja la variable i, el 2i+1 la sube
+    escenarios = {campo: np.full(2 * k, float(valor)) for campo, valor in params.items()}
+    for i, (_, _, campo, monto) in enumerate(perturbaciones):
+        escenarios[campo][2 * i] -= delta * monto
+        escenarios[campo][2 * i + 1] += delta * monto
+    escenarios["conversion"] = np.clip(escenarios["conversion"], 0, 1)
+
+    base = mes_base(escenarios)
+    utilidad = base["utilidad_neta"].reshape(k, 2)
+    recuperacion = base["meses_recuperacion"].reshape(k, 2)
+
+    resultado = pd.DataFrame({
+        "variable": [v for v, _, _, _ in perturbaciones],
+        "nombre": [nombre for _, nombre, _, _ in perturbaciones],
+        "utilidad_baja": utilidad[:, 0],
+        "utilidad_alta": utilidad[:, 1],
+        "impacto_utilidad": np.abs(utilidad[:, 1] - utilidad[:, 0]),
+        "recuperacion_baja": recuperacion[:, 0],
+        "recuperacion_alta": recuperacion[:, 1],
+    })
+    return resultado.sort_values("impacto_utilidad", ascending=False, ignore_index=True)
@@ -0,0 +1,76 @@
+"""Simulación Monte Carlo del riesgo de la corrida.
+
+Cada variable incierta se muestrea alrededor de su valor en `params` y todas
+las muestras pasan juntas por el motor como una matriz (muestras × meses).
+"""
+import numpy as np
+import pandas as pd
+
+from .motor import mes_base, proyectar_utilidad
+
+# Distribución por variable: (tipo, dispersión relativa al valor base)
+DISTRIBUCIONES = {
+    "flujo": ("triangular", 0.30),
+    "conversion": ("triangular", 0.25),
+    "ticket": ("normal", 0.10),
+    "surten": ("uniforme", 0.15),
+    "crec": ("normal", 0.50),
+}
+
+TIPOS = ("normal", "triangular", "uniforme", "lognormal")
+
+# Variables que son proporciones y no pueden pasar de 1
+PROPORCIONES = {"conversion", "surten"}
+
+
+def muestrear(rng, valor, tipo, dispersion, n):
+    """Genera `n` muestras de una variable alrededor de `valor`"""
+    if tipo == "normal":
+        muestras = rng.normal(valor, abs(valor) * dispersion, n)
+    elif tipo == "triangular":
+        if dispersion <= 0:
+            return np.full(n, float(valor))
+        muestras = rng.triangular(valor * (1 - dispersion), valor, valor * (1 + dispersion), n)
+    elif tipo == "uniforme":
+        muestras = rng.uniform(valor * (1 - dispersion), valor * (1 + dispersion), n)
+    elif tipo == "lognormal":
+        muestras = valor * rng.lognormal(0.0, dispersion, n)
+    else:
+        raise ValueError(f"Distribución desconocida: {tipo!r} (usa una de {', '.join(TIPOS)})")
+    return muestras
+
+
+def muestrear_parametros(params, n, distribuciones=None, semilla=None):
+    """Regresa una copia de `params` con las variables inciertas como arreglos (n,)"""
+    rng = np.random.default_rng(semilla)
+    distribuciones = DISTRIBUCIONES if distribuciones is None else distribuciones
+
+    muestras = dict(params)
+    for variable, (tipo, dispersion) in distribuciones.items():
+        valores = muestrear(rng, params[variable], tipo, dispersion, n)
+        techo = 1.0 if variable in PROPORCIONES else None
+        if variable != "crec":
+            valores = np.clip(valores, 0.0, techo)
+        muestras[variable] = valores
+    return muestras
+
+
+def simular(params, n=100_000, meses=12, distribuciones=None, semilla=None, estacionalidad=None):
+    """Corre `n` escenarios y resume el riesgo de la corrida
+
+    Regresa un diccionario con las bandas P5/P50/P95 de la utilidad neta
+    mensual, las muestras de meses de recuperación y la probabilidad de no
+    alcanzar nunca el punto de equilibrio dentro del horizonte.
+    """
+    muestras = muestrear_parametros(params, n, distribuciones, semilla)
+    utilidad = np.broadcast_to(proyectar_utilidad(muestras, meses, estacionalidad), (n, meses))
+    recuperacion = np.broadcast_to(mes_base(muestras)["meses_recuperacion"], (n,))
+
+    p5, p50, p95 = np.percentile(utilidad, [5, 50, 95], axis=0)
+    bandas = pd.DataFrame({"Mes": np.arange(1, meses + 1), "P5": p5, "P50": p50, "P95": p95})
+
+    return {
+        "bandas": bandas,
+        "meses_recuperacion": recuperacion,
+        "prob_sin_equilibrio": float(np.mean(np.all(utilidad <= 0, axis=1))),
+    }
@@ -0,0 +1,16 @@
+"""Superficies de rentabilidad sobre mallas de flujo × ticket"""
+import numpy as np
+
+from .motor import mes_base
+
+
+def superficie(params, flujos, tickets):
+    """Evalúa el mes base en toda la malla flujo × ticket por broadcasting
+
+    Regresa el diccionario de `mes_base` con arreglos de forma
+    (len(flujos), len(tickets)); el resto de los parámetros queda fijo.
+    """
+    malla = dict(params)
+    malla["flujo"] = np.asarray(flujos, dtype=float)[:, None]
+    malla["ticket"] = np.asarray(tickets, dtype=float)[None, :]
+    return mes_base(malla)
@@ -0,0 +1,98 @@
+"""Cola de trabajos en segundo plano con avance y resultados guardados.
+
+Pensada para tareas lentas que no deben bloquear el hilo del script de
+Streamlit (p. ej. construir un PDF). Un pool de hilos acotado limita cuántas
+corren a la vez en todo el servidor; las demás esperan en cola. Cada trabajo
+se consulta por su id, así que la sesión solo guarda ese id.
+
+Son hilos y no procesos a propósito: la meta es sacar el trabajo del hilo del
+script y reportar avance, no ganar velocidad. Un PDF tarda unos 20 ms y el
+hilo suelta el GIL cada 5 ms (sys.getswitchinterval), así que las demás
+sesiones apenas lo notan. En un proceso aparte tardaría lo mismo, pero el
+primero pagaría ~0.7 s de arranque y el avance no cruzaría de proceso. Cuando
+sí importa construir muchos a la vez (el ZIP de `reporte.generar_zip`) se usa
+el pool de procesos, porque con hilos se turnarían el GIL.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Estados posibles de un trabajo
+EN_COLA, CORRIENDO, LISTO, ERROR = "en_cola", "corriendo", "listo", "error"
+
+
+class ColaTrabajos:
+    """Pool de hilos acotado más un almacén de trabajos terminados
+
+    La función enviada recibe un argumento `progreso` que puede llamar con un
+    número entre 0 y 1. Los trabajos terminados se conservan `ttl` segundos
+    (y como máximo `max_guardados`) para que la sesión recoja el resultado.
+    """
+
+    def __init__(self, max_simultaneos=2, max_guardados=200, ttl=1800):
+        self.max_simultaneos = max_simultaneos
+        self.max_guardados = max_guardados
+        self.ttl = ttl
+        self._pool = ThreadPoolExecutor(max_workers=max_simultaneos, thread_name_prefix="trabajo")
+        self._trabajos = OrderedDict()
+        self._candado = threading.Lock()
+
+    def enviar(self, funcion, *args, **kwargs):
+        """Encola `funcion(*args, progreso=..., **kwargs)` y regresa el id del trabajo"""
+        trabajo = {
+            "id": uuid.uuid4().hex,
+            "estado": EN_COLA,
+            "progreso": 0.0,
+            "resultado": None,
+            "error": None,
+            "creado": time.monotonic(),
+            "terminado": None,
+        }
+        with self._candado:
+            self._depurar()
+            self._trabajos[trabajo["id"]] = trabajo
+
+        def progreso(fraccion):
+            trabajo["progreso"] = min(max(float(fraccion), 0.0), 1.0)
+
+        def correr():
+            trabajo["estado"] = CORRIENDO
+            try:
+                trabajo["resultado"] = funcion(*args, progreso=progreso, **kwargs)
+                trabajo["progreso"] = 1.0
+                trabajo["estado"] = LISTO
+            except Exception as e:  # el error se muestra al usuario en lugar de perderse en el hilo
+                trabajo["error"] = f"{type(e).__name__}: {e}"
+                trabajo["estado"] = ERROR
+            finally:
+                trabajo["terminado"] = time.monotonic()
+
+        self._pool.submit(correr)
+        return trabajo["id"]
+
+    def consultar(self, id_trabajo):
+        """Copia del estado del trabajo, o None si no existe o ya expiró"""
+        with self._candado:
+            trabajo = self._trabajos.get(id_trabajo)
+            return dict(trabajo) if trabajo is not None else None
+
+    def _depurar(self):
+        """Quita trabajos terminados viejos (se llama con el candado tomado)"""
+        ahora = time.monotonic()
+        terminados = [t for t in self._trabajos.values() if t["terminado"] is not None]
+        sobran = len(self._trabajos) - self.max_guardados
+        for t in terminados:
+            if ahora - t["terminado"] > self.ttl or sobran > 0:
+                del self._trabajos[t["id"]]
+                sobran -= 1
+
+    def estadisticas(self):
+        """Trabajos por estado y límite de simultáneos"""
+        with self._candado:
+            conteo = {estado: 0 for estado in (EN_COLA, CORRIENDO, LISTO, ERROR)}
+            for t in self._trabajos.values():
+                conteo[t["estado"]] += 1
+        conteo["max_simultaneos"] = self.max_simultaneos
+        return conteo
@@ -0,0 +1,87 @@
+"""Ranking de ubicaciones candidatas contra la competencia cercana.
+
+Cada candidata (lat, lon, flujo y renta) cuenta las farmacias de la
+competencia a `radio` km con el índice de rejilla de `espacial`; las más
+cercanas pesan más (1 - distancia / radio) y la conversión baja con esa
+competencia equivalente: conversión / (1 + penalización × competencia). Luego
+todas las candidatas se corren en una sola llamada al motor y se ordenan por
+recuperación y utilidad neta.
+"""
+import numpy as np
+import pandas as pd
+
+from .archivos import leer_por_bloques
+from .espacial import Rejilla, contar_cercanos
+from .flujos import flujos_caja, recuperacion
+from .motor import mes_base, proyectar_utilidad
+
+# Penalización por cada competidor equivalente (uno pegado a la candidata)
+PENALIZACION = 0.10
+
+# Meses para medir la recuperación con crecimiento
+HORIZONTE = 60
+
+
+def leer_puntos(archivo, columnas=("lat", "lon"), opcionales=()):
+    """Todo el archivo (CSV o Parquet) en un DataFrame, sin renglones sin coordenadas válidas
+
+    Un archivo con solo encabezado regresa un DataFrame vacío con `columnas`.
+    """
+    bloques = list(leer_por_bloques(archivo, columnas, opcionales=opcionales))
+    if not bloques:
+        return pd.DataFrame(columns=list(columnas))
+    puntos = pd.concat(bloques, ignore_index=True) if len(bloques) > 1 else bloques[0]
+    for columna in ("lat", "lon"):
+        puntos[columna] = pd.to_numeric(puntos[columna], errors="coerce")
+    validas = puntos["lat"].between(-90, 90) & puntos["lon"].between(-180, 180)
+    return puntos[validas].reset_index(drop=True)
+
+
+def rankear(candidatas, competidores, params, radio=1.0, penalizacion=PENALIZACION, renta_actual=0,
+            estacionalidad=None):
+    """Corrida de cada candidata con su flujo, su renta y la competencia a `radio` km
+
+    `params` es la configuración actual (escalares); cada candidata cambia el
+    flujo (si lo trae), la renta dentro de los gastos fijos (gastos fijos -
+    `renta_actual` + renta) y la conversión según su competencia. Regresa las
+    candidatas ordenadas de la que recupera antes a la que más tarda, y por
+    utilidad neta entre las que empatan.
+    """
+    candidatas = pd.DataFrame(candidatas).reset_index(drop=True)
+    competidores = pd.DataFrame(competidores)
+
+    if len(competidores):
+        rejilla = Rejilla(competidores["lat"], competidores["lon"], radio)
+        cuantos, competencia, mas_cercano = contar_cercanos(candidatas["lat"].to_numpy(), candidatas["lon"].to_numpy(),
+                                                            rejilla)
+    else:
+        cuantos = np.zeros(len(candidatas), dtype=np.int64)
+        competencia = np.zeros(len(candidatas))
+        mas_cercano = np.full(len(candidatas), np.inf)
+
+    lote = {k: np.full(len(candidatas), v, dtype=float) for k, v in params.items()}
+    if "flujo" in candidatas:
+        flujo = pd.to_numeric(candidatas["flujo"], errors="coerce").to_numpy(dtype=float)
+        lote["flujo"] = np.where(np.isnan(flujo), lote["flujo"], flujo)
+    if "renta" in candidatas:
+        renta = pd.to_numeric(candidatas["renta"], errors="coerce").to_numpy(dtype=float)
+        lote["gastos_fijos"] = np.where(np.isnan(renta), lote["gastos_fijos"], lote["gastos_fijos"] - renta_actual + renta)
+    lote["conversion"] = lote["conversion"] / (1 + penalizacion * competencia)
+
+    base = mes_base(lote)
+    utilidad = proyectar_utilidad(lote, HORIZONTE, estacionalidad)
+    resultado = candidatas.assign(
+        competidores=cuantos,
+        competencia=competencia,
+        distancia_competidor=mas_cercano,
+        flujo=lote["flujo"],
+        gastos_fijos=lote["gastos_fijos"],
+        conversion=lote["conversion"],
+        ventas_totales=base["ventas_totales"],
+        utilidad_neta=base["utilidad_neta"],
+        roi_anual=base["roi_anual"],
+        meses_recuperacion=recuperacion(flujos_caja(utilidad, lote["inversion"])),
+    )
+    resultado = resultado.sort_values(["meses_recuperacion", "utilidad_neta"], ascending=[True, False], kind="stable")
+    resultado.insert(0, "lugar", np.arange(1, len(resultado) + 1))
+    return resultado.reset_index(drop=True)
@@ -0,0 +1,237 @@
+"""Estadísticas de uso a partir de la bitácora de accesos, leída por incrementos.
+
+Un índice chico en disco (`accesos.log.idx`) guarda hasta qué byte se leyó el
+archivo activo, qué segmentos rotados ya se contaron, los contadores por día,
+código y tipo de evento, y los días que cubre cada segmento. Actualizar solo
+lee las líneas nuevas (con mmap sobre el archivo activo). Las consultas con
+filtro de fechas abren únicamente los segmentos de esos días.
+
+Entiende tanto las líneas JSON de la bitácora actual como las líneas con
+separador "|" del formato anterior.
+"""
+import glob
+import gzip
+import json
+import mmap
+import os
+import threading
+
+INDICE_VERSION = 1
+
+
+def _evento(linea):
+    """Convierte una línea (JSON o formato anterior con "|") en un evento"""
+    linea = linea.strip()
+    if not linea:
+        return None
+    if linea.startswith("{"):
+        try:
+            evento = json.loads(linea)
+        except ValueError:
+            return None
+        evento["ts"] = str(evento.get("ts", "")).replace(" ", "T")
+        return evento
+
+    partes = [p.strip() for p in linea.split("|")]
+    ts = partes[0].replace(" ", "T")
+    if len(partes) >= 6 and partes[1] == "CORRIDA":
+        return {"ts": ts, "tipo": "corrida", "codigo": "", "usuario": partes[2],
+                "nombre": partes[3], "ubicacion": partes[4], "proposito": partes[5]}
+    if len(partes) == 3:
+        return {"ts": ts, "tipo": "acceso", "codigo": partes[1], "usuario": partes[2]}
+    return None
+
+
+def _eventos(bloque):
+    """Eventos de un bloque de bytes con líneas completas"""
+    for linea in bloque.decode("utf-8", errors="replace").splitlines():
+        evento = _evento(linea)
+        if evento is not None and len(evento["ts"]) >= 10:
+            yield evento
+
+
+def _leer(ruta):
+    """Contenido completo de un segmento, comprimido o no"""
+    abrir = gzip.open if ruta.endswith(".gz") else open
+    with abrir(ruta, "rb") as f:
+        return f.read()
+
+
+def _indice_vacio():
+    return {
+        "version": INDICE_VERSION,
+        "activo": {"inodo": None, "offset": 0, "firma": "", "dias": []},
+        "segmentos": {},
+        "contadores": {},
+        "usuarios": {},
+    }
+
+
+class LectorBitacora:
+    """Lector incremental de la bitácora con su índice en disco"""
+
+    def __init__(self, ruta, ruta_indice=None):
+        self.ruta = ruta
+        self.ruta_indice = ruta_indice or ruta + ".idx"
+        self._candado = threading.Lock()
+
+    def _segmentos(self):
+        """{clave: ruta} de los segmentos rotados; la clave no lleva el .gz"""
+        segmentos = {}
+        for ruta in sorted(glob.glob(glob.escape(self.ruta) + ".*")):
+            if ruta.endswith((".idx", ".tmp")):
+                continue
+            clave = os.path.basename(ruta).removesuffix(".gz")
+            # Si existen ambos, el .gz se está escribiendo: se usa el original
+            segmentos.setdefault(clave, ruta)
+        return segmentos
+
+    def _cargar(self):
+        try:
+            with open(self.ruta_indice, encoding="utf-8") as f:
+                indice = json.load(f)
+            if indice.get("version") == INDICE_VERSION:
+                return indice
+        except (OSError, ValueError):
+            pass
+        return _indice_vacio()
+
+    def _guardar(self, indice):
+        temporal = self.ruta_indice + ".tmp"
+        try:
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump(indice, f, ensure_ascii=False, separators=(",", ":"))
+            os.replace(temporal, self.ruta_indice)
+        except OSError:
+            pass  # Sin disco escribible el índice vive solo en memoria
+
+    @staticmethod
+    def _sumar(indice, bloque):
+        """Agrega los eventos de `bloque` a los contadores; regresa los días vistos"""
+        dias = set()
+        contadores = indice["contadores"]
+        for evento in _eventos(bloque):
+            dia = evento["ts"][:10]
+            codigo = evento.get("codigo") or ""
+            por_tipo = contadores.setdefault(dia, {}).setdefault(codigo, {})
+            por_tipo[evento.get("tipo", "")] = por_tipo.get(evento.get("tipo", ""), 0) + 1
+            if codigo and evento.get("usuario"):
+                indice["usuarios"][codigo] = evento["usuario"]
+            dias.add(dia)
+        return dias
+
+    def actualizar(self):
+        """Cuenta lo que se escribió desde la última vez y regresa el índice"""
+        with self._candado:
+            indice = self._cargar()
+            # El archivo activo se abre antes de listar segmentos: si ya lo
+            # rotaron, su segmento aparece en la lista de abajo
+            try:
+                f = open(self.ruta, "rb")
+            except FileNotFoundError:
+                f = None
+            try:
+                if not self._contar_segmentos(indice):
+                    return self._cargar()  # Segmento a medio comprimir: se reintenta después
+                if f is not None:
+                    self._contar_activo(indice, f)
+            finally:
+                if f is not None:
+                    f.close()
+            self._guardar(indice)
+            return indice
+
+    def _contar_segmentos(self, indice):
+        """Cuenta los segmentos rotados nuevos; False si alguno no se pudo leer"""
+        for clave, ruta in self._segmentos().items():
+            if clave in indice["segmentos"]:
+                continue
+            try:
+                datos = _leer(ruta)
+            except (EOFError, OSError):
+                return False
+            activo = indice["activo"]
+            firma = activo["firma"].encode("utf-8")
+            if firma and activo["offset"] and datos.startswith(firma):
+                # Es el antiguo archivo activo: solo falta lo que se escribió después
+                dias = self._sumar(indice, datos[activo["offset"]:]) | set(activo["dias"])
+                indice["activo"] = _indice_vacio()["activo"]
+            else:
+                dias = self._sumar(indice, datos)
+            indice["segmentos"][clave] = {"dias": sorted(dias)}
+        return True
+
+    def _contar_activo(self, indice, f):
+        """Lee del archivo activo solo las líneas completas posteriores al último offset"""
+        info = os.fstat(f.fileno())
+        try:
+            if os.stat(self.ruta).st_ino != info.st_ino:
+                return  # Lo rotaron mientras leíamos: se cuenta como segmento la próxima vez
+        except FileNotFoundError:
+            return
+        activo = indice["activo"]
+        if info.st_ino != activo["inodo"] or info.st_size < activo["offset"]:
+            activo = indice["activo"] = dict(_indice_vacio()["activo"], inodo=info.st_ino)
+        if info.st_size <= activo["offset"]:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as datos:
+            # La última línea puede estar a medio escribir
+            fin = datos.rfind(b"\n", activo["offset"]) + 1
+            if fin <= activo["offset"]:
+                return
+            if not activo["firma"]:
+                activo["firma"] = datos[:datos.find(b"\n")].decode("utf-8", errors="replace")
+            dias = self._sumar(indice, datos[activo["offset"]:fin])
+        activo["dias"] = sorted(set(activo["dias"]) | dias)
+        activo["offset"] = fin
+
+    def conteos(self, desde, hasta, codigos=None):
+        """Renglones (dia, codigo, usuario, tipo, eventos) entre dos fechas ISO"""
+        indice = self.actualizar()
+        filas = []
+        for dia, por_codigo in sorted(indice["contadores"].items()):
+            if not desde <= dia <= hasta:
+                continue
+            for codigo, por_tipo in por_codigo.items():
+                if codigos and codigo not in codigos:
+                    continue
+                for tipo, n in por_tipo.items():
+                    filas.append({
+                        "dia": dia, "codigo": codigo, "usuario": indice["usuarios"].get(codigo, ""),
+                        "tipo": tipo, "eventos": n,
+                    })
+        return filas
+
+    def eventos(self, desde, hasta, codigos=None, tipo="corrida", pagina=1, por_pagina=25):
+        """Página de eventos (del más reciente al más viejo) y el total que cumple el filtro
+
+        Solo se abren los segmentos cuyos días caen dentro del rango.
+        """
+        indice = self.actualizar()
+
+        def cubre(dias):
+            return any(desde <= dia <= hasta for dia in dias)
+
+        rutas = [
+            ruta for clave, ruta in self._segmentos().items()
+            if cubre(indice["segmentos"].get(clave, {}).get("dias", []))
+        ]
+        if cubre(indice["activo"]["dias"]):
+            rutas.append(self.ruta)
+
+        encontrados = []
+        for ruta in rutas:
+            try:
+                datos = _leer(ruta)
+            except (EOFError, OSError):
+                continue
+            for evento in _eventos(datos):
+                if evento.get("tipo") != tipo or not desde <= evento["ts"][:10] <= hasta:
+                    continue
+                if codigos and (evento.get("codigo") or "") not in codigos:
+                    continue
+                encontrados.append(evento)
+
+        encontrados.sort(key=lambda e: e["ts"], reverse=True)
+        inicio = (pagina - 1) * por_pagina
+        return encontrados[inicio:inicio + por_pagina], len(encontrados)